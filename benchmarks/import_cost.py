@@ -0,0 +1,64 @@
+# benchmarks/import_cost.py
+"""
+Startup cost of the package entry points: wall time of the `import` and peak RSS of a fresh
+interpreter, and whether it pulled in torch / PyG. Each module is measured in its own process
+(`python -m benchmarks.import_cost` from the repository root).
+"""
+import sys
+import json
+import argparse
+import subprocess
+from typing import Any, Dict, List
+
+
+MODULES = ["src.managers", "src.managers.game", "src.cli", "src.pyg"]
+
+PROBE = """
+import sys, time, json, resource
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "module": "{module}",
+    "seconds": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "torch": "torch" in sys.modules,
+    "torch_geometric": "torch_geometric" in sys.modules
+}}))
+"""
+
+
+def measure(module: str, repeat: int) -> Dict[str, Any]:
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], capture_output=True, text=True)
+        if out.returncode:
+            return {"module": module, "error": out.stderr.strip().splitlines()[-1]}
+        runs.append(json.loads(out.stdout))
+
+    best = min(runs, key=lambda r: r["seconds"])
+    return {**best, "max_rss_mb": max(r["max_rss_mb"] for r in runs)}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import time and RSS of the package entry points.")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per module, the fastest is kept")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    args = parser.parse_args(argv)
+
+    for module in args.modules:
+        result = measure(module, args.repeat)
+        if args.json:
+            print(json.dumps(result))
+        elif "error" in result:
+            print(f"{module:<20} ❌ {result['error']}")
+        else:
+            loaded = "torch+pyg" if result["torch_geometric"] else "torch" if result["torch"] else "-"
+            print(f"{module:<20} {result['seconds']:7.2f}s {result['max_rss_mb']:8.0f} MB  {loaded}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+# benchmarks/payload_cost.py
+"""
+Client-side cost of the action write payloads of one game: building the parameters and packing
+them with the driver's PackStream encoder, for the former one-map-per-action rows and the
+struct-of-arrays columns of `transform.action_columns`. No database is needed
+(`python -m benchmarks.payload_cost` from the repository root).
+"""
+import sys
+import time
+import argparse
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+from neo4j._codec.packstream.v1 import Packer, PackableBuffer
+from neo4j._codec.hydration.bolt.v2 import HydrationHandler
+
+from src.fetcher import normalize_pbp
+from src.transform import action_columns, ACTION_COLUMNS, ACTION_FIELDS, ACTION_TYPES
+
+
+def synthetic_pbp(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    A normalized play-by-play of `n` actions with the NBA live-data columns and a realistic mix.
+    """
+    rng = np.random.default_rng(seed)
+    types = rng.choice(
+        ["2pt", "3pt", "freethrow", "rebound", "foul", "turnover", "timeout", "violation", "jumpball"],
+        size=n, p=[0.25, 0.15, 0.1, 0.25, 0.1, 0.07, 0.03, 0.03, 0.02]
+    )
+    period = np.minimum(np.arange(n) * 4 // n + 1, 4)
+    remaining = 720.0 - (np.arange(n) % (n // 4)) * 720.0 / (n // 4)
+    people = lambda p: np.where(rng.random(n) < p, rng.integers(1626000, 1642000, n), np.nan)
+
+    raw = pd.DataFrame({
+        "timeActual": pd.Timestamp("2024-11-01T00:00:00Z") + pd.to_timedelta(np.arange(n) * 6, unit="s"),
+        "period": period,
+        "clock": [f"PT{int(r // 60):02d}M{r % 60:05.2f}S" for r in remaining],
+        "actionType": types,
+        "subType": rng.choice(["Jump Shot", "Layup", "defensive", "offensive", "personal", "1 of 2", "2 of 2"], n),
+        "descriptor": rng.choice(["driving", "pullup", "shooting", None], n),
+        "x": np.where(np.isin(types, ["2pt", "3pt"]), rng.uniform(0, 100, n), np.nan),
+        "y": np.where(np.isin(types, ["2pt", "3pt"]), rng.uniform(0, 100, n), np.nan),
+        "shotDistance": np.where(np.isin(types, ["2pt", "3pt"]), rng.uniform(0, 30, n), np.nan),
+        "shotResult": rng.choice(["Made", "Missed"], n),
+        "teamId": rng.choice([1610612737, 1610612738], n),
+        "personId": rng.integers(1626000, 1642000, n),
+        "officialId": people(0.1), "foulDrawnPersonId": people(0.1), "assistPersonId": people(0.3),
+        "blockPersonId": people(0.05), "stealPersonId": people(0.05), "jumpBallRecoverdPersonId": people(0.02),
+        "jumpBallWonPersonId": people(0.02), "jumpBallLostPersonId": people(0.02),
+    })
+    return normalize_pbp(raw)
+
+
+def action_rows(actions: pd.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    The former payloads: one map per action built with `DataFrame.apply`, sentinels checked per value.
+    """
+    return {kind: _rows(actions[actions["actionType"].isin(types)], kind) for kind, types in ACTION_TYPES.items()}
+
+
+def _rows(actions: pd.DataFrame, kind: str) -> List[Dict[str, Any]]:
+    def process(row) -> Dict[str, Any]:
+        remaining = pd.Timedelta(row["clock"]).total_seconds()
+        elapsed = 720.0 - remaining
+        entry = {"local_clock": round(elapsed, 2), "global_clock": round((row["period"] - 1) * 720.0 + elapsed, 2)}
+        for name in ACTION_COLUMNS[kind]:
+            if name in ACTION_FIELDS:
+                value = row[ACTION_FIELDS[name][0]]
+                entry[name] = value if ACTION_FIELDS[name][1] in ["time", "int", "float"] or value != -1 else None
+        return entry
+
+    return actions.apply(process, axis=1).tolist()
+
+
+def pack(params: Dict[str, Any]) -> int:
+    buffer = PackableBuffer()
+    Packer(buffer).pack(params, dehydration_hooks=HydrationHandler().new_hydration_scope().dehydration_hooks)
+    return len(buffer.data)
+
+
+def measure(actions: pd.DataFrame, build: Callable[[pd.DataFrame], Dict[str, Any]], repeat: int) -> Dict[str, float]:
+    build_time, pack_time, size = [], [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payloads = [{"game_id": 22400001, "batch": batch} for batch in build(actions).values()]
+        build_time.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        size = sum(pack(params) for params in payloads)
+        pack_time.append(time.perf_counter() - start)
+
+    return {"build_ms": 1e3 * min(build_time), "pack_ms": 1e3 * min(pack_time), "bytes": size}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and PackStream cost of the action write payloads of one game.")
+    parser.add_argument("--actions", type=int, default=500, help="actions per game (default: 500)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per payload, the fastest is kept")
+    args = parser.parse_args(argv)
+
+    actions = synthetic_pbp(args.actions)
+    print(f"{'payload':<10} {'build':>9} {'pack':>9} {'bytes':>9}")
+    for name, build in [("rows", action_rows), ("columns", action_columns)]:
+        result = measure(actions, build, args.repeat)
+        print(f"{name:<10} {result['build_ms']:7.1f}ms {result['pack_ms']:7.1f}ms {result['bytes']:9d}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+# core/builder.py
+
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+import torch
+from torch_geometric.data import HeteroData
+
+from .fetcher import load_source
+from .transform import game_clock, compute_periods, compute_lineups
+from .pyg import build_game_graph
+
+
+def _ns(times: pd.Series) -> np.ndarray:
+    return pd.to_datetime(times, utc=True).to_numpy(dtype="datetime64[ns]").astype(np.int64)
+
+
+def _ids(col: pd.Series) -> np.ndarray:
+    """
+    Person/team id column as float64, with the `-1` fill value and NA mapped to NaN.
+    """
+    ids = pd.to_numeric(pd.Series(col, dtype="object"), errors="coerce").to_numpy(dtype=np.float64)
+    ids[ids == -1] = np.nan
+    return ids
+
+
+def _str_ids(ids: np.ndarray) -> pd.Series:
+    return pd.Series(ids).map(lambda x: "" if np.isnan(x) else str(int(x)))
+
+
+def _stints(game_id: int, team_ids: Tuple[int, int], boxscore_df: pd.DataFrame, pbp_df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Mirrors `MERGE_STINTS`: returns (lineup stints, player stints, on-court rows).
+    """
+    periods = pd.DataFrame(compute_periods(pbp_df.loc[pbp_df["actionType"] == "period", ["timeActual", "period"]]))
+    periods["start"] = _ns(periods["start"])
+    periods["end"] = _ns(periods["end"])
+
+    sides = compute_lineups(
+        team_ids,
+        subs = pbp_df.loc[pbp_df["actionType"] == "substitution", ["timeActual", "period", "clock", "subType", "personId", "teamId"]],
+        starters = boxscore_df.loc[boxscore_df["START_POSITION"] != "", ["PLAYER_ID", "TEAM_ID"]]
+    )
+    ls = pd.DataFrame([
+        dict(lineup, team_id=side["team_id"], i=i, ids=[int(x) for x in lineup["ids"]])
+        for side in sides for i, lineup in enumerate(side["lineups"])
+    ])
+    ls["period"] = ls["period"].astype(int)
+    ls = ls.merge(periods, left_on="period", right_on="n", how="inner")
+
+    ls["l_id"] = ls["ids"].map(lambda ids: "_".join(map(str, ids)))
+    ls["ls_id"] = f"{game_id}_" + ls["period"].astype(str) + "_" + ls["l_id"] + "_" + ls["i"].astype(str)
+    ls["q_id"] = f"{game_id}_" + ls["period"].astype(str)
+    is_start = ls["time"].map(lambda t: isinstance(t, str) and t == "")
+    ls["start_time"] = np.where(is_start, ls["start"], _ns(ls["time"].where(~is_start, pd.NaT)))
+
+    ls = ls.sort_values(["team_id", "period", "global_clock"], kind="stable").reset_index(drop=True)
+    by_period = ls.groupby(["team_id", "period"], sort=False)
+    next_local = by_period["local_clock"].shift(-1)
+    next_start = by_period["start_time"].shift(-1)
+    ls["next_id"] = by_period["ls_id"].shift(-1).fillna("")
+    period_len = np.where(ls["period"] > 4, 300.0, 720.0)
+    ls["duration"] = np.where(next_local.isna(), period_len - ls["local_clock"], next_local - ls["local_clock"])
+    ls["end_time"] = np.where(next_start.isna(), ls["end"], next_start).astype(np.int64)
+
+    on = ls.explode("ids").rename(columns={"ids": "p_id"})
+    on["p_id"] = on["p_id"].astype(np.int64)
+    on = on.sort_values(["period", "team_id", "p_id", "global_clock"], kind="stable").reset_index(drop=True)
+    keys = [on["period"], on["team_id"], on["p_id"]]
+    by_player = on.groupby(keys, sort=False)
+    prev_end = by_player["global_clock"].shift(1) + by_player["duration"].shift(1)
+    new_run = prev_end.isna() | (on["global_clock"] > prev_end)
+    on["run"] = new_run.astype(np.int64).groupby(keys).cumsum()
+
+    ps = on.groupby(["period", "team_id", "p_id", "run"], sort=False).agg(
+        ps_global_clock = ("global_clock", "first"),
+        ps_local_clock = ("local_clock", "first"),
+        ps_duration = ("duration", "sum"),
+    ).reset_index()
+    ps["ps_id"] = (
+        f"{game_id}_" + ps["period"].astype(str) + "_" + ps["p_id"].astype(str) + "_" +
+        ps["ps_global_clock"].map(lambda x: repr(float(x)))
+    )
+    on = on.merge(ps, on=["period", "team_id", "p_id", "run"], how="left")
+    return ls, ps, on
+
+
+def _player_stint(ls: pd.DataFrame, on: pd.DataFrame, team: np.ndarray, player: np.ndarray, time: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `(Team)-[:HAS_LINEUP]->()-[:ON_COURT]->(ls) WHERE ls.start_time <= time < ls.end_time`
+    followed by the `(Player)-[:ON_COURT]->(ps)-[:ON_COURT_WITH]->(ls)` lookup. Returns "" where unmatched.
+    """
+    ls_idx = np.full(time.size, -1, dtype=np.int64)
+    for team_id in ls["team_id"].unique():
+        rows = np.flatnonzero(ls["team_id"].to_numpy() == team_id)
+        rows = rows[np.argsort(ls["start_time"].to_numpy()[rows], kind="stable")]
+        starts = ls["start_time"].to_numpy()[rows]
+        ends = ls["end_time"].to_numpy()[rows]
+
+        sel = np.flatnonzero(team == team_id)
+        pos = np.searchsorted(starts, time[sel], side="right") - 1
+        ok = (pos >= 0) & (time[sel] < ends[pos.clip(min=0)])
+        ls_idx[sel[ok]] = rows[pos[ok]]
+
+    keys = pd.DataFrame({
+        "ls_id": np.where(ls_idx >= 0, ls["ls_id"].to_numpy()[ls_idx.clip(min=0)], ""),
+        "p_id": np.nan_to_num(player, nan=-1).astype(np.int64)
+    })
+    found = keys.merge(on[["ls_id", "p_id", "ps_id"]].drop_duplicates(["ls_id", "p_id"]), on=["ls_id", "p_id"], how="left")
+    return found["ps_id"].fillna("").to_numpy(dtype=object)
+
+
+def build_columns(game_id: int, team_ids: Tuple[int, int], boxscore_df: pd.DataFrame, pbp_df: pd.DataFrame, features: Optional[Dict[str, List]] = None) -> Dict[str, Any]:
+    """
+    Computes, from the normalized `fetch_boxscore` / `fetch_pbp` frames, the same columns `GET_GAME_GRAPH` returns.
+    Player/lineup features (`FeatureStore.game_features`) can be passed in; they default to zeros.
+    """
+    ls, ps, on = _stints(game_id, team_ids, boxscore_df, pbp_df)
+    cols = dict(features or {})
+
+    rows = on.sort_values(["ps_global_clock", "ps_id", "global_clock", "ls_id"], kind="stable")
+    cols.update({
+        "q_id": rows["q_id"], "q_n": rows["period"],
+        "t_id": rows["team_id"], "l_id": rows["l_id"], "p_id": rows["p_id"],
+        "ls_id": rows["ls_id"],
+        "ls_global_clock": rows["global_clock"], "ls_local_clock": rows["local_clock"], "ls_duration": rows["duration"],
+        "ps_id": rows["ps_id"],
+        "ps_global_clock": rows["ps_global_clock"], "ps_local_clock": rows["ps_local_clock"], "ps_duration": rows["ps_duration"],
+    })
+
+    chain = ls.sort_values(["l_id", "global_clock"], kind="stable")
+    nxt = chain.groupby("l_id", sort=False)["ls_id"].shift(-1)
+    cols["ls_next_src"], cols["ls_next_dst"] = chain["ls_id"][nxt.notna()], nxt[nxt.notna()]
+
+    chain = ps.sort_values(["p_id", "ps_global_clock"], kind="stable")
+    nxt = chain.groupby("p_id", sort=False)["ps_id"].shift(-1)
+    cols["ps_next_src"], cols["ps_next_dst"] = chain["ps_id"][nxt.notna()], nxt[nxt.notna()]
+
+    ocn = ls[ls["next_id"] != ""]
+    cols["ocn_src"], cols["ocn_dst"] = ocn["ls_id"], ocn["next_id"]
+
+
+    actions = pbp_df[pbp_df["actionType"] != "substitution"]
+    local_clock, global_clock = game_clock(actions["period"], actions["clock"])
+    actions = actions.assign(
+        local_clock = np.round(local_clock, 2),
+        global_clock = np.round(global_clock, 2),
+        team = _ids(actions["teamId"]),
+        player = _ids(actions["personId"]),
+        time = _ns(actions["timeActual"]),
+        prefix = f"{game_id}_" + actions["period"].astype(int).astype(str) + "_" + actions["clock"].astype(str)
+    )
+    other = lambda team: np.where(team == team_ids[0], team_ids[1], team_ids[0]).astype(np.float64)
+
+
+    fouls = actions[actions["actionType"] == "foul"]
+    who = np.where(np.isnan(fouls["player"]) | (fouls["player"] == 0), fouls["team"], fouls["player"])
+    fouls = fouls.assign(
+        f_id = fouls["prefix"] + "_foul_" + _str_ids(who).to_numpy(),
+        f_ps = _player_stint(ls, on, fouls["team"].to_numpy(), fouls["player"].to_numpy(), fouls["time"].to_numpy()),
+        f_drawn = _player_stint(ls, on, other(fouls["team"]), _ids(fouls["foulDrawnPersonId"]), fouls["time"].to_numpy())
+    )
+    fouls = fouls[(fouls["f_ps"] != "") & ~np.isnan(who)]
+    fouls = fouls.sort_values(["global_clock", "f_id"], kind="stable").drop_duplicates(["f_id", "f_ps", "f_drawn"])
+    cols.update({
+        "foul_id": fouls["f_id"], "foul_ps": fouls["f_ps"], "foul_drawn_ps": fouls["f_drawn"],
+        "foul_global_clock": fouls["global_clock"], "foul_local_clock": fouls["local_clock"],
+    })
+
+
+    shots = actions[actions["actionType"].isin(["2pt", "3pt"]) & ~np.isnan(actions["player"])]
+    shots = shots.assign(
+        s_id = shots["prefix"] + "_shot_" + _str_ids(shots["player"].to_numpy()).to_numpy(),
+        s_ps = _player_stint(ls, on, shots["team"].to_numpy(), shots["player"].to_numpy(), shots["time"].to_numpy()),
+        s_assist = _player_stint(ls, on, shots["team"].to_numpy(), _ids(shots["assistPersonId"]), shots["time"].to_numpy()),
+        s_block = _player_stint(ls, on, other(shots["team"]), _ids(shots["blockPersonId"]), shots["time"].to_numpy())
+    )
+    shots = shots[shots["s_ps"] != ""]
+    shots = shots.sort_values(["global_clock", "s_id"], kind="stable").drop_duplicates(["s_id", "s_ps", "s_assist", "s_block"])
+    cols.update({
+        "shot_id": shots["s_id"], "shot_ps": shots["s_ps"],
+        "shot_assist_ps": shots["s_assist"], "shot_block_ps": shots["s_block"],
+        "shot_global_clock": shots["global_clock"], "shot_local_clock": shots["local_clock"],
+        "shot_x": shots["x"], "shot_y": shots["y"], "shot_distance": shots["shotDistance"],
+        "shot_2pt": shots["actionType"] == "2pt", "shot_3pt": shots["actionType"] == "3pt",
+        "shot_made": shots["shotResult"] == "Made",
+    })
+
+
+    fts = actions[(actions["actionType"] == "freethrow") & ~np.isnan(actions["player"])]
+    subtype = fts["subType"].astype(str)
+    attempt = np.where(
+        subtype.str.contains("of"),
+        pd.to_numeric(subtype.str.split(" ").str[0], errors="coerce"),
+        1
+    )
+    fts = fts.assign(attempt = attempt)
+    fts = fts[~np.isnan(fts["attempt"])]
+    fts = fts.assign(
+        ft_id = fts["prefix"] + "_ft_" + _str_ids(fts["player"].to_numpy()).to_numpy() + "_" + fts["attempt"].astype(int).astype(str),
+        ft_ps = _player_stint(ls, on, fts["team"].to_numpy(), fts["player"].to_numpy(),
+            fts["time"].to_numpy() + fts["attempt"].to_numpy().astype(np.int64) * 100_000_000)
+    )
+    fts = fts[fts["ft_ps"] != ""]
+    fts = fts.sort_values(["global_clock", "ft_id"], kind="stable").drop_duplicates(["ft_id", "ft_ps"])
+    cols.update({
+        "ft_id": fts["ft_id"], "ft_ps": fts["ft_ps"], "ft_foul": np.full(len(fts), "", dtype=object),
+        "ft_global_clock": fts["global_clock"], "ft_local_clock": fts["local_clock"],
+        "ft_made": fts["shotResult"] == "Made",
+    })
+
+    return {k: np.asarray(v) for k, v in cols.items()}
+
+
+def build_from_frames(game_id: int, team_ids: Tuple[int, int], boxscore_df: pd.DataFrame, pbp_df: pd.DataFrame, features: Optional[Dict[str, List]] = None) -> HeteroData:
+    """
+    Offline equivalent of `GameManager.to_pyg`: builds the game graph without touching Neo4j.
+    """
+    return build_game_graph(team_ids, build_columns(game_id, team_ids, boxscore_df, pbp_df, features))
+
+
+def build_from_archive(game_id: int, root: Optional[str] = None, features: Optional[Dict[str, List]] = None) -> HeteroData:
+    team_ids, boxscore_df, pbp_df = load_source(game_id, root)
+    return build_from_frames(game_id, team_ids, boxscore_df, pbp_df, features)
+
+
+def compare_graphs(a: HeteroData, b: HeteroData, atol: float = 1e-3) -> List[str]:
+    """
+    Lists every node/edge store on which two game graphs disagree (empty when they match).
+    """
+    diffs = []
+    for node_type in sorted(set(a.node_types) | set(b.node_types)):
+        if node_type not in a.node_types or node_type not in b.node_types:
+            diffs.append(f"node type {node_type} missing on one side")
+            continue
+        if getattr(a[node_type], "node_id", None) != getattr(b[node_type], "node_id", None):
+            diffs.append(f"{node_type}: node ids differ")
+        if a[node_type].x.shape != b[node_type].x.shape or not torch.allclose(a[node_type].x, b[node_type].x, atol=atol):
+            diffs.append(f"{node_type}: features differ ({tuple(a[node_type].x.shape)} vs {tuple(b[node_type].x.shape)})")
+
+    for edge_type in sorted(set(a.edge_types) | set(b.edge_types)):
+        if edge_type not in a.edge_types or edge_type not in b.edge_types:
+            diffs.append(f"edge type {edge_type} missing on one side")
+        elif not torch.equal(a[edge_type].edge_index, b[edge_type].edge_index):
+            diffs.append(f"{edge_type}: edges differ ({a[edge_type].edge_index.size(1)} vs {b[edge_type].edge_index.size(1)})")
+
+    return diffs
+
+
+def verify_parity(game_id: int, root: Optional[str] = None) -> List[str]:
+    """
+    Compares the database export of an ingested game with the offline build of its archived source.
+    """
+    from .managers.game import GameManager
+    from .managers.features import FeatureStore
+
+    db_graph = GameManager(game_id).to_pyg(use_cache=False)
+    offline_graph = build_from_archive(game_id, root, FeatureStore().game_features(game_id))
+    return compare_graphs(db_graph, offline_graph)
@@ -0,0 +1,156 @@
+# core/cache.py
+import os
+import glob
+import hashlib
+from threading import Lock
+from typing import Optional, TYPE_CHECKING
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from torch_geometric.data import HeteroData
+
+
+_cache = None
+_cache_lock = Lock()
+
+# An eviction frees space down to this fraction of `max_bytes`, so a full cache is not rescanned on every `put`.
+EVICT_TO = 0.9
+
+
+def content_hash(*frames: pd.DataFrame) -> str:
+    """
+    Fingerprints the source frames a game was ingested from.
+    """
+    h = hashlib.sha256()
+    for df in frames:
+        if df is not None:
+            h.update(df.to_json(orient="split", date_format="iso").encode())
+    return h.hexdigest()
+
+
+class GraphCache:
+    """
+    On-disk LRU cache of per-game `HeteroData`, stored as one `.pt` file per
+    (game id, ingest hash, exporter version). The size of the cache is kept as a running total,
+    counted by a scan on the first `put` and by every eviction, which only runs once it exceeds
+    `max_bytes`; the writes of other processes are caught up with at that scan.
+    """
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = Lock()
+        self._bytes = None
+        os.makedirs(self.root, exist_ok=True)
+
+
+    def path(self, game_id: int, ingest_hash: str) -> str:
+        from .pyg import PYG_VERSION
+        return os.path.join(self.root, f"{game_id}_{ingest_hash[:16]}_v{PYG_VERSION}.pt")
+
+
+    def get(self, game_id: int, ingest_hash: Optional[str]) -> Optional["HeteroData"]:
+        if not ingest_hash:
+            return None
+
+        import torch
+
+        path = self.path(game_id, ingest_hash)
+        try:
+            data = torch.load(path, weights_only=False)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ Dropping unreadable cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+        os.utime(path)
+        return data
+
+
+    def put(self, game_id: int, ingest_hash: Optional[str], data: "HeteroData") -> None:
+        if not ingest_hash:
+            return
+
+        import torch
+
+        path = self.path(game_id, ingest_hash)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        torch.save(data, tmp)
+        size, replaced = _size(tmp), _size(path)
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._bytes is not None:
+                self._bytes += size - replaced
+            full = self._bytes is None or self._bytes > self.max_bytes
+        if full:
+            self.evict()
+
+
+    def invalidate(self, game_id: int) -> None:
+        for path in glob.glob(os.path.join(glob.escape(self.root), f"{game_id}_*.pt")):
+            self._remove(path)
+
+
+    def evict(self) -> None:
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.root):
+                if entry.name.endswith(".pt"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                self._bytes = total
+                return
+
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                _unlink(path)
+                total -= size
+            self._bytes = total
+
+
+    def _remove(self, path: str) -> None:
+        size = _size(path)
+        if _unlink(path):
+            with self._lock:
+                if self._bytes is not None:
+                    self._bytes = max(0, self._bytes - size)
+
+
+
+def _size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+
+def _unlink(path: str) -> bool:
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+
+def get_graph_cache() -> GraphCache:
+    global _cache
+
+    if _cache:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            root = os.getenv("MBAI_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mbai-gdb", "pyg"))
+            max_bytes = int(os.getenv("MBAI_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+            _cache = GraphCache(root, max_bytes)
+
+        return _cache
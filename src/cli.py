@@ -0,0 +1,409 @@
+# core/cli.py
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing as mp
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RunLog:
+    """
+    Machine-readable JSONL log of a run: a `start` event, one event per processed item and a
+    closing `summary`, flushed line by line so unattended runs can be tailed and capacity-planned.
+    """
+    def __init__(self, path: str, command: str, args: Dict[str, Any]):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, "a")
+        self.write({"event": "start", "command": command, "args": args})
+
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        self.file.write(json.dumps({"time": time.time(), **entry}, default=str) + "\n")
+        self.file.flush()
+
+
+    def close(self) -> None:
+        self.file.close()
+
+
+
+class Progress:
+    """
+    Live single-line progress: throughput, ETA, failures and the mean latency of the slowest stages.
+    Falls back to one line every `every` items when stdout is not a terminal.
+    """
+    def __init__(self, total: int, unit: str = "games", every: int = 10):
+        self.total = total
+        self.unit = unit
+        self.every = every
+        self.done = 0
+        self.failed = 0
+        self.stages = {}
+        self.start = time.perf_counter()
+        self.tty = sys.stdout.isatty()
+
+
+    def update(self, ok: bool, stages: Optional[Dict[str, float]] = None) -> None:
+        self.done += 1
+        self.failed += 0 if ok else 1
+        for stage, seconds in (stages or {}).items():
+            total, n = self.stages.get(stage, (0.0, 0))
+            self.stages[stage] = (total + seconds, n + 1)
+
+        if self.tty:
+            print(f"\r{self.render()}\033[K", end="", flush=True)
+        elif self.done % self.every == 0 or self.done == self.total:
+            print(self.render(), flush=True)
+
+
+    def rate(self) -> float:
+        elapsed = time.perf_counter() - self.start
+        return 60.0 * self.done / elapsed if elapsed > 0 else 0.0
+
+
+    def stage_means(self) -> Dict[str, float]:
+        return {stage: total / n for stage, (total, n) in self.stages.items()}
+
+
+    def render(self) -> str:
+        rate = self.rate()
+        remaining = (self.total - self.done) / rate * 60.0 if rate > 0 else float("nan")
+        eta = time.strftime("%H:%M:%S", time.gmtime(remaining)) if remaining == remaining else "--:--:--"
+        slowest = sorted(self.stage_means().items(), key=lambda kv: -kv[1])[:4]
+        stages = " ".join(f"{stage} {seconds:.2f}s" for stage, seconds in slowest)
+        return f"[{self.done}/{self.total}] {rate:.1f} {self.unit}/min | ETA {eta} | failed {self.failed} | {stages}"
+
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "event": "summary",
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "elapsed": time.perf_counter() - self.start,
+            "rate_per_min": self.rate(),
+            "stage_mean_seconds": self.stage_means()
+        }
+
+
+    def close(self) -> None:
+        if self.tty:
+            print()
+
+
+
+def _ingest_game(item: Tuple[int, Optional[Dict[str, Any]]], max_attempts: int, backoff: float, defer: List[str], refetch: bool) -> Dict[str, Any]:
+    """
+    Worker entry point: ingests one game with retries, capturing its console output for the run log.
+    `item` pairs the game id with its preloaded teams row, if any.
+    """
+    from .managers.game import GameManager
+
+    game_id, teams = item
+
+    timings = {}
+    out = io.StringIO()
+    start = time.perf_counter()
+    with redirect_stdout(out):
+        try:
+            ok = GameManager.ingest(game_id, max_attempts=max_attempts, backoff=backoff, defer=tuple(defer), timings=timings, teams=teams, refetch=refetch)
+        except Exception as e:
+            print(f"❌ Unexpected Error in `ingest` for ID {game_id}: {e}")
+            ok = False
+
+    return {
+        "event": "game",
+        "game_id": game_id,
+        "ok": ok,
+        "elapsed": time.perf_counter() - start,
+        "stages": timings,
+        "output": out.getvalue().splitlines()[-5:]
+    }
+
+
+def _run_pool(fn, items: List[Any], workers: int, args: tuple, progress: Progress, log: RunLog) -> List[Dict[str, Any]]:
+    results = []
+    if workers <= 1:
+        for item in items:
+            result = fn(item, *args)
+            progress.update(result["ok"], result.get("stages"))
+            log.write(result)
+            results.append(result)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn")) as pool:
+        futures = [pool.submit(fn, item, *args) for item in items]
+        for future in as_completed(futures):
+            result = future.result()
+            progress.update(result["ok"], result.get("stages"))
+            log.write(result)
+            results.append(result)
+
+    return results
+
+
+
+def cmd_ingest(args: argparse.Namespace, log: RunLog) -> int:
+    from .managers.team import TeamManager
+    from .managers.season import SeasonManager
+    from .managers.features import FeatureStore
+    from .managers.game import GameManager
+
+    if args.teams:
+        TeamManager().load_teams()
+    if args.schedule and args.season:
+        SeasonManager().load_games(args.season)
+
+    game_ids = SeasonManager().get_games(args.season, args.start, args.end)
+    print(f"🏀 Ingesting {len(game_ids)} games with {args.workers} worker(s)...")
+
+    # Features fold each game into the state of the previous ones, so with parallel workers they
+    # are deferred and replayed in date order once every game is in.
+    defer = ["features"] if args.workers > 1 else []
+    # The teams and checkpoints of every game are read here in one query per database, so the
+    # workers start writing straight away.
+    preloaded = GameManager.preload(game_ids)
+    items = [(game_id, preloaded.get(game_id)) for game_id in game_ids]
+
+    progress = Progress(len(game_ids))
+    results = _run_pool(_ingest_game, items, args.workers, (args.max_attempts, args.backoff, defer, args.refetch), progress, log)
+    progress.close()
+
+    # A game is only stamped as loaded once its replayed stage is checkpointed, so a failed or
+    # interrupted replay is picked up by the next `ingest`.
+    replay_failed = []
+    if defer:
+        loaded = {r["game_id"] for r in results if r["ok"]}
+        features = FeatureStore()
+        replay = Progress(len(loaded))
+        print(f"📈 Updating features of {len(loaded)} games in date order...")
+        for game_id in game_ids:
+            if game_id not in loaded:
+                continue
+            start = time.perf_counter()
+            try:
+                GameManager(game_id).complete_stage("features", features.update_game, game_id)
+                ok = True
+            except Exception as e:
+                print(f"⚠️ Couldn't update features of game {game_id}: {e}")
+                replay_failed.append(game_id)
+                ok = False
+            stages = {"features": time.perf_counter() - start}
+            replay.update(ok, stages)
+            log.write({"event": "features", "game_id": game_id, "ok": ok, "stages": stages})
+        replay.close()
+
+    summary = progress.summary()
+    summary["features_failed"] = len(replay_failed)
+    log.write(summary)
+    failed = [r["game_id"] for r in results if not r["ok"]]
+    print(f"✅ {summary['done'] - summary['failed']}/{summary['total']} games in {summary['elapsed']:.0f}s ({summary['rate_per_min']:.1f} games/min)")
+    if failed:
+        print(f"❌ Failed games: {', '.join(map(str, failed))}")
+    if replay_failed:
+        print(f"❌ Games without features (run `ingest` again): {', '.join(map(str, replay_failed))}")
+    return 1 if failed or replay_failed else 0
+
+
+def cmd_export_pyg(args: argparse.Namespace, log: RunLog) -> int:
+    from .dataset import SeasonDataset
+
+    start = time.perf_counter()
+    dataset = SeasonDataset(args.root, args.season, args.start, args.end, workers=args.workers, shard_size=args.shard_size)
+    elapsed = time.perf_counter() - start
+
+    summary = {
+        "event": "summary",
+        "total": len(dataset),
+        "elapsed": elapsed,
+        "rate_per_min": 60.0 * len(dataset) / elapsed if elapsed > 0 else 0.0,
+        "processed_dir": dataset.processed_dir
+    }
+    log.write(summary)
+    print(f"✅ {len(dataset)} graphs in {dataset.processed_dir} ({elapsed:.0f}s)")
+    return 0
+
+
+def cmd_export_parquet(args: argparse.Namespace, log: RunLog) -> int:
+    from .export import ParquetExporter
+
+    summary = ParquetExporter(args.root, page_size=args.page_size, overlap=args.overlap).export(full=args.full)
+    log.write({"event": "summary", **summary})
+    mode = "full" if summary["full"] else "incremental"
+    print(f"✅ {mode} export of {summary['games']} games ({summary['nodes']} nodes, {summary['edges']} edges) to {args.root} in {summary['elapsed']:.0f}s")
+    return 0
+
+
+def print_trace_report(report: Dict[str, Any]) -> None:
+    print(f"🔎 {report['games']} games traced ({report['failed_games']} failed), {report['game_seconds']:.0f}s in total")
+    for game in report["slowest_games"]:
+        memory = f", peak {game['peak_memory_bytes'] / 2 ** 20:.0f} MB" if game["peak_memory_bytes"] else ""
+        print(f"   game {game['game_id']}: {game['duration']:.2f}s {game['status']}{memory}")
+    print(f"   {'span':<16} {'count':>6} {'total':>9} {'mean':>8} {'p95':>8} {'rows':>10} {'MB sent':>8} {'peak MB':>8}")
+    for name, stage in report["stages"].items():
+        print(
+            f"   {name:<16} {stage['count']:>6} {stage['total']:>8.1f}s {stage['mean']:>7.2f}s {stage['p95']:>7.2f}s "
+            f"{stage['rows']:>10} {stage['bytes'] / 2 ** 20:>8.1f} {stage['peak_memory_bytes'] / 2 ** 20:>8.1f}"
+        )
+
+
+def cmd_trace_report(args: argparse.Namespace, log: RunLog) -> int:
+    from .tracing import load_spans, trace_report
+
+    report = trace_report(load_spans(args.path), top=args.top)
+    log.write({"event": "summary", **report})
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_trace_report(report)
+    return 0
+
+
+def _verify_game(game_id: int, archive: Optional[str]) -> Dict[str, Any]:
+    from .builder import verify_parity
+
+    start = time.perf_counter()
+    out = io.StringIO()
+    with redirect_stdout(out):
+        try:
+            diffs = verify_parity(game_id, archive)
+        except Exception as e:
+            diffs = [f"error: {e}"]
+
+    return {"event": "game", "game_id": game_id, "ok": not diffs, "diffs": diffs, "stages": {"verify": time.perf_counter() - start}}
+
+
+def cmd_verify(args: argparse.Namespace, log: RunLog) -> int:
+    from .managers.season import SeasonManager
+
+    game_ids = args.game or SeasonManager().get_games(args.season, args.start, args.end)
+    progress = Progress(len(game_ids))
+    results = _run_pool(_verify_game, game_ids, args.workers, (args.archive,), progress, log)
+    progress.close()
+    log.write(progress.summary())
+
+    mismatched = [r for r in results if not r["ok"]]
+    for r in mismatched:
+        print(f"❌ Game {r['game_id']}: {'; '.join(r['diffs'][:5])}")
+    print(f"✅ {len(results) - len(mismatched)}/{len(results)} games match their archived source")
+    return 1 if mismatched else 0
+
+
+
+def _assign_game_uids(game_id: int) -> Dict[str, Any]:
+    from .managers.uids import UidRegistry
+
+    start = time.perf_counter()
+    out = io.StringIO()
+    with redirect_stdout(out):
+        try:
+            assigned, error = UidRegistry().assign_game(game_id), None
+        except Exception as e:
+            assigned, error = {}, str(e)
+
+    return {"event": "game", "game_id": game_id, "ok": error is None, "assigned": assigned, "error": error, "stages": {"uids": time.perf_counter() - start}}
+
+
+def cmd_assign_uids(args: argparse.Namespace, log: RunLog) -> int:
+    from .managers.season import SeasonManager
+
+    game_ids = args.game or SeasonManager().get_games(args.season, args.start, args.end)
+    progress = Progress(len(game_ids))
+    results = _run_pool(_assign_game_uids, game_ids, args.workers, (), progress, log)
+    progress.close()
+    log.write(progress.summary())
+
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        print(f"❌ Game {r['game_id']}: {r['error']}")
+    nodes = sum(n for r in results for n in r["assigned"].values())
+    print(f"✅ {nodes} uids assigned over {len(results) - len(failed)}/{len(results)} games")
+    return 1 if failed else 0
+
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="mbai-gdb", description="MBAI graph database ingestion and export.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_range(sub: argparse.ArgumentParser) -> None:
+        sub.add_argument("--season", help="season id, e.g. 2024-25")
+        sub.add_argument("--from", dest="start", help="first game date (inclusive), YYYY-MM-DD")
+        sub.add_argument("--to", dest="end", help="last game date (inclusive), YYYY-MM-DD")
+        sub.add_argument("--workers", type=int, default=1, help="worker processes (default: 1)")
+        sub.add_argument("--log", help="JSONL run log (default: MBAI_RUN_DIR/<command>-<timestamp>.jsonl)")
+        sub.add_argument("--trace", help="append tracing spans to this JSONL file (or POST them to an http:// collector)")
+
+    ingest = commands.add_parser("ingest", help="load games into the graph")
+    add_range(ingest)
+    ingest.add_argument("--teams", action="store_true", help="load the teams first")
+    ingest.add_argument("--schedule", action="store_true", help="load the season schedule first")
+    ingest.add_argument("--max-attempts", type=int, default=5, help="attempts per game on transient errors")
+    ingest.add_argument("--backoff", type=float, default=2.0, help="base retry delay in seconds")
+    ingest.add_argument("--refetch", action="store_true", help="fetch the source of unfinished ingests again instead of reading the archive")
+    ingest.set_defaults(func=cmd_ingest)
+
+    export = commands.add_parser("export-pyg", help="materialize per-game HeteroData for a season")
+    add_range(export)
+    export.add_argument("--root", required=True, help="dataset root directory")
+    export.add_argument("--shard-size", type=int, default=64, help="graphs per shard file")
+    export.set_defaults(func=cmd_export_pyg)
+
+    parquet = commands.add_parser("export-parquet", help="export the graph as partitioned Parquet tables")
+    parquet.add_argument("--root", required=True, help="output directory")
+    parquet.add_argument("--full", action="store_true", help="export every game, ignoring the watermark")
+    parquet.add_argument("--page-size", type=int, default=50_000, help="nodes per read page and rows per part file")
+    parquet.add_argument("--overlap", type=float, help="seconds before the watermark to re-export (default: MBAI_EXPORT_OVERLAP or 300)")
+    parquet.add_argument("--log", help="JSONL run log (default: MBAI_RUN_DIR/<command>-<timestamp>.jsonl)")
+    parquet.set_defaults(func=cmd_export_parquet)
+
+    verify = commands.add_parser("verify", help="compare ingested games with their archived source")
+    add_range(verify)
+    verify.add_argument("--game", type=int, nargs="+", help="game ids (default: the games of the range)")
+    verify.add_argument("--archive", help="source archive root (default: MBAI_ARCHIVE_DIR)")
+    verify.set_defaults(func=cmd_verify)
+
+    uids = commands.add_parser("assign-uids", help="backfill the global integer ids of games ingested without them")
+    add_range(uids)
+    uids.add_argument("--game", type=int, nargs="+", help="game ids (default: the games of the range)")
+    uids.set_defaults(func=cmd_assign_uids)
+
+    report = commands.add_parser("trace-report", help="summarize a JSONL trace: slowest games and stages")
+    report.add_argument("path", help="trace file written with --trace / MBAI_TRACE")
+    report.add_argument("--top", type=int, default=10, help="slowest games to list")
+    report.add_argument("--json", action="store_true", help="print the report as JSON")
+    report.add_argument("--log", help="JSONL run log (default: MBAI_RUN_DIR/<command>-<timestamp>.jsonl)")
+    report.set_defaults(func=cmd_trace_report)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    options = {k: v for k, v in vars(args).items() if k != "func"}
+    path = args.log or os.path.join(
+        os.getenv("MBAI_RUN_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mbai-gdb", "runs")),
+        f"{args.command}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+    )
+    print(f"📝 Run log: {path}")
+    log = RunLog(path, args.command, options)
+
+    trace = getattr(args, "trace", None)
+    if trace:
+        # Set before any span is opened so spawned workers inherit it.
+        os.environ["MBAI_TRACE"] = trace
+    start = time.time()
+    try:
+        return args.func(args, log)
+    finally:
+        if trace and not trace.startswith(("http://", "https://")) and os.path.exists(trace):
+            from .tracing import load_spans, trace_report
+            report = trace_report([s for s in load_spans(trace) if s["start"] >= start], top=5)
+            log.write({"event": "trace", **report})
+            print_trace_report(report)
+        log.close()
@@ -0,0 +1,169 @@
+# core/dataset.py
+import os
+import math
+import random
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import torch
+from torch.utils.data import Sampler
+from torch_geometric.data import Dataset, HeteroData
+from torch_geometric.loader import DataLoader
+
+from .pyg import PYG_VERSION
+
+
+def _materialize_shard(path: str, game_ids: List[int], pre_transform: Optional[Callable]) -> Tuple[str, List[int], List[int]]:
+    """
+    Worker entry point: builds the graphs of one shard with the worker's own driver and writes them to `path`.
+    """
+    from .managers.game import GameManager
+
+    preloaded = GameManager.preload(game_ids)
+
+    graphs, built, failed = [], [], []
+    for game_id in game_ids:
+        try:
+            data = GameManager(game_id, preloaded.get(game_id)).to_pyg()
+            if pre_transform is not None:
+                data = pre_transform(data)
+            graphs.append(data)
+            built.append(game_id)
+
+        except Exception as e:
+            print(f"⚠️ Skipping game {game_id} in shard {os.path.basename(path)}: {e}")
+            failed.append(game_id)
+
+    torch.save(graphs, path)
+    return path, built, failed
+
+
+
+class ShardSampler(Sampler):
+    """
+    Yields dataset indices shard by shard (shuffling shard order and indices within each shard),
+    so mini-batches only ever touch the shard already loaded in memory.
+    """
+    def __init__(self, dataset: "SeasonDataset", shuffle: bool = False):
+        self.dataset = dataset
+        self.shuffle = shuffle
+
+
+    def __len__(self) -> int:
+        return len(self.dataset)
+
+
+    def __iter__(self) -> Iterator[int]:
+        shards = list(range(len(self.dataset.offsets) - 1))
+        if self.shuffle:
+            random.shuffle(shards)
+
+        for s in shards:
+            indices = list(range(self.dataset.offsets[s], self.dataset.offsets[s + 1]))
+            if self.shuffle:
+                random.shuffle(indices)
+            yield from indices
+
+
+
+class SeasonDataset(Dataset):
+    """
+    On-disk dataset of per-game `HeteroData` for a season and/or date range.
+    Graphs are materialized once by a pool of worker processes into sharded files under `root/processed_v{PYG_VERSION}`.
+    """
+    def __init__(
+        self,
+        root: str,
+        season_id: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        workers: Optional[int] = None,
+        shard_size: int = 64,
+        transform: Optional[Callable] = None,
+        pre_transform: Optional[Callable] = None
+    ):
+        self.season_id = season_id
+        self.start = start
+        self.end = end
+        self.workers = workers or os.cpu_count()
+        self.shard_size = shard_size
+        self._loaded = (None, None)
+
+        super().__init__(root, transform, pre_transform)
+
+        manifest = torch.load(self.processed_paths[0], weights_only=False)
+        self.game_ids = manifest["game_ids"]
+        self.shards = manifest["shards"]
+        self.offsets = manifest["offsets"]
+
+
+    @property
+    def raw_file_names(self) -> List[str]:
+        return []
+
+
+    @property
+    def processed_file_names(self) -> List[str]:
+        return ["manifest.pt"]
+
+
+    @property
+    def processed_dir(self) -> str:
+        key = "_".join(str(k) for k in (self.season_id or "all", self.start or "min", self.end or "max"))
+        return os.path.join(self.root, f"processed_v{PYG_VERSION}", key)
+
+
+    def download(self) -> None:
+        pass
+
+
+    def process(self) -> None:
+        from .managers.season import SeasonManager
+
+        game_ids = SeasonManager().get_games(self.season_id, self.start, self.end)
+        n_shards = math.ceil(len(game_ids) / self.shard_size)
+        tasks = [
+            (os.path.join(self.processed_dir, f"shard_{i:05d}.pt"), game_ids[i * self.shard_size:(i + 1) * self.shard_size])
+            for i in range(n_shards)
+        ]
+        print(f"🏗️ Materializing {len(game_ids)} games into {n_shards} shards with {self.workers} workers...")
+
+        results = {}
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=get_context("spawn")) as pool:
+            futures = [pool.submit(_materialize_shard, path, ids, self.pre_transform) for path, ids in tasks]
+            for future in as_completed(futures):
+                path, built, failed = future.result()
+                results[path] = built
+                if failed:
+                    print(f"⚠️ {len(failed)} games failed in {os.path.basename(path)}")
+
+        shards, built_ids, offsets = [], [], [0]
+        for path, _ in tasks:
+            shards.append(os.path.basename(path))
+            built_ids.extend(results[path])
+            offsets.append(offsets[-1] + len(results[path]))
+
+        manifest = {"game_ids": built_ids, "shards": shards, "offsets": offsets}
+        torch.save(manifest, self.processed_paths[0])
+
+
+    def len(self) -> int:
+        return self.offsets[-1]
+
+
+    def get(self, idx: int) -> HeteroData:
+        shard = bisect_right(self.offsets, idx) - 1
+        if self._loaded[0] != shard:
+            path = os.path.join(self.processed_dir, self.shards[shard])
+            self._loaded = (shard, torch.load(path, weights_only=False))
+
+        return self._loaded[1][idx - self.offsets[shard]]
+
+
+    def loader(self, batch_size: int = 32, shuffle: bool = False, **kwargs) -> DataLoader:
+        """
+        Mini-batch loader collating games into a single batched `HeteroData`, reading shard by shard.
+        """
+        return DataLoader(self, batch_size=batch_size, sampler=ShardSampler(self, shuffle), **kwargs)
@@ -2,6 +2,7 @@
 import os
 from dotenv import load_dotenv
 from threading import Lock
+from typing import Iterable, List, Optional
 from neo4j import GraphDatabase
 
 
@@ -38,4 +39,53 @@ def close_driver():
         if _driver:
             _driver.close()
             _driver = None
-            print("🔌 Neo4j Connection Closed")
\ No newline at end of file
+            print("🔌 Neo4j Connection Closed")
+
+
+
+def partitioned() -> bool:
+    """
+    Whether each season lives in its own database (`MBAI_PARTITION=season`, Neo4j Enterprise).
+    """
+    return os.getenv("MBAI_PARTITION", "").lower() == "season"
+
+
+def season_of_game(game_id: int) -> str:
+    """
+    The season of an NBA game id: digits 4-5 of its 10-digit form hold the season's first year
+    (e.g. 0022400001 -> "2024-25").
+    """
+    year = int(f"{int(game_id):010d}"[3:5])
+    year += 1900 if year >= 46 else 2000
+    return f"{year}-{(year + 1) % 100:02d}"
+
+
+def season_database(season_id: Optional[str]) -> Optional[str]:
+    """
+    The database holding a season, or None (the default database) when storage isn't partitioned.
+    """
+    if season_id is None or not partitioned():
+        return None
+    return f"{os.getenv('MBAI_DATABASE_PREFIX', 'mbai')}-{season_id}"
+
+
+def game_database(game_id: int) -> Optional[str]:
+    return season_database(season_of_game(game_id)) if partitioned() else None
+
+
+def season_databases(season_ids: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    The existing season databases, in season order, optionally restricted to `season_ids`.
+    Without partitioning this is just the default database (None).
+    """
+    if not partitioned():
+        return [None]
+
+    prefix = f"{os.getenv('MBAI_DATABASE_PREFIX', 'mbai')}-"
+    with get_driver().session(database="system") as session:
+        names = {row["name"] for row in session.run("SHOW DATABASES YIELD name WHERE name STARTS WITH $prefix RETURN DISTINCT name", prefix=prefix)}
+
+    if season_ids is not None:
+        names &= {season_database(season_id) for season_id in season_ids}
+    return sorted(names)
+
@@ -0,0 +1,339 @@
+# core/export.py
+import os
+import json
+import time
+import shutil
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from neo4j.time import Date, DateTime, Duration
+
+from .manager import BaseManager
+from .driver import partitioned, season_of_game, season_databases
+from .queries.export import \
+    GAME_LABELS, DIMENSION_LABELS, NODE_LABELS, \
+    GET_EXPORT_GAMES, GET_GAME_NODES, GET_GAME_LABEL_NODES, GET_DIMENSION_NODES, \
+    GET_GAME_EDGES, GET_DIMENSION_EDGES
+
+
+EXPORT_VERSION = 1
+
+# Keyset pagination starts below every id: integer ids for Teams and Players, strings otherwise.
+FIRST_ID = {"Team": -2 ** 63, "Player": -2 ** 63}
+
+
+def surrogate_keys(labels: pd.Series, ids: pd.Series) -> np.ndarray:
+    """
+    Stable 64-bit integer keys of nodes, hashed from their label and natural id. They are the same
+    in every export, so incremental exports join with the earlier ones without a mapping table.
+    """
+    names = labels.astype(str) + ":" + ids.astype(str)
+    return pd.util.hash_array(names.to_numpy(dtype=object)).view(np.int64)
+
+
+def flatten_properties(properties: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    One column per property: datetimes as UTC timestamps, dates as dates, durations as seconds.
+    """
+    frame = pd.DataFrame.from_records(properties)
+    for name in frame.columns:
+        values = frame[name]
+        sample = values.dropna()
+        if sample.empty:
+            continue
+        first = sample.iloc[0]
+        if isinstance(first, DateTime):
+            frame[name] = pd.to_datetime([v.to_native() if v is not None else None for v in values], utc=True)
+        elif isinstance(first, Date):
+            frame[name] = [v.to_native() if v is not None else None for v in values]
+        elif isinstance(first, Duration):
+            frame[name] = [
+                v.months * 2_629_746 + v.days * 86_400 + v.seconds + v.nanoseconds / 1e9 if v is not None else np.nan
+                for v in values
+            ]
+    return frame
+
+
+def node_frame(label: str, rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    The rows of a node page as a table: surrogate `key`, natural `id`, the secondary `labels` as a
+    list (e.g. an Action's `Shot`, `Made`, `Jump Shot`) and the flattened properties.
+    """
+    ids = pd.Series([row["id"] for row in rows])
+    frame = pd.DataFrame({
+        "key": surrogate_keys(pd.Series(label, index=ids.index), ids),
+        "id": ids,
+        "labels": [sorted(l for l in row["labels"] if l != label) for row in rows]
+    })
+    props = flatten_properties([row["properties"] for row in rows]).drop(columns=["id"], errors="ignore")
+    return pd.concat([frame, props], axis=1)
+
+
+def edge_frames(rows: List[Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """
+    The edges of a node page as one table per relationship type, keyed by the endpoints' surrogate keys.
+    """
+    edges = pd.DataFrame.from_records(rows, columns=["type", "src_label", "src_id", "dst_label", "dst_id", "properties"])
+    edges.insert(0, "src_key", surrogate_keys(edges["src_label"], edges["src_id"]))
+    edges.insert(1, "dst_key", surrogate_keys(edges["dst_label"], edges["dst_id"]))
+    props = flatten_properties(edges.pop("properties").tolist())
+    edges = pd.concat([edges, props], axis=1)
+    return {rel: group.drop(columns="type").dropna(axis=1, how="all") for rel, group in edges.groupby("type")}
+
+
+def arrow_table(frame: pd.DataFrame) -> pa.Table:
+    """
+    Converts a frame to Arrow, falling back on strings for the rare property of mixed types.
+    """
+    try:
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        columns = {}
+        for name in frame.columns:
+            try:
+                columns[name] = pa.array(frame[name], from_pandas=True)
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                columns[name] = pa.array([None if v is None else str(v) for v in frame[name]], pa.string())
+        return pa.table(columns)
+
+
+
+class PartitionWriter:
+    """
+    Buffers the pages of each dataset of a partition and writes them as Parquet part files of about
+    `flush_rows` rows, so a partition is a handful of files rather than one per page.
+    """
+    def __init__(self, root: str, partition: str, flush_rows: int):
+        self.root = root
+        self.partition = partition
+        self.flush_rows = flush_rows
+        self.buffers = {}
+        self.parts = {}
+        self.rows = {"nodes": 0, "edges": 0}
+
+
+    def add(self, kind: str, name: str, frame: pd.DataFrame) -> None:
+        if frame.empty:
+            return
+        key = (kind, name)
+        frames = self.buffers.setdefault(key, [])
+        frames.append(frame)
+        self.rows[kind] += len(frame)
+        if sum(len(f) for f in frames) >= self.flush_rows:
+            self.flush(key)
+
+
+    def flush(self, key) -> None:
+        frames = self.buffers.pop(key, [])
+        if not frames:
+            return
+        kind, name = key
+        directory = os.path.join(self.root, kind, name, self.partition)
+        os.makedirs(directory, exist_ok=True)
+        part = self.parts.get(key, 0)
+        self.parts[key] = part + 1
+        pq.write_table(arrow_table(pd.concat(frames, ignore_index=True)), os.path.join(directory, f"part-{part:05d}.parquet"))
+
+
+    def close(self) -> None:
+        for key in list(self.buffers):
+            self.flush(key)
+
+
+
+class ParquetExporter(BaseManager):
+    """
+    Exports the graph as Parquet datasets for DuckDB / Spark, under `root`:
+
+    - `games/nodes/<Label>/partition_season=<season>/partition_date=<date>/` for Games and their Periods, stints,
+      Actions, Scores, Possessions and per-game stats;
+    - `games/edges/<TYPE>/partition_season=<season>/partition_date=<date>/` for every relationship of those nodes;
+    - `dimensions/nodes/<Label>/` and `dimensions/edges/<TYPE>/` for the shared Seasons, Teams,
+      Players, LineUps and places (with a `partition_season=` level under season partitioning).
+      The partition columns are prefixed so they never clash with a property such as `Game.date`.
+
+    Nodes are read in keyset pages over the id index and carry a stable integer `key`; edges
+    reference them by `src_key` / `dst_key`. Incremental runs only rewrite the date partitions of
+    the games ingested since the watermark of the previous run, less `overlap` seconds
+    (`MBAI_EXPORT_OVERLAP`, default 300): `ingested_at` is stamped when the ingest's statement
+    starts, not when it commits, so a game committed during the previous run may carry an older
+    stamp than the watermark. Partitions are rewritten whole, so exporting one twice is harmless.
+    """
+
+    def __init__(self, root: str, page_size: int = 50_000, overlap: Optional[float] = None):
+        super().__init__()
+        self.root = root
+        self.page_size = page_size
+        self.overlap = float(os.getenv("MBAI_EXPORT_OVERLAP", 300)) if overlap is None else overlap
+
+
+    @property
+    def watermark_path(self) -> str:
+        return os.path.join(self.root, "_watermark.json")
+
+
+    def watermark(self) -> Optional[int]:
+        """
+        `Game.ingested_at` (epoch ms) of the latest game in the export, or None before a first
+        export or after a change of the export format.
+        """
+        try:
+            with open(self.watermark_path) as f:
+                state = json.load(f)
+        except FileNotFoundError:
+            return None
+
+        if state.get("version") != EXPORT_VERSION:
+            return None
+        return state["ingested_at"]
+
+
+    def export(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Exports the games ingested since the watermark (every game when `full` or without one),
+        rewriting their date partitions whole, then the dimension tables. Returns the run summary.
+        """
+        start = time.perf_counter()
+        watermark = None if full else self.watermark()
+        staging = os.path.join(self.root, ".staging")
+        shutil.rmtree(staging, ignore_errors=True)
+
+        summary = {"games": 0, "partitions": 0, "nodes": 0, "edges": 0, "full": watermark is None}
+        latest = watermark or 0
+        exported = set()
+
+        for database in season_databases():
+            games = pd.DataFrame(self.execute_read(GET_EXPORT_GAMES, database=database), columns=["game_id", "date", "ingested_at"])
+            if games.empty:
+                continue
+
+            games["season"] = [season_of_game(game_id) for game_id in games["game_id"]]
+            changed = games if watermark is None else games[games["ingested_at"] > watermark - int(self.overlap * 1000)]
+            partitions = changed[["season", "date"]].drop_duplicates().itertuples(index=False)
+
+            for season_id, date in partitions:
+                game_ids = games[(games["season"] == season_id) & (games["date"] == date)]["game_id"].tolist()
+                partition = os.path.join(f"partition_season={season_id}", f"partition_date={date}")
+                rows = self._export_games(database, game_ids, os.path.join(staging, "games"), partition)
+                self._publish(os.path.join(staging, "games"), os.path.join(self.root, "games"), partition)
+                exported.add(partition)
+
+                summary["games"] += len(game_ids)
+                summary["partitions"] += 1
+                summary["nodes"] += rows["nodes"]
+                summary["edges"] += rows["edges"]
+                print(f"📦 {partition}: {len(game_ids)} games, {rows['nodes']} nodes, {rows['edges']} edges")
+
+            latest = max(latest, int(games["ingested_at"].max()))
+
+        if watermark is None:
+            self._drop_stale(os.path.join(self.root, "games"), exported)
+
+        rows = self._export_dimensions(os.path.join(staging, "dimensions"))
+        shutil.rmtree(os.path.join(self.root, "dimensions"), ignore_errors=True)
+        os.makedirs(self.root, exist_ok=True)
+        if os.path.isdir(os.path.join(staging, "dimensions")):
+            os.replace(os.path.join(staging, "dimensions"), os.path.join(self.root, "dimensions"))
+        shutil.rmtree(staging, ignore_errors=True)
+
+        summary["nodes"] += rows["nodes"]
+        summary["edges"] += rows["edges"]
+        summary["elapsed"] = time.perf_counter() - start
+        summary["ingested_at"] = latest
+
+        tmp = f"{self.watermark_path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": EXPORT_VERSION, "ingested_at": latest, "exported_at": time.strftime("%Y-%m-%dT%H:%M:%S%z")}, f)
+        os.replace(tmp, self.watermark_path)
+
+        return summary
+
+
+    def _pages(self, query: str, params: Dict[str, Any], after: Any, database: Optional[str]) -> Iterator[List[Dict[str, Any]]]:
+        while True:
+            rows = self.execute_read(query, {**params, "after": after, "page_size": self.page_size}, database=database)
+            if rows:
+                yield rows
+            if len(rows) < self.page_size:
+                return
+            after = rows[-1]["id"]
+
+
+    def _export_games(self, database: Optional[str], game_ids: List[int], root: str, partition: str) -> Dict[str, int]:
+        writer = PartitionWriter(root, partition, self.page_size)
+
+        def add(label: str, rows: List[Dict[str, Any]]) -> None:
+            writer.add("nodes", label, node_frame(label, rows))
+            edges = self.execute_read(GET_GAME_EDGES[label], {"ids": [row["id"] for row in rows], "labels": NODE_LABELS}, database=database)
+            for rel, frame in edge_frames(edges).items():
+                writer.add("edges", rel, frame)
+
+        games = self.execute_read(GET_GAME_NODES, {"game_ids": game_ids}, database=database)
+        if games:
+            add("Game", games)
+
+        for label in GAME_LABELS:
+            for game_id in game_ids:
+                for rows in self._pages(GET_GAME_LABEL_NODES[label], {"prefix": f"{game_id}_"}, "", database):
+                    add(label, rows)
+
+        writer.close()
+        return writer.rows
+
+
+    def _export_dimensions(self, root: str) -> Dict[str, int]:
+        rows = {"nodes": 0, "edges": 0}
+        for database in season_databases():
+            partition = f"partition_season={'-'.join(database.rsplit('-', 2)[1:])}" if partitioned() else ""
+            writer = PartitionWriter(root, partition, self.page_size)
+
+            for label, key in DIMENSION_LABELS.items():
+                for page in self._pages(GET_DIMENSION_NODES[label], {}, FIRST_ID.get(label, ""), database):
+                    writer.add("nodes", label, node_frame(label, page))
+                    edges = self.execute_read(GET_DIMENSION_EDGES[label], {"ids": [row["id"] for row in page], "labels": NODE_LABELS}, database=database)
+                    for rel, frame in edge_frames(edges).items():
+                        writer.add("edges", rel, frame)
+
+            writer.close()
+            rows["nodes"] += writer.rows["nodes"]
+            rows["edges"] += writer.rows["edges"]
+        return rows
+
+
+    def _publish(self, staging: str, root: str, partition: str) -> None:
+        """
+        Swaps the staged partition in for the published one, in every dataset, including those the
+        new export no longer has rows for.
+        """
+        for kind in ["nodes", "edges"]:
+            names = set()
+            for base in [staging, root]:
+                if os.path.isdir(os.path.join(base, kind)):
+                    names.update(os.listdir(os.path.join(base, kind)))
+
+            for name in names:
+                target = os.path.join(root, kind, name, partition)
+                source = os.path.join(staging, kind, name, partition)
+                shutil.rmtree(target, ignore_errors=True)
+                if os.path.isdir(source):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(source, target)
+
+
+    def _drop_stale(self, root: str, exported: set) -> None:
+        """
+        After a full export, removes the partitions of games no longer in the graph.
+        """
+        for kind in ["nodes", "edges"]:
+            base = os.path.join(root, kind)
+            if not os.path.isdir(base):
+                continue
+            for name in os.listdir(base):
+                for season in os.listdir(os.path.join(base, name)):
+                    for date in os.listdir(os.path.join(base, name, season)):
+                        if os.path.join(season, date) not in exported:
+                            print(f"🧹 Removing stale partition {kind}/{name}/{season}/{date}")
+                            shutil.rmtree(os.path.join(base, name, season, date), ignore_errors=True)
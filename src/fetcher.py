@@ -1,5 +1,7 @@
+import os
+import json
 import pandas as pd
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 from time import sleep
 
 from nba_api.stats.static import teams
@@ -86,21 +88,20 @@ def fetch_schedule(season_id) -> List[Dict]:
 
 
 def fetch_boxscore(game_id: int) -> pd.DataFrame:
-    data = None
-    try:
-        boxscore = BoxScoreTraditionalV2(game_id=f"00{game_id}")
-        data = boxscore.get_data_frames()[0]
-    except Exception as e:
-        print(f": {e}.")
-    finally:
-        return data
-    
+    # Errors propagate, so that network failures reach `GameManager.ingest`'s retries.
+    boxscore = BoxScoreTraditionalV2(game_id=f"00{game_id}")
+    return boxscore.get_data_frames()[0]
 
 
-def fetch_pbp(game_id: int) -> pd.DataFrame:
+
+def fetch_pbp_raw(game_id: int) -> pd.DataFrame:
     pbp = PlayByPlay(game_id=f"00{game_id}").get_dict()
-    df = pd.DataFrame(pbp["game"]["actions"])
+    return pd.DataFrame(pbp["game"]["actions"])
+
+
 
+def normalize_pbp(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy()
     id_cols = df.filter(regex="Id$").columns
     df[id_cols] = df[id_cols].astype("UInt32")
     df["timeActual"] = pd.to_datetime(df["timeActual"])
@@ -112,4 +113,55 @@ def fetch_pbp(game_id: int) -> pd.DataFrame:
     df["y"] = df["y"].astype("float16")
     df["shotDistance"] = df["shotDistance"].astype("float16")
 
-    return df.sort_values(by="timeActual", ascending=True).fillna(-1, axis=1)
\ No newline at end of file
+    return df.sort_values(by="timeActual", ascending=True).fillna(-1, axis=1)
+
+
+
+def fetch_pbp(game_id: int) -> pd.DataFrame:
+    return normalize_pbp(fetch_pbp_raw(game_id))
+
+
+
+def archive_dir(game_id: int, root: Optional[str] = None) -> str:
+    root = root or os.getenv("MBAI_ARCHIVE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mbai-gdb", "source"))
+    return os.path.join(root, str(game_id))
+
+
+
+def archive_source(game_id: int, team_ids: Tuple[int, int], boxscore_df: pd.DataFrame, pbp_raw_df: pd.DataFrame, root: Optional[str] = None, ingest_hash: Optional[str] = None) -> str:
+    """
+    Stores the raw source frames of a game as Parquet, so it can be rebuilt without hitting NBA_API again.
+    The `ingest_hash` of the fetched frames is kept alongside, so a resumed ingest matches its checkpoints.
+    """
+    path = archive_dir(game_id, root)
+    os.makedirs(path, exist_ok=True)
+    boxscore_df.to_parquet(os.path.join(path, "boxscore.parquet"), index=False)
+    pbp_raw_df.to_parquet(os.path.join(path, "pbp.parquet"), index=False)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump({"game_id": game_id, "team_ids": [int(t) for t in team_ids], "ingest_hash": ingest_hash}, f)
+    return path
+
+
+
+def archive_meta(game_id: int, root: Optional[str] = None) -> Optional[Dict]:
+    """
+    The metadata of an archived game, or None if the game was never archived.
+    """
+    try:
+        with open(os.path.join(archive_dir(game_id, root), "meta.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+
+def load_source(game_id: int, root: Optional[str] = None) -> Tuple[Tuple[int, int], pd.DataFrame, pd.DataFrame]:
+    """
+    Reads an archived game back as (team_ids, boxscore, normalized play-by-play).
+    """
+    path = archive_dir(game_id, root)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    boxscore_df = pd.read_parquet(os.path.join(path, "boxscore.parquet"))
+    pbp_df = normalize_pbp(pd.read_parquet(os.path.join(path, "pbp.parquet")))
+    return tuple(meta["team_ids"]), boxscore_df, pbp_df
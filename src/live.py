@@ -0,0 +1,260 @@
+# core/live.py
+
+from typing import Any, Dict, Optional, Sequence, Tuple, TYPE_CHECKING
+import numpy as np
+
+import torch
+from torch_geometric.data import HeteroData
+
+from .transform import PLAYER_FEATURES, LINEUP_FEATURES
+from .queries.game import GET_GAME_GRAPH_SINCE
+
+if TYPE_CHECKING:
+    from .managers.game import GameManager
+
+
+# node type -> width of `x`, as built by `pyg.build_game_graph`
+NODE_WIDTHS = {
+    "period": 1,
+    "lineup": LINEUP_FEATURES + 1,
+    "player": PLAYER_FEATURES + 1,
+    "lineup_stint": 3,
+    "player_stint": 3,
+    "foul": 2,
+    "shot": 8,
+    "freethrow": 3,
+}
+
+
+class _Nodes:
+    """
+    The nodes of one type: an id -> index map and a feature buffer with spare capacity, so
+    appending k nodes costs O(k) amortized. Rows of known ids are overwritten in place.
+    """
+    def __init__(self, width: int):
+        self.index = {}
+        self.ids = []
+        self.uids = []
+        self.x = np.zeros((16, width), dtype=np.float32)
+
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+    def upsert(self, ids: Sequence[Any], x: Optional[np.ndarray] = None, uids: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        The indices of `ids`, appending the unknown ones; with `x` (and `uids`), their rows are (re)written.
+        """
+        codes = np.empty(len(ids), dtype=np.int64)
+        for i, node_id in enumerate(ids):
+            code = self.index.get(node_id)
+            if code is None:
+                code = self.index[node_id] = len(self.ids)
+                self.ids.append(node_id)
+                self.uids.append(-1)
+            if uids is not None:
+                self.uids[code] = uids[i]
+            codes[i] = code
+
+        if len(self.ids) > self.x.shape[0]:
+            grown = np.zeros((max(len(self.ids), 2 * self.x.shape[0]), self.x.shape[1]), dtype=np.float32)
+            grown[:self.x.shape[0]] = self.x
+            self.x = grown
+        if x is not None and codes.size:
+            self.x[codes] = x
+        return codes
+
+
+    def lookup(self, ids: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (codes, mask) of `ids`, as `pyg.lookup`: unknown ids and "" (no such node) are masked out.
+        """
+        codes = np.array([self.index.get(node_id, -1) for node_id in ids], dtype=np.int64)
+        return codes.clip(min=0), codes >= 0
+
+
+    def view(self) -> torch.Tensor:
+        return torch.from_numpy(self.x[:len(self.ids)])
+
+
+
+class _Edges:
+    """
+    The edges of one type, deduplicated, in a growable [2, capacity] buffer (in arrival order).
+    """
+    def __init__(self):
+        self.seen = set()
+        self.pairs = np.zeros((2, 64), dtype=np.int64)
+        self.n = 0
+
+
+    def add(self, src: np.ndarray, dst: np.ndarray, mask: Optional[np.ndarray] = None) -> int:
+        if mask is not None:
+            src, dst = src[mask], dst[mask]
+
+        new = []
+        for pair in zip(np.asarray(src, dtype=np.int64).tolist(), np.asarray(dst, dtype=np.int64).tolist()):
+            if pair not in self.seen:
+                self.seen.add(pair)
+                new.append(pair)
+        if not new:
+            return 0
+
+        if self.n + len(new) > self.pairs.shape[1]:
+            grown = np.zeros((2, max(self.n + len(new), 2 * self.pairs.shape[1])), dtype=np.int64)
+            grown[:, :self.n] = self.pairs[:, :self.n]
+            self.pairs = grown
+        self.pairs[:, self.n:self.n + len(new)] = np.asarray(new, dtype=np.int64).T
+        self.n += len(new)
+        return len(new)
+
+
+    def view(self) -> torch.Tensor:
+        return torch.from_numpy(self.pairs[:, :self.n])
+
+
+
+class LiveGameGraph:
+    """
+    The `to_pyg` graph of a game in progress, kept up to date by `update`: each call reads only the
+    stints still open at the watermark and the stints and actions after it, then appends their
+    nodes and edges and rewrites the rows that changed (an open stint's duration), so the cost of a
+    refresh follows the new events rather than the game length.
+    The ingest writes actions type by type, so a refresh in the middle of it may see later fouls
+    before earlier shots. The watermark therefore only moves to the largest global clock seen once
+    the ingest has checkpointed `next_action` (every action is in); until then refreshes re-read
+    from the previous watermark, and rows already in the graph are deduplicated by id.
+    Node features, indices and uids match `build_game_graph`; edges come in arrival order, not sorted.
+    `data` is updated in place and its tensors are views, valid until the next `update`.
+    """
+    def __init__(self, manager: "GameManager"):
+        self.manager = manager
+        self.since = float("-inf")
+        self.nodes = {node_type: _Nodes(width) for node_type, width in NODE_WIDTHS.items()}
+        self.edges = {}
+
+        self.data = HeteroData()
+        self.data['game'].x = torch.tensor([[1.0]], dtype=torch.float)
+        self.data['team'].x = torch.eye(2)
+        self.data['game'].uid = torch.tensor([-1], dtype=torch.long)
+        self.data['team'].uid = torch.tensor([-1, -1], dtype=torch.long)
+        self.data['team', 'played_home', 'game'].edge_index = torch.tensor([[0], [0]], dtype=torch.long)
+        self.data['team', 'played_away', 'game'].edge_index = torch.tensor([[1], [0]], dtype=torch.long)
+
+        self.update()
+
+
+    def _edges(self, edge_type: Tuple[str, str, str], src: np.ndarray, dst: np.ndarray, mask: Optional[np.ndarray] = None) -> int:
+        return self.edges.setdefault(edge_type, _Edges()).add(src, dst, mask)
+
+
+    def update(self) -> Dict[str, int]:
+        """
+        Pulls what changed since the watermark into `data`. Returns the number of rows read and
+        of nodes and edges added.
+        """
+        params = {"game_id": self.manager.game_id, "since": self.since if np.isfinite(self.since) else -1e18}
+        result = self.manager.execute_read(GET_GAME_GRAPH_SINCE, params)
+        if not result:
+            raise ValueError(f"Game {self.manager.game_id} not found in database!")
+        cols = result[0]
+
+        def uids(name: str) -> Optional[Sequence[int]]:
+            # collect() drops nulls: a uid column shorter than its id column has unassigned uids.
+            column = cols.get(f"{name}_uid", [])
+            return column if len(column) == len(cols[f"{name}_id"]) else None
+
+        if cols.get('g_uid') is not None and None not in cols.get('team_uid', [None]):
+            self.data['game'].uid = torch.tensor([cols['g_uid']], dtype=torch.long)
+            self.data['team'].uid = torch.tensor(cols['team_uid'], dtype=torch.long)
+
+        before = {node_type: len(nodes) for node_type, nodes in self.nodes.items()}
+        added_edges = 0
+        home_id = self.manager.team_ids[0]
+
+        ls_x = np.column_stack([cols['ls_global_clock'], cols['ls_local_clock'], cols['ls_duration']]) if cols['ls_id'] else None
+        ps_x = np.column_stack([cols['ps_global_clock'], cols['ps_local_clock'], cols['ps_duration']]) if cols['ps_id'] else None
+        q_idx = self.nodes['period'].upsert(cols['q_id'], np.asarray(cols['q_n'], dtype=np.float32).reshape(-1, 1), uids('q'))
+        l_idx = self.nodes['lineup'].upsert(cols['l_id'], uids=uids('l'))
+        p_idx = self.nodes['player'].upsert(cols['p_id'], uids=uids('p'))
+        ls_idx = self.nodes['lineup_stint'].upsert(cols['ls_id'], ls_x, uids('ls'))
+        ps_idx = self.nodes['player_stint'].upsert(cols['ps_id'], ps_x, uids('ps'))
+        t_idx = np.where(np.asarray(cols['t_id']) == home_id, 0, 1)
+
+        # Newly seen lineups and players start as in `attach`: 1.0 then zeros, until their state arrives.
+        for node_type, ids, rows, width in [
+            ('lineup', cols.get('lf_id', []), cols.get('lf_x', []), LINEUP_FEATURES),
+            ('player', cols.get('pf_id', []), cols.get('pf_x', []), PLAYER_FEATURES),
+        ]:
+            nodes = self.nodes[node_type]
+            nodes.x[before[node_type]:len(nodes), 0] = 1.0
+            codes, mask = nodes.lookup(ids)
+            if mask.any():
+                nodes.x[codes[mask], 1:] = np.asarray(rows, dtype=np.float32).reshape(-1, width)[mask]
+
+        added_edges += self._edges(('period', 'in_game', 'game'), q_idx, np.zeros(q_idx.size))
+        added_edges += self._edges(('team', 'has_lineup', 'lineup'), t_idx, l_idx)
+        added_edges += self._edges(('player', 'member_of', 'lineup'), p_idx, l_idx)
+        added_edges += self._edges(('lineup', 'on_court', 'lineup_stint'), l_idx, ls_idx)
+        added_edges += self._edges(('player', 'on_court', 'player_stint'), p_idx, ps_idx)
+        added_edges += self._edges(('player_stint', 'on_court_with', 'lineup_stint'), ps_idx, ls_idx)
+        added_edges += self._edges(('lineup_stint', 'in_period', 'period'), ls_idx, q_idx)
+        added_edges += self._edges(('player_stint', 'in_period', 'period'), ps_idx, q_idx)
+
+        for edge_type, nodes, src_col, dst_col in [
+            (('lineup_stint', 'next', 'lineup_stint'), self.nodes['lineup_stint'], 'ls_next_src', 'ls_next_dst'),
+            (('player_stint', 'next', 'player_stint'), self.nodes['player_stint'], 'ps_next_src', 'ps_next_dst'),
+            (('lineup_stint', 'on_court_next', 'lineup_stint'), self.nodes['lineup_stint'], 'ocn_src', 'ocn_dst'),
+        ]:
+            src, src_mask = nodes.lookup(cols[src_col])
+            dst, dst_mask = nodes.lookup(cols[dst_col])
+            added_edges += self._edges(edge_type, src, dst, src_mask & dst_mask)
+
+        stints = self.nodes['player_stint']
+        foul_x = np.column_stack([cols['foul_global_clock'], cols['foul_local_clock']]) if cols['foul_id'] else None
+        foul_idx = self.nodes['foul'].upsert(cols['foul_id'], foul_x, uids('foul'))
+        for edge_type, col in [(('player_stint', 'committed_foul', 'foul'), 'foul_ps'), (('player_stint', 'drew_foul', 'foul'), 'foul_drawn_ps')]:
+            ps, mask = stints.lookup(cols[col])
+            added_edges += self._edges(edge_type, ps, foul_idx, mask)
+
+        shot_x = np.column_stack([
+            cols['shot_global_clock'], cols['shot_local_clock'],
+            cols['shot_x'], cols['shot_y'], cols['shot_distance'],
+            cols['shot_2pt'], cols['shot_3pt'], cols['shot_made']
+        ]).astype(np.float32) if cols['shot_id'] else None
+        shot_idx = self.nodes['shot'].upsert(cols['shot_id'], shot_x, uids('shot'))
+        for edge_type, col in [
+            (('player_stint', 'took_shot', 'shot'), 'shot_ps'),
+            (('player_stint', 'assisted', 'shot'), 'shot_assist_ps'),
+            (('player_stint', 'blocked', 'shot'), 'shot_block_ps'),
+        ]:
+            ps, mask = stints.lookup(cols[col])
+            added_edges += self._edges(edge_type, ps, shot_idx, mask)
+
+        ft_x = np.column_stack([cols['ft_global_clock'], cols['ft_local_clock'], cols['ft_made']]).astype(np.float32) if cols['ft_id'] else None
+        ft_idx = self.nodes['freethrow'].upsert(cols['ft_id'], ft_x, uids('ft'))
+        ps, mask = stints.lookup(cols['ft_ps'])
+        added_edges += self._edges(('player_stint', 'took_shot', 'freethrow'), ps, ft_idx, mask)
+        foul, mask = self.nodes['foul'].lookup(cols['ft_foul'])
+        added_edges += self._edges(('foul', 'caused', 'freethrow'), foul, ft_idx, mask)
+
+        clocks = [c for key in ['ls_global_clock', 'ps_global_clock', 'foul_global_clock', 'shot_global_clock', 'ft_global_clock'] for c in cols[key]]
+        if clocks and "next_action" in cols.get('ingest_stages', []):
+            self.since = max(self.since, float(max(clocks)))
+
+        self._publish()
+        return {
+            "rows": len(cols['ps_id']) + len(cols['foul_id']) + len(cols['shot_id']) + len(cols['ft_id']),
+            "nodes": sum(len(nodes) - before[node_type] for node_type, nodes in self.nodes.items()),
+            "edges": added_edges
+        }
+
+
+    def _publish(self) -> None:
+        for node_type, nodes in self.nodes.items():
+            self.data[node_type].x = nodes.view()
+            self.data[node_type].node_id = nodes.ids
+            self.data[node_type].uid = torch.tensor(nodes.uids, dtype=torch.long)
+        for edge_type, edges in self.edges.items():
+            self.data[edge_type].edge_index = edges.view()
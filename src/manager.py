@@ -1,29 +1,117 @@
 # core/manager.py
 
-from typing import Any, Dict, List, Optional
-from .driver import get_driver
+import os
+import time
+from threading import Lock
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+import pandas as pd
+from neo4j import READ_ACCESS
+from neo4j.exceptions import TransientError
+
+from .driver import get_driver, season_databases
 from .queries.setup import SETUP_QUERIES
+from .tracing import annotate, tracing, payload_rows, payload_bytes
+
+
+_databases = set()
+_databases_lock = Lock()
+
+_sizers = {}
+_sizers_lock = Lock()
+
+
+class ChunkSizer:
+    """
+    Rows per transaction of one chunked write, adapted to what the server sustains: after each
+    commit the size moves halfway towards the rows that would take `target` seconds at the
+    observed rate, and it is halved whenever a chunk runs the server out of transaction memory.
+    """
+    def __init__(self, size: int = 1000, target: float = 1.0, min_size: int = 10, max_size: int = 50_000):
+        self.size = size
+        self.target = target
+        self.min_size = min_size
+        self.max_size = max_size
+
+
+    def observe(self, rows: int, seconds: float) -> None:
+        if rows < self.size or seconds <= 0:
+            return
+        ideal = rows / seconds * self.target
+        self.size = int(min(self.max_size, max(self.min_size, (self.size + ideal) / 2)))
+
+
+    def shrink(self) -> bool:
+        """
+        Halves the chunk size; False if it is already at its minimum.
+        """
+        if self.size <= self.min_size:
+            return False
+        self.size = max(self.min_size, self.size // 2)
+        return True
+
+
+
+def get_chunk_sizer(query: str) -> ChunkSizer:
+    with _sizers_lock:
+        if query not in _sizers:
+            _sizers[query] = ChunkSizer(target=float(os.getenv("MBAI_CHUNK_SECONDS", 1.0)))
+        return _sizers[query]
+
+
+def _is_memory_error(e: TransientError) -> bool:
+    return "Memory" in (e.code or "")
+
 
 class BaseManager:
     """
     The parent class for all domain services. 
     Handles the driver reference and common transaction patterns.
+    Queries run on `database` (the default database if None) unless a call routes them to
+    another one, e.g. the partition of a season.
     """
-    def __init__(self):
+    def __init__(self, database: Optional[str] = None):
         self.driver = get_driver()
         if self.driver is None:
             print("")
             raise Exception()
 
-        with self.driver.session() as session:
-            for query in SETUP_QUERIES:
-                try:
-                    session.run(query)
-                except Exception as e:
-                    print(f"Error creating constraint: {e}")
+        self.database = database
+        self.prepare(database)
+
+
+    def prepare(self, database: Optional[str]) -> None:
+        """
+        Sets up the constraints and indexes of a database once per process, creating it first if it
+        is a season partition (`database` None is the default database).
+        """
+        if database in _databases:
+            return
+
+        with _databases_lock:
+            if database in _databases:
+                return
+
+            if database is not None:
+                with self.driver.session(database="system") as session:
+                    session.run("CREATE DATABASE $name IF NOT EXISTS WAIT", name=database).consume()
+
+            with self.driver.session(database=database) as session:
+                for query in SETUP_QUERIES:
+                    try:
+                        session.run(query)
+                    except Exception as e:
+                        print(f"Error creating constraint: {e}")
 
+            _databases.add(database)
 
-    def execute_write(self, query: str, params: Optional[Dict[str, Any]] = None) -> Any:
+
+    def route(self, database: Optional[str] = None) -> Optional[str]:
+        database = database or self.database
+        self.prepare(database)
+        return database
+
+
+    def execute_write(self, query: str, params: Optional[Dict[str, Any]] = None, database: Optional[str] = None) -> Any:
         """
         Runs a write transaction (creating/updating nodes).
         Automatically handles session creation and cleanup.
@@ -31,14 +119,44 @@ class BaseManager:
         if params is None:
             params = {}
             
-        with self.driver.session() as session:
+        with self.driver.session(database=self.route(database)) as session:
             result = session.execute_write(
                 lambda tx: tx.run(query, **params).consume()
             )
-            return result
+
+        if tracing():
+            self._annotate_write(params, result)
+        return result
+
+
+    def _annotate_write(self, params: Dict[str, Any], summary: Any) -> None:
+        """
+        Records a write's payload and server-side counters on the current tracing span.
+        """
+        counters = summary.counters
+        annotate(
+            rows=payload_rows(params),
+            bytes=payload_bytes(params) or 0,
+            nodes_created=counters.nodes_created,
+            relationships_created=counters.relationships_created,
+            properties_set=counters.properties_set
+        )
 
 
-    def execute_read(self, query: str, params: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    def execute_batched(self, query: str, params: Optional[Dict[str, Any]] = None, database: Optional[str] = None) -> Any:
+        """
+        Runs a query in an auto-commit transaction and returns its summary.
+        Needed by `CALL { ... } IN TRANSACTIONS`, which commits its own batches and cannot run
+        inside a managed transaction. Not retried on transient errors.
+        """
+        if params is None:
+            params = {}
+
+        with self.driver.session(database=self.route(database)) as session:
+            return session.run(query, **params).consume()
+
+
+    def execute_read(self, query: str, params: Optional[Dict[str, Any]] = None, database: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Runs a read transaction (fetching data).
         Returns a clean list of dictionaries (easier to use than raw Neo4j records).
@@ -46,8 +164,98 @@ class BaseManager:
         if params is None:
             params = {}
 
-        with self.driver.session() as session:
+        with self.driver.session(database=self.route(database)) as session:
             result = session.execute_read(
                 lambda tx: tx.run(query, **params).data()
             )
-            return result
\ No newline at end of file
+            return result
+
+
+    def execute_stream(self, query: str, params: Optional[Dict[str, Any]] = None, fetch_size: int = 1000, database: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the rows of a read query as dictionaries, one at a time.
+        Records are pulled from the server `fetch_size` at a time, so memory stays flat however
+        many rows the query returns. The transaction stays open until the generator is exhausted
+        or closed, and is not retried on transient errors.
+        """
+        if params is None:
+            params = {}
+
+        with self.driver.session(database=self.route(database), default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+            with session.begin_transaction() as tx:
+                for record in tx.run(query, **params):
+                    yield record.data()
+
+
+    def execute_frames(self, query: str, params: Optional[Dict[str, Any]] = None, chunk_size: int = 100_000, fetch_size: int = 10_000, database: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """
+        Streams the rows of a read query as DataFrames of at most `chunk_size` rows.
+        Meant for large extractions of scalar columns: values are taken as returned by the driver.
+        """
+        if params is None:
+            params = {}
+
+        with self.driver.session(database=self.route(database), default_access_mode=READ_ACCESS, fetch_size=fetch_size) as session:
+            with session.begin_transaction() as tx:
+                result = tx.run(query, **params)
+                keys = result.keys()
+
+                rows = []
+                for record in result:
+                    rows.append(record.values())
+                    if len(rows) >= chunk_size:
+                        yield pd.DataFrame.from_records(rows, columns=keys)
+                        rows = []
+
+                if rows:
+                    yield pd.DataFrame.from_records(rows, columns=keys)
+
+
+    def execute_read_all(self, query: str, params: Optional[Dict[str, Any]] = None, season_ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Runs a read query on every season partition (or those of `season_ids`) and concatenates
+        the rows in season order. Without partitioning this is `execute_read` on the default database.
+        """
+        rows = []
+        for database in season_databases(season_ids):
+            rows.extend(self.execute_read(query, params, database=database))
+        return rows
+
+
+    def execute_chunked(self, query: str, params: Dict[str, Any], key: str, database: Optional[str] = None) -> int:
+        """
+        Runs a write whose `params[key]` is a large list of rows (or a struct-of-arrays dict of
+        columns) in consecutive transactions of one chunk each, sized by the query's `ChunkSizer`.
+        A chunk that exhausts the server's transaction memory is retried at half the size; other
+        errors propagate, leaving the committed chunks in place, so the query must be idempotent
+        (MERGE). Steps that depend on every row should run after this returns.
+        Returns the number of rows written.
+        """
+        rows = params[key]
+        columnar = isinstance(rows, dict)
+        total = len(next(iter(rows.values()), [])) if columnar else len(rows)
+        sizer = get_chunk_sizer(query)
+
+        start = 0
+        with self.driver.session(database=self.route(database)) as session:
+            while start < total:
+                end = min(total, start + sizer.size)
+                chunk = {name: column[start:end] for name, column in rows.items()} if columnar else rows[start:end]
+
+                began = time.perf_counter()
+                try:
+                    with session.begin_transaction() as tx:
+                        summary = tx.run(query, **{**params, key: chunk}).consume()
+                        tx.commit()
+                except TransientError as e:
+                    if _is_memory_error(e) and sizer.shrink():
+                        print(f"⚠️ Chunk of {end - start} rows ran out of memory, retrying with {sizer.size}")
+                        continue
+                    raise
+
+                sizer.observe(end - start, time.perf_counter() - began)
+                if tracing():
+                    self._annotate_write({**params, key: chunk}, summary)
+                start = end
+
+        return total
@@ -1,4 +1,8 @@
 from .team import TeamManager
 from .player import PlayerManager
 from .season import SeasonManager
-from .game import GameManager 
\ No newline at end of file
+from .game import GameManager
+from .features import FeatureStore
+from .shots import ShotManager
+from .embeddings import EmbeddingStore
+from .uids import UidRegistry
@@ -0,0 +1,134 @@
+from threading import Lock
+from typing import Any, Dict, List, Optional, Sequence, TYPE_CHECKING
+import numpy as np
+
+from ..manager import BaseManager
+from ..driver import game_database, season_database
+from ..queries.embeddings import \
+    EMBEDDING_LABELS, SIMILARITY_FUNCTIONS, \
+    CREATE_EMBEDDING_INDEX, AWAIT_INDEX, SET_EMBEDDINGS, \
+    GET_MOST_SIMILAR, GET_NEAREST
+
+if TYPE_CHECKING:
+    # Only for annotations: embeddings never import torch.
+    from torch_geometric.data import HeteroData
+
+
+_indexes = set()
+_indexes_lock = Lock()
+
+# Candidates fetched per result when lineups are filtered by team after the vector search.
+TEAM_OVERSAMPLING = 10
+
+
+class EmbeddingStore(BaseManager):
+    """
+    Learned embeddings of Players, LineUps and stints, written back onto their nodes and served by
+    one vector index per label (`<node_type>_embedding`). Node types and ids are those of the
+    `to_pyg` graphs (`data[node_type].node_id`), so a trained model's output maps straight back.
+    """
+
+    def index_name(self, node_type: str) -> str:
+        if node_type not in EMBEDDING_LABELS:
+            raise ValueError(f"Unknown node type {node_type!r}, expected one of {list(EMBEDDING_LABELS)}")
+        return f"{node_type}_embedding"
+
+
+    def create_index(self, node_type: str, dimensions: int, similarity: str = "cosine", season_id: Optional[str] = None, timeout: int = 300) -> None:
+        """
+        Creates the vector index of a node type if missing and waits for it to come online.
+        An existing index keeps its dimensions and similarity function.
+        """
+        if similarity not in SIMILARITY_FUNCTIONS:
+            raise ValueError(f"Unknown similarity {similarity!r}, expected one of {SIMILARITY_FUNCTIONS}")
+
+        self._create_index(node_type, dimensions, similarity, season_database(season_id), timeout)
+
+
+    def _create_index(self, node_type: str, dimensions: int, similarity: str, database: Optional[str], timeout: int = 300) -> None:
+        index = self.index_name(node_type)
+        query = CREATE_EMBEDDING_INDEX.format(index=index, label=EMBEDDING_LABELS[node_type], dimensions=int(dimensions), similarity=similarity)
+        self.execute_write(query, database=database)
+        self.execute_read(AWAIT_INDEX, {"index": index, "timeout": timeout}, database=database)
+
+        with _indexes_lock:
+            _indexes.add((database, index))
+
+
+    def write(self, node_type: str, node_ids: Sequence[Any], embeddings: Any, model: Optional[str] = None, season_id: Optional[str] = None) -> int:
+        """
+        Writes one embedding per node (rows of `embeddings`, a numpy array or tensor, in the order
+        of `node_ids`) in batched transactions, creating the vector index on first use.
+        Stints are routed to their game's database; Players and LineUps to `season_id`'s.
+        Returns the number of embeddings written.
+        """
+        matrix = embeddings.detach().cpu().numpy() if hasattr(embeddings, "detach") else np.asarray(embeddings)
+        matrix = np.asarray(matrix, dtype=np.float64)
+        ids = [i.item() if hasattr(i, "item") else i for i in node_ids]
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError(f"Expected a ({len(ids)}, dimensions) matrix of {node_type} embeddings, got {matrix.shape}")
+        if not np.isfinite(matrix).all():
+            raise ValueError(f"The {node_type} embeddings contain NaN or infinite values")
+
+        databases = {}
+        for row, node_id in enumerate(ids):
+            databases.setdefault(self._database(node_type, node_id, season_id), []).append(row)
+
+        written = 0
+        index = self.index_name(node_type)
+        for database, rows in databases.items():
+            if (database, index) not in _indexes:
+                self._create_index(node_type, matrix.shape[1], "cosine", database)
+
+            params = {
+                "model": model,
+                "rows": {"id": [ids[row] for row in rows], "embedding": matrix[rows].tolist()}
+            }
+            written += self.execute_chunked(SET_EMBEDDINGS[node_type], params, "rows", database=database)
+
+        return written
+
+
+    def write_graph(self, data: "HeteroData", embeddings: Dict[str, Any], model: Optional[str] = None, season_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Writes the embeddings a model computed on a `to_pyg` graph, one matrix per node type
+        aligned with `data[node_type].node_id`.
+        """
+        return {
+            node_type: self.write(node_type, data[node_type].node_id, matrix, model=model, season_id=season_id)
+            for node_type, matrix in embeddings.items()
+        }
+
+
+    def most_similar(self, node_id: Any, k: int = 10, node_type: Optional[str] = None, team_id: Optional[int] = None, season_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        The `k` nodes whose embeddings are closest to `node_id`'s, as `{id, score}` rows by
+        decreasing similarity. The node type defaults to `player` for integer ids and `lineup` for
+        strings. Lineups can be restricted to one team's (e.g. substitution candidates), in which
+        case `TEAM_OVERSAMPLING` times more neighbours are searched before filtering.
+        """
+        if node_type is None:
+            node_type = "player" if isinstance(node_id, (int, np.integer)) else "lineup"
+        node_id = node_id.item() if hasattr(node_id, "item") else node_id
+
+        candidates = (k + 1) * (TEAM_OVERSAMPLING if team_id is not None and node_type == "lineup" else 1)
+        database = self._database(node_type, node_id, season_id)
+        params = {"id": node_id, "k": k, "candidates": candidates, "index": self.index_name(node_type), "team_id": team_id}
+        return self.execute_read(GET_MOST_SIMILAR[node_type], params, database=database)
+
+
+    def nearest(self, node_type: str, vector: Any, k: int = 10, season_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        The `k` nodes of a type closest to an arbitrary vector, e.g. a model's output for a lineup
+        that never played together.
+        """
+        vector = vector.detach().cpu().numpy() if hasattr(vector, "detach") else np.asarray(vector)
+        params = {"index": self.index_name(node_type), "k": k, "vector": np.asarray(vector, dtype=np.float64).ravel().tolist()}
+        return self.execute_read(GET_NEAREST, params, database=season_database(season_id))
+
+
+    def _database(self, node_type: str, node_id: Any, season_id: Optional[str]) -> Optional[str]:
+        # Stint ids start with their game's id; Players and LineUps live in every season they played.
+        if node_type.endswith("_stint"):
+            return game_database(int(str(node_id).split("_")[0]))
+        return season_database(season_id)
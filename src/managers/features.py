@@ -0,0 +1,93 @@
+from typing import Any, Dict, List
+
+from ..manager import BaseManager
+from ..driver import game_database, season_database
+from ..ratings import get_result_cache
+from ..cache import get_graph_cache
+from ..transform import \
+    compute_game_stats, pre_game_rows, point_in_time, \
+    PLAYER_STATS, LINEUP_STATS, ROLLING_GAMES
+
+from ..queries.features import \
+    GET_GAME_STATS_INPUT, SET_STINT_STATS, \
+    GET_PLAYER_HISTORY, GET_LINEUP_HISTORY, \
+    MERGE_PLAYER_GAME_STATS, MERGE_LINEUP_GAME_STATS, \
+    GET_GAME_FEATURES
+
+
+class FeatureStore(BaseManager):
+    """
+    Maintains per-(player, game) and per-(lineup, game) stat rows, updated incrementally as each game
+    is ingested. Every row carries the game's own stats and the entity's state *before* that game,
+    so lookups at a point in time never see the future. Games of a season must be updated in date
+    order; use `rebuild` after a backfill.
+    """
+
+    def update_game(self, game_id: int) -> None:
+        database = game_database(game_id)
+        result = self.execute_read(GET_GAME_STATS_INPUT, {"game_id": game_id}, database=database)
+        if not result:
+            raise ValueError(f"Game {game_id} not found in database!")
+
+        cols = result[0]
+        ls, ps, players, lineups = compute_game_stats(cols)
+
+        stint_cols = ["id", "points_scored", "points_conceded", "plus_minus"]
+        params = {
+            "lineup_stints": ls[stint_cols + ["possessions", "opp_possessions"]].to_dict("records"),
+            "player_stints": ps[stint_cols].to_dict("records")
+        }
+        self.execute_write(SET_STINT_STATS, params, database=database)
+
+        for stats, key, names, history_query, merge_query in [
+            (players, "player_id", PLAYER_STATS, GET_PLAYER_HISTORY, MERGE_PLAYER_GAME_STATS),
+            (lineups, "lineup_id", LINEUP_STATS, GET_LINEUP_HISTORY, MERGE_LINEUP_GAME_STATS),
+        ]:
+            history = self._history(history_query, stats[key].tolist(), cols["season_id"], cols["date"])
+            rows = pre_game_rows(stats, key, names, history)
+            params = {"game_id": game_id, "season_id": cols["season_id"], "rows": rows}
+            self.execute_write(merge_query, params, database=database)
+
+        tags = set(lineups["team_id"].tolist()) | {("player", pid) for pid in players["player_id"].tolist()}
+        get_result_cache().invalidate(tags)
+        get_graph_cache().invalidate(game_id)
+
+
+    def rebuild(self, season_id: str) -> None:
+        from .season import SeasonManager
+
+        for game_id in SeasonManager().get_games(season_id):
+            try:
+                self.update_game(game_id)
+            except Exception as e:
+                print(f"⚠️ Couldn't update features of game {game_id}: {e}")
+
+
+    def player_features(self, player_ids: List[int], season_id: str, as_of: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Point-in-time player state from the games strictly before `as_of`.
+        """
+        history = self._history(GET_PLAYER_HISTORY, player_ids, season_id, as_of)
+        return {pid: point_in_time(history.get(pid, []), PLAYER_STATS) for pid in player_ids}
+
+
+    def lineup_features(self, lineup_ids: List[str], season_id: str, as_of: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Point-in-time lineup state from the games strictly before `as_of`.
+        """
+        history = self._history(GET_LINEUP_HISTORY, lineup_ids, season_id, as_of)
+        return {lid: point_in_time(history.get(lid, []), LINEUP_STATS) for lid in lineup_ids}
+
+
+    def game_features(self, game_id: int) -> Dict[str, List]:
+        """
+        The pre-game feature vectors of a game's players and lineups, in the columns `to_pyg` consumes.
+        """
+        result = self.execute_read(GET_GAME_FEATURES, {"game_id": game_id}, database=game_database(game_id))
+        return result[0] if result else {"pf_id": [], "pf_x": [], "lf_id": [], "lf_x": []}
+
+
+    def _history(self, query: str, ids: List[Any], season_id: str, date: str, n: int = ROLLING_GAMES) -> Dict[Any, List[Dict]]:
+        params = {"ids": ids, "season_id": season_id, "date": date, "n": n}
+        rows = self.execute_read(query, params, database=season_database(season_id))
+        return {row["entity_id"]: row["history"] for row in rows}
@@ -1,37 +1,78 @@
-from typing import Tuple, List, Dict, Optional, Any
+from typing import Tuple, List, Dict, Optional, Any, Iterator, Callable, TYPE_CHECKING
+import time
+import random
 import pandas as pd
-from neo4j.exceptions import ServiceUnavailable, CypherSyntaxError, CypherTypeError
+from requests.exceptions import ConnectionError as HTTPConnectionError, Timeout as HTTPTimeout
+from neo4j.exceptions import ServiceUnavailable, SessionExpired, TransientError, CypherSyntaxError, CypherTypeError
 
 from ..manager import BaseManager
+from ..driver import game_database, season_database, season_of_game
+from .features import FeatureStore
+from .shots import ShotManager
+from .uids import UidRegistry
 
-from ..fetcher import fetch_boxscore, fetch_pbp
+from ..fetcher import fetch_boxscore, fetch_pbp_raw, normalize_pbp, archive_source, archive_meta, load_source
+from ..transform import compute_periods, compute_lineups, compute_possessions, action_columns
+
+from ..cache import get_graph_cache, content_hash
+from ..ratings import get_result_cache
+from ..shots import get_shot_store
+from ..tracing import span
 
 from ..queries.game import \
-    GET_TEAMS, \
+    GET_TEAMS, GET_GAMES_TEAMS, GET_SEASON_GAMES_TEAMS, SET_INGEST_HASH, SET_INGEST_SOURCE, MARK_INGEST_STAGE, \
+    RESET_INGEST, PURGE_GAME_NODES, PURGE_GAME_STATS, \
     MERGE_PERIODS, MERGE_STINTS, \
     MERGE_JUMPBALLS, MERGE_VIOLATIONS, MERGE_FOULS, \
     MERGE_SHOTS, MERGE_FREETHROWS, \
     MERGE_REBOUNDS, MERGE_TURNOVERS, MERGE_TIMEOUTS, \
-    MERGE_NEXT_ACTION, MERGE_SCORES, SET_PLUS_MINUS
+    MERGE_NEXT_ACTION, MERGE_SCORES, SET_PLUS_MINUS, \
+    MERGE_POSSESSIONS, GET_POSSESSIONS, \
+    GET_GAME_GRAPH
+
+# torch / PyG are only needed by the exports: importing them lazily keeps ingestion workers light.
+if TYPE_CHECKING:
+    from torch_geometric.data import HeteroData
+    from ..live import LiveGameGraph
+
+
+INGEST_STAGES = [
+    "periods", "stints",
+    "jumpballs", "violations", "fouls", "shots", "freethrows", "rebounds", "turnovers", "timeouts",
+    "next_action", "scores", "possessions", "uids", "features", "shot_charts"
+]
 
-import torch
-from torch_geometric.data import HeteroData
+TRANSIENT_ERRORS = (ServiceUnavailable, SessionExpired, TransientError, HTTPConnectionError, HTTPTimeout)
 
 
 class GameManager(BaseManager):
 
-    def __init__(self, game_id: int):
-        super().__init__()
+    def __init__(self, game_id: int, teams: Optional[Dict[str, Any]] = None):
+        """
+        `teams` is the game's row of `GET_GAMES_TEAMS` when already known (see `for_games`), which
+        saves the `GET_TEAMS` round trip.
+        """
+        super().__init__(game_database(game_id))
         self.game_id = game_id
 
         try: 
-            params = {"game_id": game_id}
-            result = self.execute_read(GET_TEAMS, params)[0]
+            result = teams
+            if result is None:
+                params = {"game_id": game_id}
+                rows = self.execute_read(GET_TEAMS, params)
+                result = rows[0] if rows else None
 
             if not result:
                 raise ValueError(f"Game {game_id} not found in database!")
             
             self.team_ids = (result['home_team_id'], result['away_team_id'])
+            self.ingest_hash = result['ingest_hash']
+            self.ingest_source = result['ingest_source']
+            self.ingest_stages = result['ingest_stages']
+            self.stages = set()
+            self.deferred = set()
+            self.timings = {}
+            self.error = None
             # self.home_team_id = result['home_team_id']
             # self.away_team_id = result['away_team_id']
 
@@ -49,27 +90,93 @@ class GameManager(BaseManager):
 
 
 
-    def load_game(self) -> None:
-
-        ht_id, at_id = self.team_ids
-        print(f"🏀 Loading game {self.game_id} (Home: {ht_id} vs Away: {at_id})...")       
+    def load_game(self, resume: bool = False, defer: Tuple[str, ...] = (), refetch: bool = False) -> bool:
+        """
+        Loads a game stage by stage, checkpointing every completed stage (see `INGEST_STAGES`) on the
+        Game node. With `resume`, the stages already completed for the same source are skipped, and
+        an unfinished ingest reads its source back from the archive unless `refetch`; the source is
+        fetched otherwise, so a game archived in progress or before a correction is picked up again.
+        Stages in `defer` are left to the caller (e.g. `features`, which must run in date order).
+        Returns whether every stage succeeded; the failure is kept in `self.error` and the
+        wall-clock seconds of each stage in `self.timings`.
+        The game and each of its fetches and stages are traced as spans (see `tracing`).
+        """
+        with span("game", game_id=self.game_id, resume=resume) as game:
+            ok = self._load_game(resume, defer, refetch)
+            if not ok:
+                game.fail(self.error)
+        return ok
 
-        try: 
-            boxscore_df = fetch_boxscore(self.game_id)
-        except Exception as e: 
-            print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't fetch the boxscore: {e}")
-            return None
 
 
-        try: 
-            pbp_df = fetch_pbp(self.game_id)        
-        except Exception as e: 
-            print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't fetch the play-by-play actions: {e}")
-            return None
+    def _load_game(self, resume: bool, defer: Tuple[str, ...], refetch: bool) -> bool:
+        ht_id, at_id = self.team_ids
+        print(f"🏀 Loading game {self.game_id} (Home: {ht_id} vs Away: {at_id})...")       
+        self.error = None
+        self.deferred = set(defer)
+        fetch_start = time.perf_counter()
+
+        unfinished = resume and not refetch and self.ingest_source and self.ingest_hash is None
+        meta = archive_meta(self.game_id) if unfinished else None
+        if meta and meta.get("ingest_hash") != self.ingest_source:
+            meta = None
+        if meta and meta.get("ingest_hash"):
+            try:
+                _, boxscore_df, pbp_df = load_source(self.game_id)
+                ingest_hash = meta["ingest_hash"]
+            except Exception as e:
+                print(f"⚠️ Couldn't read the archived source of game {self.game_id}, fetching it again: {e}")
+                meta = None
+
+        if not (meta and meta.get("ingest_hash")):
+            try: 
+                with span("fetch_boxscore") as fetch:
+                    boxscore_df = fetch_boxscore(self.game_id)
+                    fetch.add(rows=len(boxscore_df))
+            except Exception as e: 
+                print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't fetch the boxscore: {e}")
+                self.error = e
+                return False
+
+
+            try: 
+                with span("fetch_pbp") as fetch:
+                    pbp_raw_df = fetch_pbp_raw(self.game_id)
+                    pbp_df = normalize_pbp(pbp_raw_df)
+                    fetch.add(rows=len(pbp_df))
+            except Exception as e: 
+                print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't fetch the play-by-play actions: {e}")
+                self.error = e
+                return False
+
+
+            ingest_hash = content_hash(boxscore_df, pbp_df)
+            try:
+                archive_source(self.game_id, self.team_ids, boxscore_df, pbp_raw_df, ingest_hash=ingest_hash)
+            except Exception as e:
+                print(f"⚠️ Couldn't archive the source of game {self.game_id}: {e}")
+
+
+        self.timings["fetch"] = time.perf_counter() - fetch_start
+        if resume and ingest_hash == self.ingest_hash:
+            print(f"✅ Game {self.game_id} is already loaded from this source.")
+            return True
+
+        if resume and ingest_hash == self.ingest_source:
+            self.stages = set(self.ingest_stages)
+            if self.stages:
+                print(f"⏩ Resuming game {self.game_id} after: {', '.join(s for s in INGEST_STAGES if s in self.stages)}")
+        else:
+            self.execute_write(SET_INGEST_SOURCE, {"game_id": self.game_id, "ingest_source": ingest_hash})
+            self.ingest_source = ingest_hash
+            self.stages = set()
+
+        self.ingest_hash = None
+        get_graph_cache().invalidate(self.game_id)
 
 
         try: 
-            self.load_periods( 
+            self._stage("periods", self.load_periods,
                 periods = pbp_df.loc[pbp_df["actionType"] == "period", 
                     ["timeActual", "period"]
                 ]
@@ -77,11 +184,12 @@ class GameManager(BaseManager):
         
         except Exception as e: 
             print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't load periods: {e}")
-            return None
+            self.error = e
+            return False
 
 
         try:             
-            self.load_lineups(
+            self._stage("stints", self.load_lineups,
                 subs = pbp_df.loc[pbp_df["actionType"] == "substitution", 
                     ["timeActual", "period", "clock", "subType", "personId", "teamId"]
                 ], 
@@ -92,7 +200,8 @@ class GameManager(BaseManager):
         
         except Exception as e: 
             print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't load lineups: {e}")
-            return None
+            self.error = e
+            return False
 
 
         try:             
@@ -119,538 +228,328 @@ class GameManager(BaseManager):
         
         except Exception as e: 
             print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't load actions: {e}")
-            return None
-
+            self.error = e
+            return False
 
 
-    def load_periods(self, periods: pd.DataFrame) -> None:
+        try:
+            self._stage("possessions", self.load_possessions,
+                actions = pbp_df.loc[pbp_df["actionType"] != "substitution",
+                    ["timeActual", "period", "clock", "actionType", "subType", "shotResult", "teamId"]
+                ]
+            )
 
-        data = []
-        for p, period_df in periods.groupby("period", sort=False):
-            times = pd.to_datetime(period_df["timeActual"])
-            period_entry = {"n": int(p), "start": times.iloc[0], "end": times.iloc[1]}
-            data.append(period_entry)
+        except Exception as e:
+            print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't load possessions: {e}")
+            self.error = e
+            return False
 
-        params = {"game_id": self.game_id, "periods": data}
-        result = self.execute_write(MERGE_PERIODS, params)
 
+        try:
+            self._stage("uids", UidRegistry().assign_game, self.game_id)
 
+        except Exception as e:
+            print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't assign uids: {e}")
+            self.error = e
+            return False
 
-    def load_lineups(self, subs: pd.DataFrame, starters: pd.DataFrame) -> None:
 
-        data = []
-        for team_id in self.team_ids:
-            team_subs = subs[subs['teamId'] == team_id]
-            team_starters = starters.loc[starters['TEAM_ID'] == team_id, 'PLAYER_ID'].to_list()
-            assert len(team_starters) == 5, f"Starters list must contain 5 players, but got {len(starters)}"
-            
-            team_lineups = []
-            current_lineup = set(team_starters)
-            for p, period_df in team_subs.groupby('period', sort=False):
-                period_len = 300.0 if p > 4 else 720.0                
-                global_offset = 2880.0 + (p - 5) * 300.0 if p > 4 else (p - 1) * 720.0    
-                start_clock = "PT05M00.00S" if p > 4 else "PT12M00.00S"
-                start_mask = (period_df['clock'] == start_clock)    
-
-                for _, row in period_df[start_mask].iterrows():
-                    player = row["personId"]
-                    if row["subType"] == "in":
-                        current_lineup.add(player)
-                    else:
-                        current_lineup.discard(player)
-                        
-                if len(current_lineup) == 5:
-                    starters_entry = {
-                        "period": p, 
-                        "time": "", 
-                        "clock": start_clock,
-                        "local_clock": 0.0,
-                        "global_clock": global_offset, 
-                        "ids": sorted(list(current_lineup))
-                    }
-                    team_lineups.append(starters_entry)
-
-                for clock, group in period_df[~start_mask].groupby("clock", sort=False):
-                    period_elapsed = period_len - pd.Timedelta(clock).total_seconds()   
-
-                    for _, row in group.iterrows():
-                        player = row["personId"]    
-                        if row["subType"] == "in":
-                            current_lineup.add(player)
-                        else:
-                            current_lineup.discard(player)
-                    
-                    if len(current_lineup) == 5:
-                        if current_lineup != set(team_lineups[-1]["ids"]):
-                            lineup_entry = {
-                                "period": p, 
-                                "time": group['timeActual'].iloc[0],
-                                "clock": clock,
-                                "local_clock": period_elapsed,
-                                "global_clock": global_offset + period_elapsed, 
-                                "ids": sorted(list(current_lineup))
-                            }
-                            team_lineups.append(lineup_entry)
-        
-            side_entry = {"team_id": team_id, "lineups": team_lineups}
-            data.append(side_entry)
+        try:
+            self._stage("features", FeatureStore().update_game, self.game_id)
 
-        params = {"game_id": self.game_id, "sides": data}
-        result = self.execute_write(MERGE_STINTS, params)
+        except Exception as e:
+            print(f"⛔ Critical failure in `load_game` for ID {self.game_id}: couldn't update features: {e}")
+            self.error = e
+            return False
 
 
+        try:
+            self._stage("shot_charts", ShotManager().update_game, self.game_id)
 
-    def load_actions(self, actions: pd.DataFrame) -> None:
+        except Exception as e:
+            print(f"⚠️ Couldn't update the shot charts of game {self.game_id}: {e}")
 
-        def process_action(row) -> Dict[str, Any]:
-            remaining = pd.Timedelta(row["clock"]).total_seconds()         
-            if row["period"] <= 4:
-                period_elapsed = 720.0 - remaining
-                global_offset = (row["period"] - 1) * 720.0
-            else:
-                period_elapsed = 300.0 - remaining
-                global_offset = 2880.0 + (row["period"] - 5) * 300.0
-            
-            return {
-                "time": row["timeActual"],
-                "period": row["period"],
-                "clock": row["clock"],
-                "local_clock": round(period_elapsed, 2),
-                "global_clock": round(global_offset + period_elapsed, 2),
-                "type": row["actionType"],
-                "subtype": row["subType"],
-                "team_id": row["teamId"] if row["teamId"] != -1 else None,
-                "player_id": row["personId"] if row["personId"] != -1 else None
-            }
-
-        def process_jumpball(row) -> Dict[str, Any]:
-            entry = process_action(row)
-            entry.update({
-                "descriptor": row["descriptor"] if row["descriptor"] != -1 else None, 
-                "recovered_id": row["jumpBallRecoverdPersonId"] if row["jumpBallRecoverdPersonId"] != -1 else None,
-                "won_id": row["jumpBallWonPersonId"] if row["jumpBallWonPersonId"] != -1 else None,
-                "lost_id": row["jumpBallLostPersonId"] if row["jumpBallLostPersonId"] != -1 else None
-            })
-            return entry
-
-        def process_violation(row) -> Dict[str, Any]:
-            entry = process_action(row)
-            entry.update({"official_id": row["officialId"] if row["officialId"] != -1 else None})
-            return entry
-                
-        def process_foul(row) -> Dict[str, Any]:
-            entry = process_action(row)
-            entry.update({
-                "descriptor": row["descriptor"] if row["descriptor"] != -1 else None, 
-                "drawn_id": row["foulDrawnPersonId"] if row["foulDrawnPersonId"] != -1 else None,
-                "official_id": row["officialId"] if row["officialId"] != -1 else None
-            })
-            return entry
-                
-        def process_shot(row) -> Dict[str, Any]:
-            entry = process_action(row)
-            entry.update({
-                "result": row["shotResult"],
-                "x": row["x"], "y": row["y"],
-                "distance": row["shotDistance"],
-                "descriptor": row["descriptor"] if row["descriptor"] != -1 else None, 
-                "assist_id": row["assistPersonId"] if row["assistPersonId"] != -1 else None,
-                "block_id": row["blockPersonId"] if row["blockPersonId"] != -1 else None,   
-            })
-            return entry
-        
-        def process_freethrow(row) -> Dict[str, Any]:
-            entry = process_action(row)
-            entry.update({"result": row["shotResult"]})
-            return entry
-
-        def process_turnover(row) -> Dict[str, Any]:
-            entry = process_action(row)
-            entry.update({
-                "descriptor": row["descriptor"] if row["descriptor"] != -1 else None, 
-                "steal_id": row["stealPersonId"] if row["stealPersonId"] != -1 else None, 
-                "official_id": row["officialId"] if row["officialId"] != -1 else None
-            })
-            return entry
-        
+        # A game with a deferred stage isn't fully loaded: `complete_stage` stamps it once that stage ran.
+        pending = [stage for stage in INGEST_STAGES if stage in self.deferred and stage not in self.stages]
+        if pending:
+            print(f"⏸️ Game {self.game_id} loaded, pending: {', '.join(pending)}")
+            return True
 
-        jumpball_mask = actions["actionType"] == "jumpball"
-        jumpball_data = actions[jumpball_mask].apply(process_jumpball, axis=1)
-        jumpball_params = {"game_id": self.game_id, "jumpballs": jumpball_data.tolist()}
-        self.execute_write(MERGE_JUMPBALLS, jumpball_params)
-
-        violation_mask = actions["actionType"] == "violation"
-        violation_data = actions[violation_mask].apply(process_violation, axis=1)
-        violation_params = {"game_id": self.game_id, "violations": violation_data.tolist()}
-        self.execute_write(MERGE_VIOLATIONS, violation_params)
-
-        foul_mask = actions["actionType"] == "foul"
-        foul_data = actions[foul_mask].apply(process_foul, axis=1)
-        foul_params = {"game_id": self.game_id, "fouls": foul_data.tolist()}
-        self.execute_write(MERGE_FOULS, foul_params)
-
-        shot_mask = (actions["actionType"] == "2pt") | (actions["actionType"] == "3pt")
-        shot_data = actions[shot_mask].apply(process_shot, axis=1)
-        shot_params = {"game_id": self.game_id, "shots": shot_data.tolist()}
-        self.execute_write(MERGE_SHOTS, shot_params)
-
-        ft_mask = actions["actionType"] == "freethrow"
-        ft_data = actions[ft_mask].apply(process_freethrow, axis=1)
-        ft_params = {"game_id": self.game_id, "shots": ft_data.tolist()}
-        self.execute_write(MERGE_FREETHROWS, ft_params)
-
-        reb_mask = actions["actionType"] == "rebound"
-        reb_data = actions[reb_mask].apply(process_action, axis=1)
-        reb_params = {"game_id": self.game_id, "rebounds": reb_data.tolist()}
-        self.execute_write(MERGE_REBOUNDS, reb_params)
-
-        tov_mask = actions["actionType"] == "turnover"
-        tov_data = actions[tov_mask].apply(process_turnover, axis=1)
-        tov_params = {"game_id": self.game_id, "turnovers": tov_data.tolist()}
-        self.execute_write(MERGE_TURNOVERS, tov_params)
-
-        timeout_mask = actions["actionType"] == "timeout"
-        timeout_data = actions[timeout_mask].apply(process_action, axis=1)
-        timeout_params = {"game_id": self.game_id, "timeouts": timeout_data.tolist()}
-        self.execute_write(MERGE_TIMEOUTS, timeout_params)
+        self.execute_write(SET_INGEST_HASH, {"game_id": self.game_id, "ingest_hash": ingest_hash})
+        self.ingest_hash = ingest_hash
+        return True
 
-        params = {"game_id": self.game_id}
-        self.execute_write(MERGE_NEXT_ACTION, params)
-        self.execute_write(MERGE_SCORES, params)
-        # self.execute_write(SET_PLUS_MINUS, params)
 
 
-    
-    def to_pyg(self) -> HeteroData:
-        data = HeteroData()
+    def complete_stage(self, stage: str, fn: Callable, *args, **kwargs) -> None:
+        """
+        Runs a stage that `load_game` deferred, checkpoints it, then stamps the game as fully loaded
+        from its source (`Game.ingest_hash`). Until then a resumed `ingest` runs the stage again.
+        """
+        self.stages = set(self.ingest_stages)
+        self.deferred = set()
+        self._stage(stage, fn, *args, **kwargs)
+        if self.ingest_hash != self.ingest_source:
+            self.execute_write(SET_INGEST_HASH, {"game_id": self.game_id, "ingest_hash": self.ingest_source})
+            self.ingest_hash = self.ingest_source
 
-        data['game'].x = torch.tensor([[1.0]], dtype=torch.float)
-        data['team'].x = torch.eye(2)
 
-        data['team', 'played_home', 'game'].edge_index = torch.tensor([[0], [0]], dtype=torch.long)
-        data['team', 'played_away', 'game'].edge_index = torch.tensor([[1], [0]], dtype=torch.long)
 
-        q_uids = []; l_uids = []; p_ids = []; ls_uids = []; ps_uids = []
-        q_seen = set(); l_seen = set(); p_seen = set(); ls_seen = set(); ps_seen = set()
-        
-        q_g_edges = set(); 
-        t_l_edges = set(); p_l_edges = set()
-        l_ls_edges = set(); ls_q_edges = set()
-        p_ps_edges = set(); ps_q_edges = set()
-        ps_ls_edges = set()
-
-        q_ns = {}
-        ls_feats = {}
-        ps_feats = {}
-
-        query = """
-            MATCH (g:Game {id: $game_id})<-[:IN_GAME]-(q:Period)
-            MATCH (t:Team)-[:HAS_LINEUP]->(l:LineUp)-[:ON_COURT]->(ls:LineUpStint)-[:IN_PERIOD]->(q)
-            MATCH (l)<-[:MEMBER_OF]-(p:Player)-[:ON_COURT]->(ps:PlayerStint)-[:ON_COURT_WITH]->(ls)
-            RETURN 
-                elementId(q) AS q_id, q.n AS q_n,
-                t.id AS t_id, 
-                elementId(l) AS l_id,
-                p.id AS p_id,
-                elementId(ls) AS ls_id, ls.global_clock AS ls_global_clock, ls.local_clock AS ls_local_clock, ls.clock_duration AS ls_duration,
-                elementId(ps) AS ps_id, ps.global_clock AS ps_global_clock, ps.local_clock AS ps_local_clock, ps.clock_duration AS ps_duration
-            ORDER BY ps_global_clock ASC
+    @classmethod
+    def preload(cls, game_ids: List[int]) -> Dict[int, Dict[str, Any]]:
         """
-        results = self.execute_read(query, {"game_id": self.game_id})
-        for row in results:
-            q = row['q_id']
-            t = row['t_id']
-            l = row['l_id']
-            p = row['p_id']
-            ls = row['ls_id']
-            ps = row['ps_id']
-
-            if q not in q_seen:
-                q_uids.append(q)
-                q_seen.add(q)
-                q_ns[q] = row['q_n'] 
-
-            if l not in l_seen:
-                l_uids.append(l)
-                l_seen.add(l)
-        
-            if p not in p_seen:
-                p_ids.append(p)
-                p_seen.add(p)
-
-            if ls not in ls_seen:
-                ls_uids.append(ls)
-                ls_seen.add(ls)
-                ls_feats[ls] = [row['ls_global_clock'], row['ls_local_clock'], row['ls_duration']]
-
-            if ps not in ps_seen:
-                ps_uids.append(ps)
-                ps_seen.add(ps)
-                ps_feats[ps] = [row['ps_global_clock'], row['ps_local_clock'], row['ps_duration']]
-
-        g_map = {self.game_id: 0}
-        t_map = {self.team_ids[0]: 0, self.team_ids[1]: 1}
-        q_map = {uid: i for i, uid in enumerate(q_uids)}
-        l_map = {uid: i for i, uid in enumerate(l_uids)}        
-        p_map = {id: i for i, id in enumerate(p_ids)}
-        ls_map = {uid: i for i, uid in enumerate(ls_uids)}        
-        ps_map = {uid: i for i, uid in enumerate(ps_uids)}        
-
-        data['period'].x = torch.tensor(
-            [[q_ns[uid]] for uid in q_uids], 
-            dtype=torch.float
-        )
-
-        data['lineup'].x = torch.ones((len(l_uids), 1), dtype=torch.float)        
-        data['player'].x = torch.ones((len(p_ids), 1), dtype=torch.float)
-        
-        data['lineup_stint'].x = torch.tensor(
-            [ls_feats[uid] for uid in ls_uids], 
-            dtype=torch.float
-        )
-        
-        data['player_stint'].x = torch.tensor(
-            [ps_feats[uid] for uid in ps_uids], 
-            dtype=torch.float
-        )
-        
-        for row in results:
-            q = row['q_id']
-            t = row['t_id']
-            l = row['l_id']
-            p = row['p_id']
-            ls = row['ls_id']
-            ps = row['ps_id']
-
-            q_g_edges.add((q_map[q], 0))
-            t_l_edges.add((t_map[t], l_map[l]))
-            p_l_edges.add((p_map[p], l_map[l]))   
-            l_ls_edges.add((l_map[l], ls_map[ls]))
-            p_ps_edges.add((p_map[p], ps_map[ps]))
-            ps_ls_edges.add((ps_map[ps], ls_map[ls]))
-            ls_q_edges.add((ls_map[ls], q_map[q]))
-            ps_q_edges.add((ps_map[ps], q_map[q]))
-
-
-        q_g_edges_tensor = torch.tensor(list(q_g_edges), dtype=torch.long).t().contiguous()
-        data['period', 'in_game', 'game'].edge_index = q_g_edges_tensor
-
-        t_l_edges_tensor = torch.tensor(list(t_l_edges), dtype=torch.long).t().contiguous()
-        data['team', 'has_lineup', 'lineup'].edge_index = t_l_edges_tensor
-
-        p_l_edges_tensor = torch.tensor(list(p_l_edges), dtype=torch.long).t().contiguous()
-        data['player', 'member_of', 'lineup'].edge_index = p_l_edges_tensor
-        
-        l_ls_edges_tensor = torch.tensor(list(l_ls_edges), dtype=torch.long).t().contiguous()            
-        data['lineup', 'on_court', 'lineup_stint'].edge_index = l_ls_edges_tensor
+        The teams and ingest state of many games in one query per database, keyed by game id,
+        to be passed to the constructor (or `ingest`) as `teams`. Unknown games are left out.
+        """
+        databases = {}
+        for game_id in game_ids:
+            databases.setdefault(game_database(game_id), []).append(game_id)
 
-        p_ps_edges_tensor = torch.tensor(list(p_ps_edges), dtype=torch.long).t().contiguous()
-        data['player', 'on_court', 'player_stint'].edge_index = p_ps_edges_tensor
-        
-        ps_ls_edges_tensor = torch.tensor(list(ps_ls_edges), dtype=torch.long).t().contiguous()
-        data['player_stint', 'on_court_with', 'lineup_stint'].edge_index = ps_ls_edges_tensor
+        manager = BaseManager()
+        rows = {}
+        for database, ids in databases.items():
+            for row in manager.execute_read(GET_GAMES_TEAMS, {"game_ids": ids}, database=database):
+                rows[row["game_id"]] = row
+        return rows
 
-        ls_q_edges_tensor = torch.tensor(list(ls_q_edges), dtype=torch.long).t().contiguous()            
-        data['lineup_stint', 'in_period', 'period'].edge_index = ls_q_edges_tensor
 
-        ps_q_edges_tensor = torch.tensor(list(ps_q_edges), dtype=torch.long).t().contiguous()            
-        data['player_stint', 'in_period', 'period'].edge_index = ps_q_edges_tensor
 
+    @classmethod
+    def for_games(cls, game_ids: List[int]) -> List["GameManager"]:
+        """
+        Managers of many games, in the order given, with their teams resolved in one query.
+        Games missing from the database are skipped with a warning.
+        """
+        rows = cls.preload(game_ids)
+        missing = [game_id for game_id in game_ids if game_id not in rows]
+        if missing:
+            print(f"⚠️ Data Warning in `for_games`: games not found in database: {', '.join(map(str, missing))}")
+        return [cls(game_id, rows[game_id]) for game_id in game_ids if game_id in rows]
 
-        ls_next_edges = []
-        ps_next_edges = []
 
-        query = """
-            MATCH (g:Game {id: $game_id})
-            
-            MATCH (ls:LineUpStint)-[:IN_PERIOD]->(:Period)-[:IN_GAME]->(g)
-            MATCH (ls)-[:NEXT]->(next_ls)
-            RETURN 
-                elementId(ls) as curr_id, 
-                elementId(next_ls) as next_id, 
-                'LineUpStint' as type
-            
-            UNION ALL
-
-            MATCH (ps:PlayerStint)-[:ON_COURT_WITH]->(:LineUpStint)-[:IN_PERIOD]->(:Period)-[:IN_GAME]->(g)
-            MATCH (ps)-[:NEXT]->(next_ps)
-            RETURN 
-                elementId(ps) as curr_id, 
-                elementId(next_ps) as next_id, 
-                'PlayerStint' as type
+
+    @classmethod
+    def for_season(cls, season_id: str, start: Optional[str] = None, end: Optional[str] = None) -> List["GameManager"]:
         """
-        results = self.execute_read(query, {"game_id": self.game_id})
-        for row in results:           
-            if row['type'] == 'LineUpStint':
-                if row['curr_id'] in ls_map and row['next_id'] in ls_map:
-                    ls_next_edges.append([ls_map[row['curr_id'] ], ls_map[row['next_id']]])
-            
-            elif row['type'] == 'PlayerStint':
-                if row['curr_id'] in ps_map and row['next_id'] in ps_map:
-                    ps_next_edges.append([ps_map[row['curr_id'] ], ps_map[row['next_id']]])
-
-        ls_next_tensor = torch.tensor(ls_next_edges, dtype=torch.long).t().contiguous()
-        ps_next_tensor = torch.tensor(ps_next_edges, dtype=torch.long).t().contiguous()
-        data['lineup_stint', 'next', 'lineup_stint'].edge_index = ls_next_tensor
-        data['player_stint', 'next', 'player_stint'].edge_index = ps_next_tensor
-
-
-        ocn_edges = []
-        query = """
-            MATCH (g:Game {id: $game_id})
-            MATCH (ls1:LineUpStint)-[r:ON_COURT_NEXT]->(ls2:LineUpStint)
-            WHERE (ls1)-[:IN_PERIOD]->(:Period)-[:IN_GAME]->(g)
-            RETURN elementId(ls1) as curr_id, elementId(ls2) as nxt_id
+        Managers of the games of a season and/or date range, ordered by date, from a single query.
+        """
+        params = {"season_id": season_id, "start": start or "0001-01-01", "end": end or "9999-12-31"}
+        rows = BaseManager().execute_read(GET_SEASON_GAMES_TEAMS, params, database=season_database(season_id))
+        return [cls(row["game_id"], row) for row in rows]
+
+
+
+    @classmethod
+    def ingest(
+        cls,
+        game_id: int,
+        max_attempts: int = 5,
+        backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        defer: Tuple[str, ...] = (),
+        timings: Optional[Dict[str, float]] = None,
+        teams: Optional[Dict[str, Any]] = None,
+        refetch: bool = False
+    ) -> bool:
         """
-        results = self.execute_read(query, {"game_id": self.game_id})
-        for row in results:           
-            if row['curr_id'] in ls_map and row['nxt_id'] in ls_map:
-                ocn_edges.append([ls_map[row['curr_id']], ls_map[row['nxt_id']]])
+        Loads a game, resuming from its first incomplete stage, and retries with exponential backoff
+        when the failure is transient (database unavailable, network errors). Other errors are not retried.
+        With `refetch`, an unfinished ingest fetches its source again instead of reading the archive.
+        The stage timings of every attempt are accumulated into `timings`, if given. `teams`, from
+        `preload`, spares the first attempt its read; retries read the checkpoints afresh.
+        """
+        for attempt in range(1, max_attempts + 1):
+            try:
+                manager = cls(game_id, teams if attempt == 1 else None)
+                ok = manager.load_game(resume=True, defer=defer, refetch=refetch)
+                if timings is not None:
+                    for stage, seconds in manager.timings.items():
+                        timings[stage] = timings.get(stage, 0.0) + seconds
+                if ok:
+                    return True
+                error = manager.error
 
-        ocn_tensor = torch.tensor(ocn_edges, dtype=torch.long).t().contiguous()
-        data['lineup_stint', 'on_court_next', 'lineup_stint'].edge_index = ocn_tensor
+            except TRANSIENT_ERRORS as e:
+                error = e
 
+            if not isinstance(error, TRANSIENT_ERRORS) or attempt == max_attempts:
+                print(f"❌ Giving up on game {game_id} after {attempt} attempt(s): {error}")
+                return False
 
-        foul_uids = []        
-        foul_feats = []
-        edge_foul = []      
-        edge_foul_drawn = []    
+            delay = min(max_backoff, backoff * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            print(f"🔁 Transient failure on game {game_id} ({type(error).__name__}), retrying in {delay:.1f}s...")
+            time.sleep(delay)
 
-        query = """
-            MATCH (g:Game {id: $game_id})
-            MATCH (ps:PlayerStint)-[:COMMITTED_FOUL]->(f:Foul)
-            WHERE f.id STARTS WITH toString($game_id) 
-            
-            OPTIONAL MATCH (ps_v:PlayerStint)-[:DREW_FOUL]->(f)
-            
-            RETURN 
-                elementId(f) AS foul_id,
-                elementId(ps) AS player_id,
-                elementId(ps_v) AS victim_id,
-                labels(f) AS types,
-                f.local_clock AS local_clock,
-                f.global_clock AS global_clock
-            ORDER BY global_clock ASC
+        return False
+
+
+
+    def purge(self, batch_size: int = 1000) -> Dict[str, int]:
         """
-        results = self.execute_read(query, {"game_id": self.game_id})
-        for i, row in enumerate(results): 
-            foul_uids.append(row['foul_id'])
-            foul_feats.append([
-                row['global_clock'], row['local_clock'],   
-            ])
-
-            if row['player_id'] in ps_map:
-                edge_foul.append([ps_map[row['player_id']], i])
-            
-            if row['victim_id'] and row['victim_id'] in ps_map:
-                edge_foul_drawn.append([ps_map[row['victim_id']], i])
+        Deletes the game's subgraph (Periods, stints, Actions, Scores, Possessions and per-game
+        stats) in batches of `batch_size` nodes, each committed on its own, so the transaction
+        heap stays bounded on large games. The Game node, its schedule relationships and the
+        shared Team, Player and LineUp nodes are kept. The ingest checkpoints are cleared first,
+        so an interrupted purge leaves a game that is reloaded in full rather than one taken for
+        loaded. Returns the number of deleted nodes per label.
+        """
+        print(f"🧹 Purging game {self.game_id}...")
+        self.execute_write(RESET_INGEST, {"game_id": self.game_id})
+        self.ingest_hash = self.ingest_source = None
+        self.ingest_stages = []
+        self.stages = set()
 
-        foul_map = {uid: i for i, uid in enumerate(foul_uids)}        
+        deleted = {}
+        params = {"prefix": f"{self.game_id}_", "game_id": self.game_id, "batch_size": batch_size}
+        for label, query in PURGE_GAME_NODES.items():
+            deleted[label] = self.execute_batched(query, params).counters.nodes_deleted
+        deleted["GameStats"] = self.execute_batched(PURGE_GAME_STATS, params).counters.nodes_deleted
 
-        data['foul'].x = torch.tensor(foul_feats, dtype=torch.float)
-        data['player_stint', 'committed_foul', 'foul'].edge_index = torch.tensor(edge_foul, dtype=torch.long).t().contiguous()
-        data['player_stint', 'drew_foul', 'foul'].edge_index = torch.tensor(edge_foul_drawn, dtype=torch.long).t().contiguous() 
+        get_graph_cache().invalidate(self.game_id)
+        get_result_cache().invalidate(self.team_ids)
+        try:
+            get_shot_store().remove_game(season_of_game(self.game_id), self.game_id)
+        except Exception as e:
+            print(f"⚠️ Couldn't remove game {self.game_id} from the shot charts: {e}")
 
+        print(f"✅ Purged game {self.game_id}: {sum(deleted.values())} nodes")
+        return deleted
 
-        shot_uids = []        
-        shot_feats = []
-        edge_shot = []      
-        edge_assist = []    
-        edge_block = []     
 
-        query = """
-            MATCH (g:Game {id: $game_id})
-            MATCH (ps:PlayerStint)-[:TOOK_SHOT]->(s:Shot)
-            WHERE s.id STARTS WITH toString($game_id) 
-                AND NOT s:FreeThrow
-            
-            OPTIONAL MATCH (as:PlayerStint)-[:ASSISTED]->(s)
-            OPTIONAL MATCH (bs:PlayerStint)-[:BLOCKED]->(s)
-            OPTIONAL MATCH (s)-[:GENERATED_SCORE]->(sc:Score)
-
-            RETURN 
-                elementId(s) AS shot_id,
-                elementId(ps) AS shooter_id,
-                elementId(as) AS assist_id,
-                elementId(bs) AS block_id,
-                labels(s) AS labels,
-                s.x AS x, 
-                s.y AS y, 
-                s.distance AS dist,
-                s.local_clock AS local_clock,
-                s.global_clock AS global_clock
-            ORDER BY global_clock ASC
+
+    def reload(self, batch_size: int = 1000) -> bool:
         """
-        results = self.execute_read(query, {"game_id": self.game_id})
-        for i, row in enumerate(results): 
-            shot_uids.append(row['shot_id'])
-                        
-            is_made = 1.0 if 'Made' in row['labels'] else 0.0
-            is_3pt = 1.0 if '3PT' in row['labels'] else 0.0
-            is_2pt = 1.0 if '2PT' in row['labels'] else 0.0
-            
-            shot_feats.append([
-                row['global_clock'], row['local_clock'],   
-                row['x'], row['y'], row['dist'],    
-                is_2pt, is_3pt, is_made
-            ])
-
-            if row['shooter_id'] in ps_map:
-                edge_shot.append([ps_map[row['shooter_id']], i])
-            
-            if row['assist_id'] and row['assist_id'] in ps_map:
-                edge_assist.append([ps_map[row['assist_id']], i])
-                
-            if row['block_id'] and row['block_id'] in ps_map:
-                edge_block.append([ps_map[row['block_id']], i])
+        Purges the game and loads it again from its archived source, without fetching it.
+        A reload interrupted after the purge is completed by the next `ingest` of the game.
+        Games of a season after this one keep features computed from its previous stats until
+        `FeatureStore.rebuild` is run.
+        """
+        ingest_hash = (archive_meta(self.game_id) or {}).get("ingest_hash")
+        if not ingest_hash:
+            print(f"⛔ No archived source for game {self.game_id}: use `load_game` to fetch it.")
+            return False
 
-        shot_map = {uid: i for i, uid in enumerate(shot_uids)}        
+        self.purge(batch_size)
+        # Marks the archived source as the one being ingested, so that it is read back here and by
+        # the `ingest` that completes an interrupted reload.
+        self.execute_write(SET_INGEST_SOURCE, {"game_id": self.game_id, "ingest_source": ingest_hash})
+        self.ingest_source = ingest_hash
+        return self.load_game(resume=True)
 
-        data['shot'].x = torch.tensor(shot_feats, dtype=torch.float)
-        data['player_stint', 'took_shot', 'shot'].edge_index = torch.tensor(edge_shot, dtype=torch.long).t().contiguous()
-        data['player_stint', 'assisted', 'shot'].edge_index = torch.tensor(edge_assist, dtype=torch.long).t().contiguous() 
-        data['player_stint', 'blocked', 'shot'].edge_index = torch.tensor(edge_block, dtype=torch.long).t().contiguous() 
 
 
-        ft_uids = []        
-        ft_feats = []
-        edge_ft = []    
-        edge_foul_ft = []    
+    def _stage(self, stage: str, fn: Callable, *args, **kwargs) -> None:
+        """
+        Runs one ingest stage unless it is already checkpointed, then checkpoints it.
+        """
+        if stage in self.stages or stage in self.deferred:
+            return
 
-        query = """
-            MATCH (g:Game {id: $game_id})
-            MATCH (ps:PlayerStint)-[:TOOK_SHOT]->(ft:FreeThrow)
-            WHERE ft.id STARTS WITH toString($game_id) 
-            
-            OPTIONAL MATCH (f:Foul)-[:CAUSED]->(ft)
-            OPTIONAL MATCH (ft)-[:GENERATED_SCORE]->(sc:Score)
-
-            RETURN 
-                elementId(ft) AS ft_id,
-                elementId(ps) AS shooter_id,
-                labels(ft) AS labels,
-                ft.local_clock AS local_clock,
-                ft.global_clock AS global_clock,
-                elementId(f) AS foul_id
-            ORDER BY global_clock ASC
+        start = time.perf_counter()
+        with span(stage, game_id=self.game_id):
+            fn(*args, **kwargs)
+        self.execute_write(MARK_INGEST_STAGE, {"game_id": self.game_id, "stage": stage})
+        self.stages.add(stage)
+        self.timings[stage] = time.perf_counter() - start
+
+
+
+    def load_periods(self, periods: pd.DataFrame) -> None:
+
+        data = compute_periods(periods)
+        params = {"game_id": self.game_id, "periods": data}
+        result = self.execute_write(MERGE_PERIODS, params)
+
+
+
+    def load_lineups(self, subs: pd.DataFrame, starters: pd.DataFrame) -> None:
+
+        data = compute_lineups(self.team_ids, subs, starters)
+        params = {"game_id": self.game_id, "sides": data}
+        result = self.execute_write(MERGE_STINTS, params)
+
+
+
+    def load_possessions(self, actions: pd.DataFrame) -> None:
+
+        data = compute_possessions(self.team_ids, actions)
+        params = {"game_id": self.game_id, "possessions": data}
+        result = self.execute_write(MERGE_POSSESSIONS, params)
+
+
+
+    def load_actions(self, actions: pd.DataFrame) -> None:
+
+        data = action_columns(actions)
+        for stage, param, kind, query in [
+            ("jumpballs", "jumpballs", "jumpball", MERGE_JUMPBALLS),
+            ("violations", "violations", "violation", MERGE_VIOLATIONS),
+            ("fouls", "fouls", "foul", MERGE_FOULS),
+            ("shots", "shots", "shot", MERGE_SHOTS),
+            ("freethrows", "shots", "freethrow", MERGE_FREETHROWS),
+            ("rebounds", "rebounds", "rebound", MERGE_REBOUNDS),
+            ("turnovers", "turnovers", "turnover", MERGE_TURNOVERS),
+            ("timeouts", "timeouts", "timeout", MERGE_TIMEOUTS),
+        ]:
+            params = {"game_id": self.game_id, param: data[kind]}
+            self._stage(stage, self.execute_write, query, params)
+
+        params = {"game_id": self.game_id}
+        self._stage("next_action", self.execute_write, MERGE_NEXT_ACTION, params)
+        self._stage("scores", self.execute_write, MERGE_SCORES, params)
+        # self.execute_write(SET_PLUS_MINUS, params)
+
+
+    
+    def get_possessions(self) -> pd.DataFrame:
         """
-        results = self.execute_read(query, {"game_id": self.game_id})
-        for i, row in enumerate(results): 
-            ft_uids.append(row['ft_id'])
-            is_made = 1.0 if 'Made' in row['labels'] else 0.0            
-            ft_feats.append([row['global_clock'], row['local_clock'], is_made])
+        The game's possessions in order, with the LineUpStints on offense and defense.
+        """
+        result = self.execute_read(GET_POSSESSIONS, {"game_id": self.game_id})
+        return pd.DataFrame(result)
+
+
+
+    def to_pyg(self, use_cache: bool = True) -> "HeteroData":
+        from ..pyg import build_game_graph
 
-            if row['shooter_id'] in ps_map:
-                edge_ft.append([ps_map[row['shooter_id']], i])
+        with span("to_pyg", game_id=self.game_id) as trace:
+            cache = get_graph_cache() if use_cache else None
+            if cache:
+                data = cache.get(self.game_id, self.ingest_hash)
+                if data is not None:
+                    trace.add(cached=True)
+                    return data
 
-            if row['foul_id'] and row['foul_id'] in foul_uids:
-                edge_foul_ft.append([foul_map[row['foul_id']], i])
+            cols = self.execute_read(GET_GAME_GRAPH, {"game_id": self.game_id})
+            if not cols:
+                raise ValueError(f"Game {self.game_id} not found in database!")
 
-        ft_map = {uid: i for i, uid in enumerate(ft_uids)}        
+            data = build_game_graph(self.team_ids, cols[0])
+            trace.add(cached=False, rows=data.num_nodes)
+            if cache:
+                cache.put(self.game_id, self.ingest_hash, data)
 
-        data['freethrow'].x = torch.tensor(ft_feats, dtype=torch.float)
-        data['player_stint', 'took_shot', 'freethrow'].edge_index = torch.tensor(edge_ft, dtype=torch.long).t().contiguous()
-        data['foul', 'caused', 'freethrow'].edge_index = torch.tensor(edge_foul_ft, dtype=torch.long).t().contiguous()
+            return data
 
 
-        return data
\ No newline at end of file
+    def to_pyg_live(self) -> "LiveGameGraph":
+        """
+        The game graph of a game in progress, refreshed with `update()` as new stints and actions
+        are ingested: only what changed since the last refresh is read. See `live.LiveGameGraph`.
+        """
+        from ..live import LiveGameGraph
+
+        with span("to_pyg_live", game_id=self.game_id):
+            return LiveGameGraph(self)
+
+
+
+    def to_pyg_snapshots(self, step: float = 30.0, window: Optional[float] = None, times: Optional[List[float]] = None, deltas: bool = False) -> Iterator:
+        """
+        Builds the game graph once and yields its state every `step` seconds of global clock.
+        See `temporal.iter_snapshots`.
+        """
+        from ..temporal import iter_snapshots
+
+        return iter_snapshots(self.to_pyg(), step=step, window=window, times=times, deltas=deltas)
@@ -1,5 +1,25 @@
+from typing import Dict
+
 from ..manager import BaseManager
+from ..driver import season_database
+from ..ratings import get_result_cache
+from ..queries.player import GET_PLAYER_TEAMS
+from .team import TeamManager
 
 
 class PlayerManager(BaseManager):
-    pass
\ No newline at end of file
+
+    def on_off(self, player_id: int, season_id: str) -> Dict[int, Dict[str, Dict[str, float]]]:
+        """
+        On/off splits of a player for each team they played for in a season.
+        """
+        def compute():
+            params = {"player_id": player_id, "season_id": season_id}
+            rows = self.execute_read(GET_PLAYER_TEAMS, params, database=season_database(season_id))
+            return [row["team_id"] for row in rows]
+
+        key = ("player_teams", player_id, season_id)
+        team_ids = get_result_cache().get_or_compute(key, compute, tags=lambda _: [("player", player_id)])
+
+        teams = TeamManager()
+        return {team_id: teams.on_off(team_id, player_id, season_id) for team_id in team_ids}
@@ -1,5 +1,10 @@
+from typing import Iterator, List, Optional
+import pandas as pd
+
 from ..manager import BaseManager
-from ..queries.season import MERGE_SEASON
+from ..driver import season_database, season_databases
+from ..queries.season import MERGE_SEASON, MERGE_SEASON_NEXT, GET_GAMES, GET_SEASON_GAME_IDS, GET_SEASON_ACTIONS
+from ..queries.team import GET_TEAM_COUNT
 from ..fetcher import fetch_schedule
 
 
@@ -7,10 +12,66 @@ class SeasonManager(BaseManager):
 
     def load_games(self, season_id: str): 
         try:       
+            database = season_database(season_id)
+            if database and not self.execute_read(GET_TEAM_COUNT, database=database)[0]["teams"]:
+                from .team import TeamManager
+                TeamManager().load_teams(season_id)
+
             data = fetch_schedule(season_id) 
             params = {"season_id": season_id, "schedule": data}
-            result = self.execute_write(MERGE_SEASON, params)
-            print(f"{result}")
+            games = self.execute_chunked(MERGE_SEASON, params, "schedule", database=database)
+            result = self.execute_write(MERGE_SEASON_NEXT, {"season_id": season_id}, database=database)
+            print(f"{games} games, {result}")
             
         except Exception as e:
             print(f": {e}")
+
+
+    def get_games(self, season_id: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None) -> List[int]:
+        """
+        Returns the ids of the games of a season and/or date range (both ends inclusive), ordered by date.
+        Without a season, every season partition is read in season order.
+        """
+        params = {
+            "season_id": season_id,
+            "start": start or "0001-01-01",
+            "end": end or "9999-12-31"
+        }
+        if season_id is None:
+            rows = self.execute_read_all(GET_GAMES, params)
+        else:
+            rows = self.execute_read(GET_GAMES, params, database=season_database(season_id))
+        return [row["game_id"] for row in rows]
+
+
+    def ingest_games(self, season_id: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None, max_attempts: int = 5, backoff: float = 2.0, refetch: bool = False) -> List[int]:
+        """
+        Loads the games of a season and/or date range in date order, each resumed from its first
+        incomplete stage and retried on transient errors (see `GameManager.ingest` for `refetch`).
+        Returns the ids of the games that failed.
+        """
+        from .game import GameManager
+
+        game_ids = self.get_games(season_id, start, end)
+        preloaded = GameManager.preload(game_ids)
+
+        failed = []
+        for game_id in game_ids:
+            if not GameManager.ingest(game_id, max_attempts=max_attempts, backoff=backoff, teams=preloaded.get(game_id), refetch=refetch):
+                failed.append(game_id)
+
+        return failed
+
+
+    def stream_actions(self, season_ids: List[str], chunk_size: int = 100_000, batch_size: int = 100) -> Iterator[pd.DataFrame]:
+        """
+        Streams every Action of the given seasons, game by game in date order, as DataFrames of at
+        most `chunk_size` rows. The date-ordered game ids are read first, then the actions of
+        `batch_size` games per query. Memory stays bounded by the chunk size, not by the number of Actions.
+        """
+        for database in season_databases(season_ids):
+            rows = self.execute_read(GET_SEASON_GAME_IDS, {"season_ids": season_ids}, database=database)
+            game_ids = [row["game_id"] for row in rows]
+            for i in range(0, len(game_ids), batch_size):
+                params = {"game_ids": game_ids[i:i + batch_size]}
+                yield from self.execute_frames(GET_SEASON_ACTIONS, params, chunk_size=chunk_size, database=database)
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+from ..manager import BaseManager
+from ..driver import game_database, season_database
+from ..shots import get_shot_store, chart, KINDS
+from ..queries.shots import GET_GAME_SHOTS, GET_SEASON_SHOTS
+
+
+SHOT_COLUMNS = {
+    "game_id": np.int64, "player_id": np.int64, "team_id": np.int64, "lineup_id": str,
+    "x": np.float64, "y": np.float64, "distance": np.float64, "fg3": bool, "made": bool
+}
+
+
+class ShotManager(BaseManager):
+    """
+    Shot charts served from the per-season bins of the `ShotStore`, which `update_game` keeps
+    current after every load. Raw shots can still be streamed for ad-hoc analysis.
+    """
+
+    def shots(self, season_id: str, player_id: Optional[int] = None, team_id: Optional[int] = None, lineup_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        The field-goal attempts of a season, optionally restricted to a player, team or lineup,
+        as one numpy array per column.
+        """
+        params = {"season_id": season_id, "player_id": player_id, "team_id": team_id, "lineup_id": lineup_id}
+        result = self.execute_read(GET_SEASON_SHOTS, params, database=season_database(season_id))
+        return _arrays(result[0] if result else {})
+
+
+    def update_game(self, game_id: int) -> None:
+        result = self.execute_read(GET_GAME_SHOTS, {"game_id": game_id}, database=game_database(game_id))
+        if not result:
+            raise ValueError(f"Game {game_id} not found in database!")
+
+        get_shot_store().update_game(result[0]["season_id"], game_id, _arrays(result[0]))
+
+
+    def rebuild(self, season_id: str) -> None:
+        get_shot_store().rebuild(season_id, self.shots(season_id))
+
+
+    def chart(self, season_id: str, kind: str = "season", entity_id: Any = None) -> Optional[Dict[str, Any]]:
+        """
+        Hex and zone shot chart of a player, team, lineup or the whole league (`kind="season"`),
+        with FG%, points per shot and expected points against the league average in each bin.
+        Returns None if the entity took no shot.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown shot chart kind {kind!r}, expected one of {KINDS}")
+
+        store = get_shot_store()
+        bins = store.get(season_id, kind)
+        key = "0" if kind == "season" else str(entity_id)
+
+        row = int(np.searchsorted(bins["ids"], key))
+        if row == bins["ids"].size or bins["ids"][row] != key:
+            return None
+
+        return chart(bins, store.get(season_id, "season"), row)
+
+
+
+def _arrays(cols: Dict[str, List]) -> Dict[str, np.ndarray]:
+    return {name: np.asarray(cols.get(name, []), dtype=dtype) for name, dtype in SHOT_COLUMNS.items()}
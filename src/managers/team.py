@@ -1,16 +1,67 @@
+from typing import Any, Dict, Optional
+import pandas as pd
+
 from ..manager import BaseManager
-from ..queries.team import MERGE_TEAMS
+from ..driver import partitioned, season_database, season_databases
+from ..fetcher import fetch_teams
+from ..ratings import get_result_cache, lineup_table, on_off
+from ..queries.team import MERGE_TEAMS, GET_TEAM_LINEUP_STATS, GET_LINEUP_TEAM
 
 
 class TeamManager(BaseManager):
 
-    def load_teams(self):
+    def load_teams(self, season_id: Optional[str] = None):
+        """
+        Loads the teams and their arenas. With season partitions, teams are reference data copied
+        into every partition (and the default database), or only into the one of `season_id`.
+        """
         try: 
             teams_data = fetch_teams()
             params = {"teams": teams_data}
-            result = self.execute_write(MERGE_TEAMS, params)
-            print(f"{result}")
+            databases = [season_database(season_id)] if season_id else [None] + (season_databases() if partitioned() else [])
+            for database in databases:
+                result = self.execute_write(MERGE_TEAMS, params, database=database)
+                print(f"{result}")
 
         except Exception as e:
             print(f" : {e}")
             return None
+
+
+    def lineup_stats(self, team_id: int, season_id: str) -> pd.DataFrame:
+        """
+        Season totals and ratings of every LineUp of a team, summed from the per-game
+        LineUpGameStats rows. Cached until one of the team's games is ingested again.
+        """
+        def compute() -> pd.DataFrame:
+            params = {"team_id": team_id, "season_id": season_id}
+            return lineup_table(self.execute_read(GET_TEAM_LINEUP_STATS, params, database=season_database(season_id)))
+
+        key = ("lineup_stats", team_id, season_id)
+        return get_result_cache().get_or_compute(key, compute, tags=lambda _: [team_id])
+
+
+    def lineup_rating(self, lineup_id: str, season_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Season totals and ratings of a single 5-man LineUp, or None if it never played.
+        """
+        def compute() -> Optional[int]:
+            result = self.execute_read(GET_LINEUP_TEAM, {"lineup_id": lineup_id}, database=season_database(season_id))
+            return result[0]["team_id"] if result else None
+
+        team_id = get_result_cache().get_or_compute(("lineup_team", lineup_id, season_id), compute)
+        if team_id is None:
+            return None
+
+        table = self.lineup_stats(team_id, season_id)
+        row = table[table["lineup_id"] == lineup_id]
+        return row.iloc[0].to_dict() if len(row) else None
+
+
+    def on_off(self, team_id: int, player_id: int, season_id: str) -> Dict[str, Dict[str, float]]:
+        """
+        Team totals and ratings with `player_id` on and off the floor, plus their difference.
+        """
+        key = ("on_off", team_id, player_id, season_id)
+        compute = lambda: on_off(self.lineup_stats(team_id, season_id), player_id)
+        return get_result_cache().get_or_compute(key, compute, tags=lambda _: [team_id])
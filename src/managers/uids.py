@@ -0,0 +1,77 @@
+from threading import Lock
+from typing import Any, Dict, Sequence
+import numpy as np
+
+from ..manager import BaseManager
+from ..driver import game_database
+from ..cache import get_graph_cache
+from ..queries.uids import UID_LABELS, GET_MISSING_UIDS, ALLOCATE_UIDS, GET_UIDS, GET_UID_COUNTS, SET_UIDS
+
+
+# (node type, id) -> uid of the node types shared by many games. Registered uids never change, so
+# every process keeps what it has seen; per-game nodes are looked up once and never again.
+SHARED_TYPES = ("team", "player", "lineup")
+
+_uids = {}
+_uids_lock = Lock()
+
+
+class UidRegistry(BaseManager):
+    """
+    Global integer ids of the `to_pyg` node types: per node type, every id is registered once in
+    the default database (`(:Uid {label, id, uid})`) and numbered densely from 0, and its nodes
+    carry it as the indexed `uid` property in whichever database they live. A Player or a LineUp
+    therefore keeps the same uid across games and season partitions, and a purged and reloaded
+    game gets its uids back. Assigned by the `uids` ingest stage (`assign_game`).
+    """
+
+    def uids(self, node_type: str, ids: Sequence[Any]) -> np.ndarray:
+        """
+        The uids of `ids` (in order), registering the ids not seen before.
+        """
+        if node_type not in UID_LABELS:
+            raise ValueError(f"Unknown node type {node_type!r}, expected one of {list(UID_LABELS)}")
+
+        ids = [i.item() if hasattr(i, "item") else i for i in ids]
+        known = {i: _uids[(node_type, i)] for i in ids if (node_type, i) in _uids}
+        missing = list(dict.fromkeys(i for i in ids if i not in known))
+        if missing:
+            params = {"label": node_type, "ids": missing}
+            self.execute_write(ALLOCATE_UIDS, params)
+            rows = self.execute_read(GET_UIDS, params)
+            known.update(zip(rows[0]["ids"], rows[0]["uids"]))
+            if node_type in SHARED_TYPES:
+                with _uids_lock:
+                    _uids.update(((node_type, i), known[i]) for i in missing)
+
+        return np.array([known[i] for i in ids], dtype=np.int64)
+
+
+    def assign_game(self, game_id: int) -> Dict[str, int]:
+        """
+        Sets the uid of every node of a game's graph that has none yet. Returns the number of nodes
+        updated per node type.
+        """
+        database = game_database(game_id)
+        rows = self.execute_read(GET_MISSING_UIDS, {"game_id": game_id}, database=database)
+        if not rows:
+            raise ValueError(f"Game {game_id} not found in database!")
+
+        assigned = {}
+        for node_type, ids in rows[0].items():
+            if not ids:
+                continue
+            params = {"rows": {"id": ids, "uid": self.uids(node_type, ids).tolist()}}
+            assigned[node_type] = self.execute_chunked(SET_UIDS[node_type], params, "rows", database=database)
+
+        # A cached graph of the game was keyed by its string ids, with uid = -1.
+        if assigned:
+            get_graph_cache().invalidate(game_id)
+        return assigned
+
+
+    def counts(self) -> Dict[str, int]:
+        """
+        The number of uids registered per node type, i.e. the size of a global table indexed by uid.
+        """
+        return {row["label"]: row["count"] for row in self.execute_read(GET_UID_COUNTS)}
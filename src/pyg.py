@@ -0,0 +1,234 @@
+# core/pyg.py
+
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+
+import torch
+from torch_geometric.data import HeteroData
+
+from .transform import PLAYER_FEATURES, LINEUP_FEATURES
+
+
+PYG_VERSION = 4
+
+# node type -> (global clock column, clock duration column or None for instantaneous actions)
+TIME_FEATURES = {
+    'lineup_stint': (0, 2),
+    'player_stint': (0, 2),
+    'foul': (0, None),
+    'shot': (0, None),
+    'freethrow': (0, None),
+}
+
+
+def factorize(values: Sequence) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Maps `values` to dense integer codes, numbering uniques in order of first appearance.
+    Returns (uniques, codes, first) where `first` indexes the first row of each unique.
+    """
+    values = np.asarray(values)
+    uniques, first, codes = np.unique(values, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    rank = np.empty_like(order)
+    rank[order] = np.arange(order.size)
+    return uniques[order], rank[codes.reshape(-1)], first[order]
+
+
+def lookup(uniques: np.ndarray, values: Sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized index lookup of `values` into `uniques`.
+    Returns (codes, mask) where `mask` flags the values that were found.
+    """
+    values = np.asarray(values)
+    if uniques.size == 0 or values.size == 0:
+        return np.zeros(values.size, dtype=np.int64), np.zeros(values.size, dtype=bool)
+
+    sorter = np.argsort(uniques, kind="stable")
+    pos = np.searchsorted(uniques, values, sorter=sorter).clip(max=uniques.size - 1)
+    codes = sorter[pos]
+    return codes, uniques[codes] == values
+
+
+def edge_index(src: np.ndarray, dst: np.ndarray, mask: Optional[np.ndarray] = None) -> torch.Tensor:
+    """
+    Builds a deduplicated, lexicographically sorted [2, E] edge index.
+    """
+    if mask is not None:
+        src, dst = src[mask], dst[mask]
+    pairs = np.stack([np.asarray(src, dtype=np.int64), np.asarray(dst, dtype=np.int64)])
+    if pairs.shape[1] > 0:
+        pairs = np.unique(pairs, axis=1)
+    return torch.from_numpy(np.ascontiguousarray(pairs))
+
+
+def features(*cols: Sequence, index: Optional[np.ndarray] = None) -> torch.Tensor:
+    """
+    Stacks columns into a float [N, F] feature matrix, optionally gathering rows at `index`.
+    """
+    x = np.column_stack([np.asarray(c, dtype=np.float32) for c in cols])
+    if index is not None:
+        x = x[index]
+    return torch.from_numpy(np.ascontiguousarray(x, dtype=np.float32))
+
+
+def attach(uniques: np.ndarray, ids: Sequence, rows: Sequence, width: int) -> torch.Tensor:
+    """
+    Scatters per-entity feature rows onto the node order given by `uniques` (zeros where missing),
+    prefixed by a constant 1.0 column.
+    """
+    x = np.zeros((uniques.size, width + 1), dtype=np.float32)
+    x[:, 0] = 1.0
+    rows = np.asarray(rows, dtype=np.float32).reshape(-1, width)
+    codes, mask = lookup(uniques, ids)
+    x[codes[mask], 1:] = rows[mask]
+    return torch.from_numpy(x)
+
+
+# The id columns of `GET_GAME_GRAPH` that have a `_uid` twin.
+ID_COLUMNS = [
+    'q_id', 'l_id', 'p_id', 'ls_id', 'ps_id',
+    'ls_next_src', 'ls_next_dst', 'ps_next_src', 'ps_next_dst', 'ocn_src', 'ocn_dst',
+    'foul_id', 'foul_ps', 'foul_drawn_ps',
+    'shot_id', 'shot_ps', 'shot_assist_ps', 'shot_block_ps',
+    'ft_id', 'ft_ps', 'ft_foul',
+]
+
+
+def uid_column(name: str) -> str:
+    return f"{name[:-3]}_uid" if name.endswith("_id") else f"{name}_uid"
+
+
+def has_uids(cols: Dict[str, Any]) -> bool:
+    """
+    Whether every node of the graph has its uid (see `managers.uids`): the query's collect() drops
+    nulls, so each uid column must be as long as its id column.
+    """
+    return (
+        cols.get('g_uid') is not None
+        and None not in cols.get('team_uid', [None])
+        and all(len(cols.get(uid_column(name), ())) == len(cols[name]) for name in ID_COLUMNS)
+    )
+
+
+def uids(keys: np.ndarray, by_uid: bool) -> torch.Tensor:
+    """
+    The `uid` attribute of a node type: its global ids, or -1 while the game has none.
+    """
+    if by_uid:
+        return torch.from_numpy(keys.astype(np.int64))
+    return torch.full((keys.size,), -1, dtype=torch.long)
+
+
+def build_game_graph(team_ids: Tuple[int, int], cols: Dict[str, Any]) -> HeteroData:
+    """
+    Assembles the per-game `HeteroData` from the columnar arrays returned by `GET_GAME_GRAPH`.
+    Nodes are keyed by their integer uids when the game has them, by their string ids otherwise;
+    either way `node_id` holds the database ids and `uid` the global ids (-1 when unassigned).
+    """
+    by_uid = has_uids(cols)
+
+    def key(name: str) -> Sequence:
+        return cols[uid_column(name)] if by_uid else cols[name]
+
+    def node_ids(name: str, first: np.ndarray) -> np.ndarray:
+        return np.asarray(cols[name])[first]
+
+    data = HeteroData()
+
+    data['game'].x = torch.tensor([[1.0]], dtype=torch.float)
+    data['team'].x = torch.eye(2)
+    data['game'].uid = torch.tensor([cols['g_uid'] if by_uid else -1], dtype=torch.long)
+    data['team'].uid = torch.tensor(cols['team_uid'] if by_uid else [-1, -1], dtype=torch.long)
+
+    data['team', 'played_home', 'game'].edge_index = torch.tensor([[0], [0]], dtype=torch.long)
+    data['team', 'played_away', 'game'].edge_index = torch.tensor([[1], [0]], dtype=torch.long)
+
+    q_keys, q_idx, q_first = factorize(key('q_id'))
+    l_keys, l_idx, l_first = factorize(key('l_id'))
+    p_keys, p_idx, p_first = factorize(key('p_id'))
+    ls_keys, ls_idx, ls_first = factorize(key('ls_id'))
+    ps_keys, ps_idx, ps_first = factorize(key('ps_id'))
+    t_idx = np.where(np.asarray(cols['t_id']) == team_ids[0], 0, 1)
+    l_ids = node_ids('l_id', l_first)
+    p_ids = node_ids('p_id', p_first)
+
+    data['period'].x = features(cols['q_n'], index=q_first)
+    data['lineup'].x = attach(l_ids, cols.get('lf_id', []), cols.get('lf_x', []), LINEUP_FEATURES)
+    data['player'].x = attach(p_ids, cols.get('pf_id', []), cols.get('pf_x', []), PLAYER_FEATURES)
+    data['lineup_stint'].x = features(cols['ls_global_clock'], cols['ls_local_clock'], cols['ls_duration'], index=ls_first)
+    data['player_stint'].x = features(cols['ps_global_clock'], cols['ps_local_clock'], cols['ps_duration'], index=ps_first)
+
+    data['period'].node_id = node_ids('q_id', q_first).tolist()
+    data['lineup'].node_id = l_ids.tolist()
+    data['player'].node_id = p_ids.tolist()
+    data['lineup_stint'].node_id = node_ids('ls_id', ls_first).tolist()
+    data['player_stint'].node_id = node_ids('ps_id', ps_first).tolist()
+
+    data['period'].uid = uids(q_keys, by_uid)
+    data['lineup'].uid = uids(l_keys, by_uid)
+    data['player'].uid = uids(p_keys, by_uid)
+    data['lineup_stint'].uid = uids(ls_keys, by_uid)
+    data['player_stint'].uid = uids(ps_keys, by_uid)
+
+    data['period', 'in_game', 'game'].edge_index = edge_index(np.arange(q_keys.size), np.zeros(q_keys.size))
+    data['team', 'has_lineup', 'lineup'].edge_index = edge_index(t_idx, l_idx)
+    data['player', 'member_of', 'lineup'].edge_index = edge_index(p_idx, l_idx)
+    data['lineup', 'on_court', 'lineup_stint'].edge_index = edge_index(l_idx, ls_idx)
+    data['player', 'on_court', 'player_stint'].edge_index = edge_index(p_idx, ps_idx)
+    data['player_stint', 'on_court_with', 'lineup_stint'].edge_index = edge_index(ps_idx, ls_idx)
+    data['lineup_stint', 'in_period', 'period'].edge_index = edge_index(ls_idx, q_idx)
+    data['player_stint', 'in_period', 'period'].edge_index = edge_index(ps_idx, q_idx)
+
+    src, src_mask = lookup(ls_keys, key('ls_next_src'))
+    dst, dst_mask = lookup(ls_keys, key('ls_next_dst'))
+    data['lineup_stint', 'next', 'lineup_stint'].edge_index = edge_index(src, dst, src_mask & dst_mask)
+
+    src, src_mask = lookup(ps_keys, key('ps_next_src'))
+    dst, dst_mask = lookup(ps_keys, key('ps_next_dst'))
+    data['player_stint', 'next', 'player_stint'].edge_index = edge_index(src, dst, src_mask & dst_mask)
+
+    src, src_mask = lookup(ls_keys, key('ocn_src'))
+    dst, dst_mask = lookup(ls_keys, key('ocn_dst'))
+    data['lineup_stint', 'on_court_next', 'lineup_stint'].edge_index = edge_index(src, dst, src_mask & dst_mask)
+
+
+    foul_keys, foul_idx, foul_first = factorize(key('foul_id'))
+    data['foul'].x = features(cols['foul_global_clock'], cols['foul_local_clock'], index=foul_first)
+    data['foul'].node_id = node_ids('foul_id', foul_first).tolist()
+    data['foul'].uid = uids(foul_keys, by_uid)
+
+    ps, mask = lookup(ps_keys, key('foul_ps'))
+    data['player_stint', 'committed_foul', 'foul'].edge_index = edge_index(ps, foul_idx, mask)
+    ps, mask = lookup(ps_keys, key('foul_drawn_ps'))
+    data['player_stint', 'drew_foul', 'foul'].edge_index = edge_index(ps, foul_idx, mask)
+
+
+    shot_keys, shot_idx, shot_first = factorize(key('shot_id'))
+    data['shot'].x = features(
+        cols['shot_global_clock'], cols['shot_local_clock'],
+        cols['shot_x'], cols['shot_y'], cols['shot_distance'],
+        cols['shot_2pt'], cols['shot_3pt'], cols['shot_made'],
+        index=shot_first
+    )
+    data['shot'].node_id = node_ids('shot_id', shot_first).tolist()
+    data['shot'].uid = uids(shot_keys, by_uid)
+
+    ps, mask = lookup(ps_keys, key('shot_ps'))
+    data['player_stint', 'took_shot', 'shot'].edge_index = edge_index(ps, shot_idx, mask)
+    ps, mask = lookup(ps_keys, key('shot_assist_ps'))
+    data['player_stint', 'assisted', 'shot'].edge_index = edge_index(ps, shot_idx, mask)
+    ps, mask = lookup(ps_keys, key('shot_block_ps'))
+    data['player_stint', 'blocked', 'shot'].edge_index = edge_index(ps, shot_idx, mask)
+
+
+    ft_keys, ft_idx, ft_first = factorize(key('ft_id'))
+    data['freethrow'].x = features(cols['ft_global_clock'], cols['ft_local_clock'], cols['ft_made'], index=ft_first)
+    data['freethrow'].node_id = node_ids('ft_id', ft_first).tolist()
+    data['freethrow'].uid = uids(ft_keys, by_uid)
+
+    ps, mask = lookup(ps_keys, key('ft_ps'))
+    data['player_stint', 'took_shot', 'freethrow'].edge_index = edge_index(ps, ft_idx, mask)
+    foul, mask = lookup(foul_keys, key('ft_foul'))
+    data['foul', 'caused', 'freethrow'].edge_index = edge_index(foul, ft_idx, mask)
+
+    return data
@@ -0,0 +1,49 @@
+# Node types of the `to_pyg` graphs that can carry an embedding, and their labels.
+EMBEDDING_LABELS = {"player": "Player", "lineup": "LineUp", "lineup_stint": "LineUpStint", "player_stint": "PlayerStint"}
+
+SIMILARITY_FUNCTIONS = ["cosine", "euclidean"]
+
+
+# Formatted with the index name, label, dimensions and similarity function (validated by the caller).
+CREATE_EMBEDDING_INDEX = """
+    CREATE VECTOR INDEX {index} IF NOT EXISTS
+    FOR (n:{label}) ON n.embedding
+    OPTIONS {{indexConfig: {{
+        `vector.dimensions`: {dimensions},
+        `vector.similarity_function`: '{similarity}'
+    }}}}
+"""
+
+
+AWAIT_INDEX = """
+    CALL db.awaitIndex($index, $timeout)
+"""
+
+
+# `setNodeVectorProperty` stores the vector as floats, half the size of a list property.
+SET_EMBEDDINGS = {node_type: f"""
+    UNWIND range(0, size($rows.id) - 1) AS i
+    MATCH (n:{label} {{id: $rows.id[i]}})
+    CALL db.create.setNodeVectorProperty(n, 'embedding', $rows.embedding[i])
+    SET n.embedding_model = $model
+""" for node_type, label in EMBEDDING_LABELS.items()}
+
+
+GET_MOST_SIMILAR = {node_type: f"""
+    MATCH (n:{label} {{id: $id}})
+    WHERE n.embedding IS NOT NULL
+    CALL db.index.vector.queryNodes($index, $candidates, n.embedding)
+    YIELD node, score
+    WHERE node <> n {"AND ($team_id IS NULL OR EXISTS { (:Team {id: $team_id})-[:HAS_LINEUP]->(node) })" if node_type == "lineup" else ""}
+    RETURN node.id AS id, score
+    ORDER BY score DESC
+    LIMIT $k
+""" for node_type, label in EMBEDDING_LABELS.items()}
+
+
+GET_NEAREST = """
+    CALL db.index.vector.queryNodes($index, $k, $vector)
+    YIELD node, score
+    RETURN node.id AS id, score
+    ORDER BY score DESC
+"""
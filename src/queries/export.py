@@ -0,0 +1,89 @@
+# Nodes whose id is prefixed by "<game_id>_": exported per game, partitioned by season and date.
+GAME_LABELS = ["Period", "LineUpStint", "PlayerStint", "Action", "Score", "Possession", "PlayerGameStats", "LineUpGameStats"]
+
+# Nodes shared across games, keyed by their unique property: exported whole on every run.
+DIMENSION_LABELS = {"Season": "id", "Team": "id", "Player": "id", "LineUp": "id", "Arena": "name", "City": "name", "State": "name"}
+
+NODE_LABELS = ["Game"] + GAME_LABELS + list(DIMENSION_LABELS)
+
+
+GET_EXPORT_GAMES = """
+    MATCH (g:Game)
+    WHERE g.ingest_hash IS NOT NULL
+    RETURN
+        g.id AS game_id,
+        toString(date(g.date)) AS date,
+        coalesce(g.ingested_at.epochMillis, 0) AS ingested_at
+    ORDER BY g.id ASC
+"""
+
+
+GET_GAME_NODES = """
+    UNWIND $game_ids AS game_id
+    MATCH (n:Game {id: game_id})
+    RETURN
+        n.id AS id,
+        labels(n) AS labels,
+        properties(n) AS properties
+    ORDER BY n.id ASC
+"""
+
+
+# Keyset pages over the id uniqueness index of each label: `$after` is the last id of the previous page.
+GET_GAME_LABEL_NODES = {label: f"""
+    MATCH (n:{label})
+    WHERE n.id STARTS WITH $prefix AND n.id > $after
+    RETURN
+        n.id AS id,
+        labels(n) AS labels,
+        properties(n) AS properties
+    ORDER BY n.id ASC
+    LIMIT $page_size
+""" for label in GAME_LABELS}
+
+
+GET_DIMENSION_NODES = {label: f"""
+    MATCH (n:{label})
+    WHERE n.{key} > $after
+    RETURN
+        n.{key} AS id,
+        labels(n) AS labels,
+        properties(n) AS properties
+    ORDER BY n.{key} ASC
+    LIMIT $page_size
+""" for label, key in DIMENSION_LABELS.items()}
+
+
+# The edges of a page of nodes: every outgoing relationship, plus the incoming ones from shared
+# nodes (a Team's PLAYED_HOME, a LineUp's ON_COURT), so each relationship is exported exactly once.
+GET_GAME_EDGES = {label: f"""
+    UNWIND $ids AS id
+    MATCH (a:{label} {{id: id}})
+    CALL (a) {{
+        MATCH (a)-[r]->(b)
+        RETURN r, a AS src, b AS dst
+        UNION
+        MATCH (a)<-[r]-(b:{"|".join(DIMENSION_LABELS)})
+        RETURN r, b AS src, a AS dst
+    }}
+    RETURN
+        type(r) AS type,
+        [l IN labels(src) WHERE l IN $labels][0] AS src_label,
+        toString(coalesce(src.id, src.name)) AS src_id,
+        [l IN labels(dst) WHERE l IN $labels][0] AS dst_label,
+        toString(coalesce(dst.id, dst.name)) AS dst_id,
+        properties(r) AS properties
+""" for label in ["Game"] + GAME_LABELS}
+
+
+GET_DIMENSION_EDGES = {label: f"""
+    UNWIND $ids AS id
+    MATCH (a:{label} {{{key}: id}})-[r]->(b:{"|".join(DIMENSION_LABELS)})
+    RETURN
+        type(r) AS type,
+        [l IN labels(a) WHERE l IN $labels][0] AS src_label,
+        toString(coalesce(a.id, a.name)) AS src_id,
+        [l IN labels(b) WHERE l IN $labels][0] AS dst_label,
+        toString(coalesce(b.id, b.name)) AS dst_id,
+        properties(r) AS properties
+""" for label, key in DIMENSION_LABELS.items()}
@@ -0,0 +1,149 @@
+# core/queries/features.py
+
+GET_GAME_STATS_INPUT = """
+    MATCH (g:Game {id: $game_id})-[:IN_SEASON]->(season:Season)
+    MATCH (home:Team)-[:PLAYED_HOME]->(g)
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)<-[:ON_COURT]-(l:LineUp)<-[:HAS_LINEUP]-(t:Team)
+        RETURN
+            collect(ls.id) AS ls_id,
+            collect(l.id) AS ls_lineup,
+            collect(t.id) AS ls_team,
+            collect(ls.start_time.epochMillis) AS ls_start,
+            collect(ls.end_time.epochMillis) AS ls_end,
+            collect(ls.clock_duration) AS ls_duration
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)<-[:ON_COURT_WITH]-(ps:PlayerStint)<-[:ON_COURT]-(p:Player)
+        RETURN
+            collect(ps.id) AS ps_id,
+            collect(p.id) AS ps_player,
+            collect(ls.id) AS ps_ls,
+            collect(ps.clock_duration) AS ps_duration
+    }
+
+    CALL (g) {
+        MATCH (p:Player)-[:ON_COURT]->(:PlayerStint)-[:TOOK_SHOT]->(s:Shot)
+        WHERE s.id STARTS WITH toString(g.id) + "_"
+        RETURN
+            collect(p.id) AS shot_player,
+            collect(s:FreeThrow) AS shot_ft,
+            collect(s:`3PT`) AS shot_3pt,
+            collect(s:Made) AS shot_made
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(poss:Possession)
+        RETURN
+            collect(poss.team_id) AS poss_team,
+            collect(poss.end_time.epochMillis) AS poss_end
+    }
+
+    CALL (g) {
+        MATCH (sc:Score)
+        WHERE sc.id STARTS WITH toString(g.id) + "_"
+        RETURN
+            collect(sc.time.epochMillis) AS score_time,
+            collect(sc.home_score) AS score_home,
+            collect(sc.away_score) AS score_away
+    }
+
+    RETURN
+        g.id AS game_id,
+        toString(g.date) AS date,
+        season.id AS season_id,
+        home.id AS home_team_id,
+        ls_id, ls_lineup, ls_team, ls_start, ls_end, ls_duration,
+        ps_id, ps_player, ps_ls, ps_duration,
+        shot_player, shot_ft, shot_3pt, shot_made,
+        poss_team, poss_end,
+        score_time, score_home, score_away
+"""
+
+
+SET_STINT_STATS = """
+    CALL () {
+        UNWIND $lineup_stints AS row
+        MATCH (ls:LineUpStint {id: row.id})
+        SET
+            ls.points_scored = row.points_scored,
+            ls.points_conceded = row.points_conceded,
+            ls.plus_minus = row.plus_minus,
+            ls.possessions = row.possessions,
+            ls.opp_possessions = row.opp_possessions
+    }
+    CALL () {
+        UNWIND $player_stints AS row
+        MATCH (ps:PlayerStint {id: row.id})
+        SET
+            ps.points_scored = row.points_scored,
+            ps.points_conceded = row.points_conceded,
+            ps.plus_minus = row.plus_minus
+    }
+"""
+
+
+GET_PLAYER_HISTORY = """
+    UNWIND $ids AS entity_id
+    CALL (entity_id) {
+        MATCH (f:PlayerGameStats {player_id: entity_id})
+        WHERE f.season_id = $season_id AND f.date < datetime($date)
+        WITH f ORDER BY f.date DESC
+        LIMIT $n
+        RETURN collect(properties(f)) AS history
+    }
+    RETURN entity_id, history
+"""
+
+
+GET_LINEUP_HISTORY = """
+    UNWIND $ids AS entity_id
+    CALL (entity_id) {
+        MATCH (f:LineUpGameStats {lineup_id: entity_id})
+        WHERE f.season_id = $season_id AND f.date < datetime($date)
+        WITH f ORDER BY f.date DESC
+        LIMIT $n
+        RETURN collect(properties(f)) AS history
+    }
+    RETURN entity_id, history
+"""
+
+
+MERGE_PLAYER_GAME_STATS = """
+    MATCH (g:Game {id: $game_id})
+    UNWIND $rows AS row
+    MERGE (f:PlayerGameStats {id: toString(g.id) + "_" + toString(row.player_id)})
+    SET
+        f += row,
+        f.game_id = g.id,
+        f.season_id = $season_id,
+        f.date = g.date
+"""
+
+
+MERGE_LINEUP_GAME_STATS = """
+    MATCH (g:Game {id: $game_id})
+    UNWIND $rows AS row
+    MERGE (f:LineUpGameStats {id: toString(g.id) + "_" + row.lineup_id})
+    SET
+        f += row,
+        f.game_id = g.id,
+        f.season_id = $season_id,
+        f.date = g.date
+"""
+
+
+GET_GAME_FEATURES = """
+    MATCH (g:Game {id: $game_id})
+    CALL (g) {
+        MATCH (f:PlayerGameStats {game_id: g.id})
+        RETURN collect(f.player_id) AS pf_id, collect(f.x) AS pf_x
+    }
+    CALL (g) {
+        MATCH (f:LineUpGameStats {game_id: g.id})
+        RETURN collect(f.lineup_id) AS lf_id, collect(f.x) AS lf_x
+    }
+    RETURN pf_id, pf_x, lf_id, lf_x
+"""
@@ -1,10 +1,115 @@
+from ..transform import ACTION_COLUMNS
+
+
+def _unwind_actions(param: str, alias: str, kind: str) -> str:
+    """
+    Unwinds the struct-of-arrays payload `$param` (see `transform.action_columns`) into one
+    `alias` map per action, indexing every column at the same position. `alias.labels` holds the
+    action's descriptor labels, set with a single dynamic-label clause.
+    """
+    fields = [f"time: datetime({{epochMillis: ${param}.time[i]}})"]
+    fields += [f"{name}: ${param}.{name}[i]" for name in ACTION_COLUMNS[kind] + ["labels"] if name != "time"]
+    row = ",\n        ".join(fields)
+    return f"""
+    UNWIND range(0, size(${param}.time) - 1) AS i
+    WITH g, {{
+        {row}
+    }} AS {alias}"""
+
+
+
 GET_TEAMS = """
     MATCH (g:Game {id: $game_id})
     MATCH (ht)-[:PLAYED_HOME]->(g)
     MATCH (at:Team)-[:PLAYED_AWAY]->(g)
     RETURN 
         ht.id AS home_team_id, 
-        at.id AS away_team_id 
+        at.id AS away_team_id,
+        g.ingest_hash AS ingest_hash,
+        g.ingest_source AS ingest_source,
+        coalesce(g.ingest_stages, []) AS ingest_stages
+"""
+
+
+GET_GAMES_TEAMS = """
+    UNWIND $game_ids AS game_id
+    MATCH (g:Game {id: game_id})
+    MATCH (ht:Team)-[:PLAYED_HOME]->(g)
+    MATCH (at:Team)-[:PLAYED_AWAY]->(g)
+    RETURN 
+        g.id AS game_id,
+        ht.id AS home_team_id, 
+        at.id AS away_team_id,
+        g.ingest_hash AS ingest_hash,
+        g.ingest_source AS ingest_source,
+        coalesce(g.ingest_stages, []) AS ingest_stages
+"""
+
+
+GET_SEASON_GAMES_TEAMS = """
+    MATCH (g:Game)-[:IN_SEASON]->(:Season {id: $season_id})
+    WHERE datetime($start) <= g.date < datetime($end) + duration({days: 1})
+    MATCH (ht:Team)-[:PLAYED_HOME]->(g)
+    MATCH (at:Team)-[:PLAYED_AWAY]->(g)
+    RETURN 
+        g.id AS game_id,
+        ht.id AS home_team_id, 
+        at.id AS away_team_id,
+        g.ingest_hash AS ingest_hash,
+        g.ingest_source AS ingest_source,
+        coalesce(g.ingest_stages, []) AS ingest_stages
+    ORDER BY g.date ASC, g.id ASC
+"""
+
+
+SET_INGEST_HASH = """
+    MATCH (g:Game {id: $game_id})
+    SET 
+        g.ingest_hash = $ingest_hash,
+        g.ingested_at = datetime()
+"""
+
+
+SET_INGEST_SOURCE = """
+    MATCH (g:Game {id: $game_id})
+    SET
+        g.ingest_hash = null,
+        g.ingest_source = $ingest_source,
+        g.ingest_stages = []
+"""
+
+
+MARK_INGEST_STAGE = """
+    MATCH (g:Game {id: $game_id})
+    SET g.ingest_stages = [s IN coalesce(g.ingest_stages, []) WHERE s <> $stage] + $stage
+"""
+
+
+RESET_INGEST = """
+    MATCH (g:Game {id: $game_id})
+    REMOVE g.ingest_hash, g.ingest_source, g.ingest_stages, g.ingested_at
+"""
+
+
+# Every node of a game's subgraph has an id prefixed by "<game_id>_": the prefix seeks the id
+# uniqueness index of each label. Children go first so batches never leave dangling stints.
+PURGE_GAME_LABELS = ["Score", "Action", "Possession", "PlayerStint", "LineUpStint", "Period"]
+
+PURGE_GAME_NODES = {label: f"""
+    MATCH (n:{label})
+    WHERE n.id STARTS WITH $prefix
+    CALL (n) {{
+        DETACH DELETE n
+    }} IN TRANSACTIONS OF $batch_size ROWS
+""" for label in PURGE_GAME_LABELS}
+
+
+PURGE_GAME_STATS = """
+    MATCH (f:PlayerGameStats|LineUpGameStats)
+    WHERE f.game_id = $game_id
+    CALL (f) {
+        DETACH DELETE f
+    } IN TRANSACTIONS OF $batch_size ROWS
 """
 
 
@@ -208,7 +313,7 @@ MERGE_STINTS = """
 
 MERGE_JUMPBALLS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND $jumpballs AS jb
+""" + _unwind_actions("jumpballs", "jb", "jumpball") + """
 
     WITH g, jb,
         toString(g.id) + "_" + toString(jb.period) + "_" + jb.clock + "_jb_" + 
@@ -216,16 +321,12 @@ MERGE_JUMPBALLS = """
 
     MERGE (j:Action:JumpBall {id: jb_id})
     ON CREATE SET 
-        j.time = datetime(jb.time),
+        j.time = jb.time,
         j.clock = duration(jb.clock),
         j.local_clock = jb.local_clock,
         j.global_clock = jb.global_clock
 
-    FOREACH (_ IN CASE WHEN jb.subtype = 'recovered' THEN [1] ELSE [] END | SET j:Recovered)
-
-    FOREACH (_ IN CASE WHEN jb.descriptor = 'startperiod' THEN [1] ELSE [] END | SET j:StartPeriod)
-    FOREACH (_ IN CASE WHEN jb.descriptor = 'heldball' THEN [1] ELSE [] END | SET j:HeldBall) 
-    FOREACH (_ IN CASE WHEN jb.descriptor = 'unclearpass' THEN [1] ELSE [] END | SET j:UnclearPass)
+    SET j:$(jb.labels)
 
     WITH g, j, jb
     WHERE jb.team_id IS NOT NULL 
@@ -262,7 +363,7 @@ MERGE_JUMPBALLS = """
 
 MERGE_VIOLATIONS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND $violations AS vio
+""" + _unwind_actions("violations", "vio", "violation") + """
 
     WITH g, vio,
         toString(g.id) + "_" + toString(vio.period) + "_" + vio.clock + "_violation_" + 
@@ -270,18 +371,12 @@ MERGE_VIOLATIONS = """
 
     MERGE (v:Action:Violation {id: vio_id})
     ON CREATE SET 
-        v.time = datetime(vio.time),
+        v.time = vio.time,
         v.clock = duration(vio.clock),
         v.local_clock = vio.local_clock,
         v.global_clock = vio.global_clock
 
-    FOREACH (_ IN CASE WHEN vio.subtype = 'kicked ball' THEN [1] ELSE [] END | SET v:KickedBall)
-    FOREACH (_ IN CASE WHEN vio.subtype = 'delay-of-game' THEN [1] ELSE [] END | SET v:DelayOfGame)
-    FOREACH (_ IN CASE WHEN vio.subtype = 'lane' THEN [1] ELSE [] END | SET v:LaneViolation)
-    FOREACH (_ IN CASE WHEN vio.subtype = 'goaltending' THEN [1] ELSE [] END | SET v:Goaltending)
-    FOREACH (_ IN CASE WHEN vio.subtype = 'defensive goaltending' THEN [1] ELSE [] END | SET v:DefensiveGoaltending)
-    FOREACH (_ IN CASE WHEN vio.subtype = 'double dribble' THEN [1] ELSE [] END | SET v:DoubleDribble)
-    FOREACH (_ IN CASE WHEN vio.subtype = 'jump ball' THEN [1] ELSE [] END | SET v:JumpBallViolation)
+    SET v:$(vio.labels)
 
     WITH g, v, vio
     MATCH (:Team {id: vio.team_id})-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)
@@ -302,7 +397,7 @@ MERGE_VIOLATIONS = """
 
 MERGE_FOULS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND $fouls AS foul
+""" + _unwind_actions("fouls", "foul", "foul") + """
 
     WITH g, foul,
         toString(g.id) + "_" + toString(foul.period) + "_" + foul.clock + "_foul_" + 
@@ -310,23 +405,13 @@ MERGE_FOULS = """
 
     MERGE (f:Action:Foul {id: foul_id})
     ON CREATE SET 
-        f.time = datetime(foul.time),
+        f.time = foul.time,
         f.clock = duration(foul.clock),
         f.local_clock = foul.local_clock,
         f.global_clock = foul.global_clock
 
-    FOREACH (_ IN CASE WHEN foul.subtype = 'offensive' THEN [1] ELSE [] END | SET f:Offensive) 
+    SET f:$(foul.labels)
     // maybe do a causal link?
-    
-    FOREACH (_ IN CASE WHEN foul.subtype = 'technical' THEN [1] ELSE [] END | SET f:Technical)
-    FOREACH (_ IN CASE WHEN foul.subtype = 'personal' THEN [1] ELSE [] END | SET f:Personal)
-    FOREACH (_ IN CASE WHEN foul.subtype = 'flagrant' THEN [1] ELSE [] END | SET f:Flagrant)
-
-    FOREACH (_ IN CASE WHEN foul.descriptor = 'shooting' THEN [1] ELSE [] END | SET f:Shooting)
-    FOREACH (_ IN CASE WHEN foul.descriptor = 'loose ball' THEN [1] ELSE [] END | SET f:LooseBall)
-    FOREACH (_ IN CASE WHEN foul.descriptor = 'take' THEN [1] ELSE [] END | SET f:Take)
-    FOREACH (_ IN CASE WHEN foul.descriptor = 'defensive-3-second' THEN [1] ELSE [] END | SET f:Def3Sec)
-    FOREACH (_ IN CASE WHEN foul.descriptor = 'charge' THEN [1] ELSE [] END | SET f:Charge)
 
     WITH g, f, foul
     MATCH (t:Team {id: foul.team_id})-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)
@@ -360,14 +445,14 @@ MERGE_FOULS = """
 
 MERGE_SHOTS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND $shots as shot
-    
+""" + _unwind_actions("shots", "shot", "shot") + """
+
     WITH g, shot, 
         toString(g.id) + "_" + toString(shot.period) + "_" + shot.clock + "_shot_" + toString(shot.player_id) AS shot_id
 
     MERGE (s:Action:Shot {id: shot_id})
     ON CREATE SET 
-        s.time = datetime(shot.time),
+        s.time = shot.time,
         s.clock = duration(shot.clock),
         s.local_clock = shot.local_clock,
         s.global_clock = shot.global_clock,
@@ -375,26 +460,7 @@ MERGE_SHOTS = """
         s.y = shot.y,
         s.distance = shot.distance
 
-    FOREACH (_ IN CASE WHEN shot.type = '2pt' THEN [1] ELSE [] END | SET s:`2PT`)
-    FOREACH (_ IN CASE WHEN shot.type = '3pt' THEN [1] ELSE [] END | SET s:`3PT`)
-    FOREACH (_ IN CASE WHEN shot.result = 'Made' THEN [1] ELSE [] END | SET s:Made)
-    FOREACH (_ IN CASE WHEN shot.result = 'Missed' THEN [1] ELSE [] END | SET s:Missed)
-
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'driving' THEN [1] ELSE [] END | SET s:Driving)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'running' THEN [1] ELSE [] END | SET s:Running)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'cutting' THEN [1] ELSE [] END | SET s:Cutting)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'step back' THEN [1] ELSE [] END | SET s:StepBack)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'pullup' THEN [1] ELSE [] END | SET s:PullUp)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'turnaround' THEN [1] ELSE [] END | SET s:TurnAround)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'reverse' THEN [1] ELSE [] END | SET s:Reverse)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'fadeaway' THEN [1] ELSE [] END | SET s:Fadeaway)
-
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'bank' THEN [1] ELSE [] END | SET s:Bank)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'floating' THEN [1] ELSE [] END | SET s:Floater)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'finger roll' THEN [1] ELSE [] END | SET s:FingerRoll)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'alley-oop' THEN [1] ELSE [] END | SET s:AlleyOop)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'tip' THEN [1] ELSE [] END | SET s:Tip)
-    FOREACH (_ IN CASE WHEN shot.descriptor CONTAINS 'putback' THEN [1] ELSE [] END | SET s:PutBack)
+    SET s:$(shot.labels)
 
     WITH g, s, shot
     MATCH (t:Team {id: shot.team_id})-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)
@@ -430,8 +496,7 @@ MERGE_SHOTS = """
 
 MERGE_FREETHROWS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND range(0, size($shots)-1) as i
-    WITH g, $shots[i] as ft
+""" + _unwind_actions("shots", "ft", "freethrow") + """
     WITH g, ft,
         CASE WHEN ft.subtype CONTAINS 'of' 
             THEN toInteger(split(ft.subtype, ' ')[0]) 
@@ -443,14 +508,13 @@ MERGE_FREETHROWS = """
 
     MERGE (s:Action:Shot:FreeThrow {id: ft_id})
     ON CREATE SET 
-        s.time = datetime(ft.time) + duration({milliseconds: attempt_number * 100}),
+        s.time = ft.time + duration({milliseconds: attempt_number * 100}),
         s.clock = duration(ft.clock),
         s.local_clock = ft.local_clock,
         s.global_clock = ft.global_clock,
         s.attempt = attempt_number
 
-    FOREACH (_ IN CASE WHEN ft.result = 'Made' THEN [1] ELSE [] END | SET s:Made)
-    FOREACH (_ IN CASE WHEN ft.result = 'Missed' THEN [1] ELSE [] END | SET s:Missed)
+    SET s:$(ft.labels)
 
     // WITH g, s, ft
     // MATCH (f:Action:Foul)
@@ -473,20 +537,21 @@ MERGE_FREETHROWS = """
 
 
 MERGE_REBOUNDS = """
-    UNWIND $rebounds AS reb
-    WITH reb,
+    MATCH (g:Game {id: $game_id})
+""" + _unwind_actions("rebounds", "reb", "rebound") + """
+
+    WITH g, reb,
         toString($game_id) + "_" + toString(reb.period) + "_" + reb.clock + "_reb_" + 
         COALESCE(toString(NULLIF(reb.player_id, 0)), toString(reb.team_id)) AS reb_id
 
     MERGE (r:Action:Rebound {id: reb_id})
     ON CREATE SET 
-        r.time = datetime(reb.time),
+        r.time = reb.time,
         r.clock = duration(reb.clock),
         r.local_clock = reb.local_clock,
         r.global_clock = reb.global_clock
 
-    FOREACH (_ IN CASE WHEN reb.subtype = 'offensive' THEN [1] ELSE [] END | SET r:Offensive)
-    FOREACH (_ IN CASE WHEN reb.subtype = 'defensive' THEN [1] ELSE [] END | SET r:Defensive)
+    SET r:$(reb.labels)
 
     WITH g, r, reb
     MATCH (:Team {id: reb.team_id})-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)
@@ -503,20 +568,21 @@ MERGE_REBOUNDS = """
         MERGE (ls)-[:REBOUNDED]->(r)
     )
     
-    WITH r
-    MATCH (s:Shot:Missed)
-    WHERE s.id STARTS WITH toString($game_id) 
-        AND s.global_clock <= r.global_clock <= s.global_clock + 10.0 
-        AND NOT EXISTS { MATCH (:Rebound)-[:REBOUND_OF]->(s) }
-    
-    WITH s ORDER BY s.global_clock DESC LIMIT 1
+    WITH DISTINCT r
+    CALL (r) {
+        MATCH (s:Shot:Missed)
+        WHERE s.id STARTS WITH toString($game_id) 
+            AND s.global_clock <= r.global_clock <= s.global_clock + 10.0 
+            AND NOT EXISTS { MATCH (:Rebound)-[:REBOUND_OF]->(s) }
+        RETURN s ORDER BY s.global_clock DESC LIMIT 1
+    }
     MERGE (r)-[:REBOUND_OF]->(s)
 """
 
 
 MERGE_TURNOVERS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND $turnovers AS tov
+""" + _unwind_actions("turnovers", "tov", "turnover") + """
 
     WITH g, tov,
         toString(g.id) + "_" + toString(tov.period) + "_" + tov.clock + "_" + "tov_" + 
@@ -524,21 +590,12 @@ MERGE_TURNOVERS = """
 
     MERGE (t:Action:TurnOver {id: tov_id})
     ON CREATE SET 
-        t.time = datetime(tov.time),
+        t.time = tov.time,
         t.clock = duration(tov.clock),
         t.local_clock = tov.local_clock,
         t.global_clock = tov.global_clock
 
-    FOREACH (_ IN CASE WHEN tov.subtype = 'bad pass' THEN [1] ELSE [] END | SET t:BadPass)
-    FOREACH (_ IN CASE WHEN tov.subtype = 'lost ball' THEN [1] ELSE [] END | SET t:LostBall)
-    FOREACH (_ IN CASE WHEN tov.subtype = 'traveling' THEN [1] ELSE [] END | SET t:Traveling)
-    FOREACH (_ IN CASE WHEN tov.subtype = 'out-of-bounds' THEN [1] ELSE [] END | SET t:OutOfBounds)
-    FOREACH (_ IN CASE WHEN tov.subtype = 'offensive foul' THEN [1] ELSE [] END | SET t:OffensiveFoul)
-    FOREACH (_ IN CASE WHEN tov.subtype = 'shot clock' THEN [1] ELSE [] END | SET t:ShotClock)
-
-    FOREACH (_ IN CASE WHEN tov.descriptor = 'lost ball' THEN [1] ELSE [] END | SET t:LostBall)
-    FOREACH (_ IN CASE WHEN tov.descriptor = 'bas pass' THEN [1] ELSE [] END | SET t:BadPass)
-    FOREACH (_ IN CASE WHEN tov.descriptor = 'step' THEN [1] ELSE [] END | SET t:Step)
+    SET t:$(tov.labels)
 
     WITH g, t, tov
     MATCH (team:Team {id: tov.team_id})-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)
@@ -570,20 +627,19 @@ MERGE_TURNOVERS = """
 
 MERGE_TIMEOUTS = """
     MATCH (g:Game {id: $game_id})
-    UNWIND $timeouts AS to
+""" + _unwind_actions("timeouts", "to", "timeout") + """
 
     WITH g, to,
         toString(g.id) + "_" + toString(to.period) + "_" + to.clock + "_timeout_" + toString(to.team_id) AS to_id
 
     MERGE (t:Action:TimeOut {id: to_id})
     ON CREATE SET 
-        t.time = datetime(to.time),
+        t.time = to.time,
         t.clock = duration(to.clock),
         t.local_clock = to.local_clock,
         t.global_clock = to.global_clock
 
-    FOREACH (_ IN CASE WHEN to.subtype = 'full' THEN [1] ELSE [] END | SET t:FullTimeOut)
-    FOREACH (_ IN CASE WHEN to.subtype = 'short' THEN [1] ELSE [] END | SET t:ShortTimeOut)
+    SET t:$(to.labels)
 
     WITH t, to
     MATCH (:Team {id: to.team_id})-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)
@@ -770,6 +826,77 @@ MERGE_NEXT_ACTION = """
 
 
 
+# The game's possessions are rebuilt from scratch: when a changed source shifts their boundaries,
+# surviving possessions must not keep the actions and stints of their previous extent.
+MERGE_POSSESSIONS = """
+    MATCH (g:Game {id: $game_id})
+
+    CALL (g) {
+        MATCH (old:Possession)-[:IN_PERIOD]->(:Period)-[:IN_GAME]->(g)
+        DETACH DELETE old
+    }
+
+    WITH g
+    UNWIND $possessions AS pos
+    MATCH (p:Period)-[:IN_GAME]->(g)
+    WHERE p.n = pos.period
+
+    MERGE (poss:Possession {id: toString(g.id) + "_poss_" + toString(pos.n)})
+    SET
+        poss.n = pos.n,
+        poss.team_id = pos.team_id,
+        poss.start_time = datetime(pos.start_time),
+        poss.end_time = datetime(pos.end_time),
+        poss.local_clock = pos.local_clock,
+        poss.global_clock = pos.global_clock,
+        poss.clock_duration = pos.clock_duration,
+        poss.points = pos.points
+    MERGE (poss)-[:IN_PERIOD]->(p)
+
+    // A possession starts at the end of the previous one, except the first of a period, which
+    // starts at (and owns) the period's first action.
+    WITH g, p, pos, poss
+    CALL (g, pos, poss) {
+        MATCH (a:Action)
+        WHERE (poss.start_time < a.time OR (pos.first AND poss.start_time = a.time))
+            AND a.time <= poss.end_time
+            AND a.id STARTS WITH toString(g.id) + "_"
+        MERGE (a)-[:IN_POSSESSION]->(poss)
+    }
+
+    CALL (p, poss) {
+        MATCH (t:Team)-[:HAS_LINEUP]->(:LineUp)-[:ON_COURT]->(ls:LineUpStint)-[:IN_PERIOD]->(p)
+        WHERE ls.start_time < poss.end_time AND poss.start_time < ls.end_time
+        FOREACH (_ IN CASE WHEN t.id = poss.team_id THEN [1] ELSE [] END | MERGE (ls)-[:ON_OFFENSE]->(poss))
+        FOREACH (_ IN CASE WHEN t.id <> poss.team_id THEN [1] ELSE [] END | MERGE (ls)-[:ON_DEFENSE]->(poss))
+    }
+"""
+
+
+GET_POSSESSIONS = """
+    MATCH (g:Game {id: $game_id})<-[:IN_GAME]-(p:Period)<-[:IN_PERIOD]-(poss:Possession)
+    CALL (poss) {
+        OPTIONAL MATCH (off:LineUpStint)-[:ON_OFFENSE]->(poss)
+        OPTIONAL MATCH (def:LineUpStint)-[:ON_DEFENSE]->(poss)
+        RETURN collect(DISTINCT off.id) AS offense_stints, collect(DISTINCT def.id) AS defense_stints
+    }
+    CALL (poss) {
+        OPTIONAL MATCH (a:Action)-[:IN_POSSESSION]->(poss)
+        RETURN count(a) AS actions
+    }
+    RETURN
+        poss.id AS id,
+        poss.n AS n,
+        p.n AS period,
+        poss.team_id AS team_id,
+        poss.global_clock AS global_clock,
+        poss.clock_duration AS clock_duration,
+        poss.points AS points,
+        actions, offense_stints, defense_stints
+    ORDER BY poss.n
+"""
+
+
 SET_PLUS_MINUS = """
     MATCH (g:Game {id: $game_id})
     MATCH (ls:LineUpStint)-[:IN_PERIOD]->(:Period)-[:IN_GAME]->(g)
@@ -806,4 +933,237 @@ SET_PLUS_MINUS = """
         ps.plus_minus = ps_pm,
         ps.points_scored = ps_pf,
         ps.points_conceded = ps_pa
-"""
\ No newline at end of file
+"""
+
+
+# Every id column has a `_uid` twin (`q_id` -> `q_uid`, `foul_ps` -> `foul_ps_uid`). collect() drops
+# nulls, so the uid columns come back shorter than the id columns until the game's uids are assigned.
+GET_GAME_GRAPH = """
+    MATCH (g:Game {id: $game_id})
+    MATCH (ht:Team)-[:PLAYED_HOME]->(g)
+    MATCH (at:Team)-[:PLAYED_AWAY]->(g)
+    WITH g, g.uid AS g_uid, [ht.uid, at.uid] AS team_uid
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(q:Period)<-[:IN_PERIOD]-(ls:LineUpStint)<-[:ON_COURT]-(l:LineUp)<-[:HAS_LINEUP]-(t:Team)
+        MATCH (l)<-[:MEMBER_OF]-(p:Player)-[:ON_COURT]->(ps:PlayerStint)-[:ON_COURT_WITH]->(ls)
+        WITH q, t, l, p, ls, ps
+        ORDER BY ps.global_clock ASC, ps.id ASC, ls.global_clock ASC, ls.id ASC
+        RETURN 
+            collect(q.id) AS q_id, collect(q.uid) AS q_uid, collect(q.n) AS q_n,
+            collect(t.id) AS t_id,
+            collect(l.id) AS l_id, collect(l.uid) AS l_uid,
+            collect(p.id) AS p_id, collect(p.uid) AS p_uid,
+            collect(ls.id) AS ls_id, collect(ls.uid) AS ls_uid,
+            collect(ls.global_clock) AS ls_global_clock, 
+            collect(ls.local_clock) AS ls_local_clock, 
+            collect(ls.clock_duration) AS ls_duration,
+            collect(ps.id) AS ps_id, collect(ps.uid) AS ps_uid,
+            collect(ps.global_clock) AS ps_global_clock, 
+            collect(ps.local_clock) AS ps_local_clock, 
+            collect(ps.clock_duration) AS ps_duration
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)-[:NEXT]->(next:LineUpStint)
+        RETURN 
+            collect(ls.id) AS ls_next_src, collect(next.id) AS ls_next_dst,
+            collect(ls.uid) AS ls_next_src_uid, collect(next.uid) AS ls_next_dst_uid
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(:LineUpStint)<-[:ON_COURT_WITH]-(ps:PlayerStint)-[:NEXT]->(next:PlayerStint)
+        WITH DISTINCT ps, next
+        RETURN 
+            collect(ps.id) AS ps_next_src, collect(next.id) AS ps_next_dst,
+            collect(ps.uid) AS ps_next_src_uid, collect(next.uid) AS ps_next_dst_uid
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)-[:ON_COURT_NEXT]->(next:LineUpStint)
+        RETURN 
+            collect(ls.id) AS ocn_src, collect(next.id) AS ocn_dst,
+            collect(ls.uid) AS ocn_src_uid, collect(next.uid) AS ocn_dst_uid
+    }
+
+    CALL (g) {
+        MATCH (ps:PlayerStint)-[:COMMITTED_FOUL]->(f:Foul)
+        WHERE f.id STARTS WITH toString(g.id) + "_"
+        OPTIONAL MATCH (v:PlayerStint)-[:DREW_FOUL]->(f)
+        WITH f, ps, v 
+        ORDER BY f.global_clock ASC, f.id ASC
+        RETURN 
+            collect(f.id) AS foul_id, collect(f.uid) AS foul_uid,
+            collect(ps.id) AS foul_ps, collect(ps.uid) AS foul_ps_uid,
+            collect(coalesce(v.id, "")) AS foul_drawn_ps, collect(coalesce(v.uid, -1)) AS foul_drawn_ps_uid,
+            collect(f.global_clock) AS foul_global_clock,
+            collect(f.local_clock) AS foul_local_clock
+    }
+
+    CALL (g) {
+        MATCH (ps:PlayerStint)-[:TOOK_SHOT]->(s:Shot)
+        WHERE s.id STARTS WITH toString(g.id) + "_" 
+            AND NOT s:FreeThrow
+        OPTIONAL MATCH (as:PlayerStint)-[:ASSISTED]->(s)
+        OPTIONAL MATCH (bs:PlayerStint)-[:BLOCKED]->(s)
+        WITH s, ps, as, bs 
+        ORDER BY s.global_clock ASC, s.id ASC
+        RETURN 
+            collect(s.id) AS shot_id, collect(s.uid) AS shot_uid,
+            collect(ps.id) AS shot_ps, collect(ps.uid) AS shot_ps_uid,
+            collect(coalesce(as.id, "")) AS shot_assist_ps, collect(coalesce(as.uid, -1)) AS shot_assist_ps_uid,
+            collect(coalesce(bs.id, "")) AS shot_block_ps, collect(coalesce(bs.uid, -1)) AS shot_block_ps_uid,
+            collect(s.global_clock) AS shot_global_clock,
+            collect(s.local_clock) AS shot_local_clock,
+            collect(s.x) AS shot_x,
+            collect(s.y) AS shot_y,
+            collect(s.distance) AS shot_distance,
+            collect(s:`2PT`) AS shot_2pt,
+            collect(s:`3PT`) AS shot_3pt,
+            collect(s:Made) AS shot_made
+    }
+
+    CALL (g) {
+        MATCH (ps:PlayerStint)-[:TOOK_SHOT]->(ft:FreeThrow)
+        WHERE ft.id STARTS WITH toString(g.id) + "_"
+        OPTIONAL MATCH (f:Foul)-[:CAUSED]->(ft)
+        WITH ft, ps, f 
+        ORDER BY ft.global_clock ASC, ft.id ASC
+        RETURN 
+            collect(ft.id) AS ft_id, collect(ft.uid) AS ft_uid,
+            collect(ps.id) AS ft_ps, collect(ps.uid) AS ft_ps_uid,
+            collect(coalesce(f.id, "")) AS ft_foul, collect(coalesce(f.uid, -1)) AS ft_foul_uid,
+            collect(ft.global_clock) AS ft_global_clock,
+            collect(ft.local_clock) AS ft_local_clock,
+            collect(ft:Made) AS ft_made
+    }
+
+    CALL (g) {
+        MATCH (f:PlayerGameStats {game_id: g.id})
+        RETURN collect(f.player_id) AS pf_id, collect(f.x) AS pf_x
+    }
+
+    CALL (g) {
+        MATCH (f:LineUpGameStats {game_id: g.id})
+        RETURN collect(f.lineup_id) AS lf_id, collect(f.x) AS lf_x
+    }
+
+    RETURN *
+"""
+
+
+# `GET_GAME_GRAPH` restricted to what may have changed since the global clock `$since`: stints
+# still open at it (their duration grows), the stints and actions after it, and their edges.
+# Only the node id columns have `_uid` twins. `ingest_stages` tells whether the actions are all in.
+GET_GAME_GRAPH_SINCE = """
+    MATCH (g:Game {id: $game_id})
+    MATCH (ht:Team)-[:PLAYED_HOME]->(g)
+    MATCH (at:Team)-[:PLAYED_AWAY]->(g)
+    WITH g, g.uid AS g_uid, [ht.uid, at.uid] AS team_uid, coalesce(g.ingest_stages, []) AS ingest_stages
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(q:Period)<-[:IN_PERIOD]-(ls:LineUpStint)<-[:ON_COURT]-(l:LineUp)<-[:HAS_LINEUP]-(t:Team)
+        MATCH (l)<-[:MEMBER_OF]-(p:Player)-[:ON_COURT]->(ps:PlayerStint)-[:ON_COURT_WITH]->(ls)
+        WHERE ps.global_clock + coalesce(ps.clock_duration, 0.0) >= $since
+            OR ls.global_clock + coalesce(ls.clock_duration, 0.0) >= $since
+        WITH q, t, l, p, ls, ps
+        ORDER BY ps.global_clock ASC, ps.id ASC, ls.global_clock ASC, ls.id ASC
+        RETURN 
+            collect(q.id) AS q_id, collect(q.uid) AS q_uid, collect(q.n) AS q_n,
+            collect(t.id) AS t_id,
+            collect(l.id) AS l_id, collect(l.uid) AS l_uid,
+            collect(p.id) AS p_id, collect(p.uid) AS p_uid,
+            collect(ls.id) AS ls_id, collect(ls.uid) AS ls_uid,
+            collect(ls.global_clock) AS ls_global_clock, 
+            collect(ls.local_clock) AS ls_local_clock, 
+            collect(coalesce(ls.clock_duration, 0.0)) AS ls_duration,
+            collect(ps.id) AS ps_id, collect(ps.uid) AS ps_uid,
+            collect(ps.global_clock) AS ps_global_clock, 
+            collect(ps.local_clock) AS ps_local_clock, 
+            collect(coalesce(ps.clock_duration, 0.0)) AS ps_duration
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)-[:NEXT]->(next:LineUpStint)
+        WHERE next.global_clock + coalesce(next.clock_duration, 0.0) >= $since
+        RETURN collect(ls.id) AS ls_next_src, collect(next.id) AS ls_next_dst
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(:LineUpStint)<-[:ON_COURT_WITH]-(ps:PlayerStint)-[:NEXT]->(next:PlayerStint)
+        WHERE next.global_clock + coalesce(next.clock_duration, 0.0) >= $since
+        WITH DISTINCT ps, next
+        RETURN collect(ps.id) AS ps_next_src, collect(next.id) AS ps_next_dst
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)-[:ON_COURT_NEXT]->(next:LineUpStint)
+        WHERE next.global_clock + coalesce(next.clock_duration, 0.0) >= $since
+        RETURN collect(ls.id) AS ocn_src, collect(next.id) AS ocn_dst
+    }
+
+    CALL (g) {
+        MATCH (ps:PlayerStint)-[:COMMITTED_FOUL]->(f:Foul)
+        WHERE f.id STARTS WITH toString(g.id) + "_" AND f.global_clock >= $since
+        OPTIONAL MATCH (v:PlayerStint)-[:DREW_FOUL]->(f)
+        WITH f, ps, v 
+        ORDER BY f.global_clock ASC, f.id ASC
+        RETURN 
+            collect(f.id) AS foul_id, collect(f.uid) AS foul_uid,
+            collect(ps.id) AS foul_ps,
+            collect(coalesce(v.id, "")) AS foul_drawn_ps,
+            collect(f.global_clock) AS foul_global_clock,
+            collect(f.local_clock) AS foul_local_clock
+    }
+
+    CALL (g) {
+        MATCH (ps:PlayerStint)-[:TOOK_SHOT]->(s:Shot)
+        WHERE s.id STARTS WITH toString(g.id) + "_" 
+            AND NOT s:FreeThrow
+            AND s.global_clock >= $since
+        OPTIONAL MATCH (as:PlayerStint)-[:ASSISTED]->(s)
+        OPTIONAL MATCH (bs:PlayerStint)-[:BLOCKED]->(s)
+        WITH s, ps, as, bs 
+        ORDER BY s.global_clock ASC, s.id ASC
+        RETURN 
+            collect(s.id) AS shot_id, collect(s.uid) AS shot_uid,
+            collect(ps.id) AS shot_ps,
+            collect(coalesce(as.id, "")) AS shot_assist_ps,
+            collect(coalesce(bs.id, "")) AS shot_block_ps,
+            collect(s.global_clock) AS shot_global_clock,
+            collect(s.local_clock) AS shot_local_clock,
+            collect(s.x) AS shot_x,
+            collect(s.y) AS shot_y,
+            collect(s.distance) AS shot_distance,
+            collect(s:`2PT`) AS shot_2pt,
+            collect(s:`3PT`) AS shot_3pt,
+            collect(s:Made) AS shot_made
+    }
+
+    CALL (g) {
+        MATCH (ps:PlayerStint)-[:TOOK_SHOT]->(ft:FreeThrow)
+        WHERE ft.id STARTS WITH toString(g.id) + "_" AND ft.global_clock >= $since
+        OPTIONAL MATCH (f:Foul)-[:CAUSED]->(ft)
+        WITH ft, ps, f 
+        ORDER BY ft.global_clock ASC, ft.id ASC
+        RETURN 
+            collect(ft.id) AS ft_id, collect(ft.uid) AS ft_uid,
+            collect(ps.id) AS ft_ps,
+            collect(coalesce(f.id, "")) AS ft_foul,
+            collect(ft.global_clock) AS ft_global_clock,
+            collect(ft.local_clock) AS ft_local_clock,
+            collect(ft:Made) AS ft_made
+    }
+
+    CALL (g) {
+        MATCH (f:PlayerGameStats {game_id: g.id})
+        RETURN collect(f.player_id) AS pf_id, collect(f.x) AS pf_x
+    }
+
+    CALL (g) {
+        MATCH (f:LineUpGameStats {game_id: g.id})
+        RETURN collect(f.lineup_id) AS lf_id, collect(f.x) AS lf_x
+    }
+
+    RETURN *
+"""
@@ -0,0 +1,7 @@
+# core/queries/player.py
+
+GET_PLAYER_TEAMS = """
+    MATCH (f:PlayerGameStats {player_id: $player_id})
+    WHERE f.season_id = $season_id
+    RETURN DISTINCT f.team_id AS team_id
+"""
@@ -0,0 +1,85 @@
+# Node types of the season-wide graph, named as in the `to_pyg` graphs.
+SAMPLING_LABELS = {
+    "team": "Team",
+    "lineup": "LineUp",
+    "player": "Player",
+    "lineup_stint": "LineUpStint",
+    "player_stint": "PlayerStint"
+}
+
+# Edge types and their relationship; each also gets a `rev_<relation>` reverse type.
+SAMPLING_EDGES = {
+    ("team", "has_lineup", "lineup"): "HAS_LINEUP",
+    ("player", "member_of", "lineup"): "MEMBER_OF",
+    ("lineup", "on_court", "lineup_stint"): "ON_COURT",
+    ("player", "on_court", "player_stint"): "ON_COURT",
+    ("player_stint", "on_court_with", "lineup_stint"): "ON_COURT_WITH",
+    ("lineup_stint", "next", "lineup_stint"): "NEXT",
+    ("player_stint", "next", "player_stint"): "NEXT",
+}
+
+
+GET_NODE_IDS = {node_type: f"""
+    MATCH (n:{label})
+    WITH n.id AS id ORDER BY id ASC
+    RETURN collect(id) AS ids
+""" for node_type, label in SAMPLING_LABELS.items()}
+
+
+def _neighbors(src: str, relationship: str, dst: str, reverse: bool) -> str:
+    arrow = f"<-[:{relationship}]-" if reverse else f"-[:{relationship}]->"
+    return f"""
+    UNWIND $ids AS id
+    MATCH (d:{SAMPLING_LABELS[dst]} {{id: id}})
+    CALL (d) {{
+        OPTIONAL MATCH (s:{SAMPLING_LABELS[src]}){arrow}(d)
+        RETURN collect(s.id) AS src
+    }}
+    RETURN id, src
+"""
+
+
+# The source neighbours of a batch of destination nodes, one row per destination id.
+GET_NEIGHBORS = {}
+for (src, rel, dst), relationship in SAMPLING_EDGES.items():
+    GET_NEIGHBORS[(src, rel, dst)] = _neighbors(src, relationship, dst, reverse=False)
+    GET_NEIGHBORS[(dst, f"rev_{rel}", src)] = _neighbors(dst, relationship, src, reverse=True)
+
+
+_STINT_FEATURES = "[coalesce(n.global_clock, 0.0), coalesce(n.local_clock, 0.0), coalesce(n.clock_duration, 0.0)]"
+
+# The entity's stat row of its latest game up to `$as_of` (every game when null), as in `attach`:
+# a constant 1.0 then the pre-game state, zeros when it has none.
+_STATE_FEATURES = """
+    CALL (n) {{
+        OPTIONAL MATCH (f:{stats} {{{key}: n.id}})
+        WHERE $as_of IS NULL OR f.date <= datetime($as_of)
+        WITH f ORDER BY f.date DESC LIMIT 1
+        RETURN f.x AS state
+    }}
+    RETURN id, [1.0] + coalesce(state, [i IN range(1, $width - 1) | 0.0]) AS x
+"""
+
+GET_NODE_FEATURES = {
+    "team": """
+    UNWIND $ids AS id
+    MATCH (n:Team {id: id})
+    RETURN id, [1.0] AS x
+""",
+    "lineup": """
+    UNWIND $ids AS id
+    MATCH (n:LineUp {id: id})""" + _STATE_FEATURES.format(stats="LineUpGameStats", key="lineup_id"),
+    "player": """
+    UNWIND $ids AS id
+    MATCH (n:Player {id: id})""" + _STATE_FEATURES.format(stats="PlayerGameStats", key="player_id"),
+    "lineup_stint": f"""
+    UNWIND $ids AS id
+    MATCH (n:LineUpStint {{id: id}})
+    RETURN id, {_STINT_FEATURES} AS x
+""",
+    "player_stint": f"""
+    UNWIND $ids AS id
+    MATCH (n:PlayerStint {{id: id}})
+    RETURN id, {_STINT_FEATURES} AS x
+""",
+}
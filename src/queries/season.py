@@ -14,8 +14,12 @@ MERGE_SEASON = """
     MERGE (g)-[:AT]->(a)
     MERGE (ht)-[:PLAYED_HOME]->(g)
     MERGE (at)-[:PLAYED_AWAY]->(g)
+"""
 
-    WITH distinct s
+
+# Depends on the whole schedule: run once every chunk of MERGE_SEASON has committed.
+MERGE_SEASON_NEXT = """
+    MATCH (s:Season {id: $season_id})
     MATCH (t:Team)-[:PLAYED_HOME|PLAYED_AWAY]->(g:Game)-[r:IN_SEASON]->(s)
     WITH t, g ORDER BY g.date ASC
 
@@ -25,4 +29,41 @@ MERGE_SEASON = """
     WITH games[i] AS current, games[i+1] AS next
     MERGE (current)-[r:NEXT]->(next)
     SET r.time_since = duration.between(current.date, next.date)
-"""
\ No newline at end of file
+"""
+
+
+GET_GAMES = """
+    MATCH (g:Game)
+    WHERE datetime($start) <= g.date < datetime($end) + duration({days: 1})
+        AND ($season_id IS NULL OR EXISTS { (g)-[:IN_SEASON]->(:Season {id: $season_id}) })
+    RETURN g.id AS game_id
+    ORDER BY g.date ASC, g.id ASC
+"""
+
+
+GET_SEASON_GAME_IDS = """
+    MATCH (g:Game)-[:IN_SEASON]->(s:Season)
+    WHERE s.id IN $season_ids
+    RETURN g.id AS game_id
+    ORDER BY g.date ASC, g.id ASC
+"""
+
+
+# The actions of a batch of games, in the order of $game_ids. Only a final ORDER BY is guaranteed
+# to hold, so it sorts by the position of the game in the batch.
+GET_SEASON_ACTIONS = """
+    UNWIND range(0, size($game_ids) - 1) AS i
+    MATCH (g:Game {id: $game_ids[i]})
+    MATCH (a:Action)
+    WHERE a.id STARTS WITH toString(g.id) + "_"
+    OPTIONAL MATCH (a)-[:IN_POSSESSION]->(poss:Possession)
+    RETURN
+        g.id AS game_id,
+        a.id AS id,
+        [label IN labels(a) WHERE label <> "Action"] AS labels,
+        a.time.epochMillis AS time,
+        a.global_clock AS global_clock,
+        a.local_clock AS local_clock,
+        poss.n AS possession
+    ORDER BY i ASC, a.global_clock ASC, a.time ASC
+"""
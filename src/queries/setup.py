@@ -17,6 +17,9 @@ SETUP_QUERIES = [
     "CREATE CONSTRAINT score_id IF NOT EXISTS FOR (s:Score) REQUIRE s.id IS UNIQUE",
     "CREATE CONSTRAINT possession_id IF NOT EXISTS FOR (p:Possession) REQUIRE p.id IS UNIQUE",
 
+    "CREATE CONSTRAINT player_game_stats_id IF NOT EXISTS FOR (f:PlayerGameStats) REQUIRE f.id IS UNIQUE",
+    "CREATE CONSTRAINT lineup_game_stats_id IF NOT EXISTS FOR (f:LineUpGameStats) REQUIRE f.id IS UNIQUE",
+
     "CREATE INDEX game_date_idx IF NOT EXISTS FOR (g:Game) ON (g.date)",
     "CREATE INDEX ls_start_time_idx IF NOT EXISTS FOR (ls:LineUpStint) ON (ls.start_time)",
     "CREATE INDEX ls_end_time_idx IF NOT EXISTS FOR (ls:LineUpStint) ON (ls.end_time)",
@@ -30,5 +33,25 @@ SETUP_QUERIES = [
     "CREATE INDEX action_global_clock_idx IF NOT EXISTS FOR (a:Action) ON (a.global_clock)",
     "CREATE INDEX score_global_clock_idx IF NOT EXISTS FOR (s:Score) ON (s.global_clock)",
     "CREATE INDEX poss_start_time_idx IF NOT EXISTS FOR (p:Possession) ON (p.start_time)",
-    "CREATE INDEX poss_global_clock_idx IF NOT EXISTS FOR (p:Possession) ON (p.global_clock)"
+    "CREATE INDEX poss_global_clock_idx IF NOT EXISTS FOR (p:Possession) ON (p.global_clock)",
+
+    "CREATE INDEX player_game_stats_date_idx IF NOT EXISTS FOR (f:PlayerGameStats) ON (f.player_id, f.date)",
+    "CREATE INDEX player_game_stats_game_idx IF NOT EXISTS FOR (f:PlayerGameStats) ON (f.game_id)",
+    "CREATE INDEX lineup_game_stats_date_idx IF NOT EXISTS FOR (f:LineUpGameStats) ON (f.lineup_id, f.date)",
+    "CREATE INDEX lineup_game_stats_game_idx IF NOT EXISTS FOR (f:LineUpGameStats) ON (f.game_id)",
+    "CREATE INDEX lineup_game_stats_team_idx IF NOT EXISTS FOR (f:LineUpGameStats) ON (f.team_id, f.season_id)",
+
+    "CREATE CONSTRAINT uid_key IF NOT EXISTS FOR (u:Uid) REQUIRE (u.label, u.id) IS UNIQUE",
+    "CREATE CONSTRAINT uid_sequence_label IF NOT EXISTS FOR (s:UidSequence) REQUIRE s.label IS UNIQUE",
+
+    "CREATE INDEX game_uid_idx IF NOT EXISTS FOR (g:Game) ON (g.uid)",
+    "CREATE INDEX team_uid_idx IF NOT EXISTS FOR (t:Team) ON (t.uid)",
+    "CREATE INDEX period_uid_idx IF NOT EXISTS FOR (p:Period) ON (p.uid)",
+    "CREATE INDEX lineup_uid_idx IF NOT EXISTS FOR (l:LineUp) ON (l.uid)",
+    "CREATE INDEX player_uid_idx IF NOT EXISTS FOR (p:Player) ON (p.uid)",
+    "CREATE INDEX ls_uid_idx IF NOT EXISTS FOR (ls:LineUpStint) ON (ls.uid)",
+    "CREATE INDEX ps_uid_idx IF NOT EXISTS FOR (ps:PlayerStint) ON (ps.uid)",
+    "CREATE INDEX foul_uid_idx IF NOT EXISTS FOR (f:Foul) ON (f.uid)",
+    "CREATE INDEX shot_uid_idx IF NOT EXISTS FOR (s:Shot) ON (s.uid)",
+    "CREATE INDEX freethrow_uid_idx IF NOT EXISTS FOR (ft:FreeThrow) ON (ft.uid)"
 ]
\ No newline at end of file
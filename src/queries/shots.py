@@ -0,0 +1,45 @@
+# core/queries/shots.py
+
+GET_GAME_SHOTS = """
+    MATCH (g:Game {id: $game_id})-[:IN_SEASON]->(season:Season)
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)<-[:ON_COURT_WITH]-(ps:PlayerStint)-[:TOOK_SHOT]->(s:Shot)
+        WHERE NOT s:FreeThrow AND ls.start_time <= s.time < ls.end_time
+        MATCH (p:Player)-[:ON_COURT]->(ps)
+        MATCH (t:Team)-[:HAS_LINEUP]->(l:LineUp)-[:ON_COURT]->(ls)
+        RETURN
+            collect(g.id) AS game_id,
+            collect(p.id) AS player_id,
+            collect(t.id) AS team_id,
+            collect(l.id) AS lineup_id,
+            collect(coalesce(s.x, -1.0)) AS x,
+            collect(coalesce(s.y, -1.0)) AS y,
+            collect(coalesce(s.distance, -1.0)) AS distance,
+            collect(s:`3PT`) AS fg3,
+            collect(s:Made) AS made
+    }
+    RETURN season.id AS season_id, game_id, player_id, team_id, lineup_id, x, y, distance, fg3, made
+"""
+
+
+GET_SEASON_SHOTS = """
+    MATCH (g:Game)-[:IN_SEASON]->(season:Season {id: $season_id})
+    MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)<-[:ON_COURT_WITH]-(ps:PlayerStint)-[:TOOK_SHOT]->(s:Shot)
+    WHERE NOT s:FreeThrow AND ls.start_time <= s.time < ls.end_time
+    MATCH (p:Player)-[:ON_COURT]->(ps)
+    MATCH (t:Team)-[:HAS_LINEUP]->(l:LineUp)-[:ON_COURT]->(ls)
+    WHERE ($player_id IS NULL OR p.id = $player_id)
+        AND ($team_id IS NULL OR t.id = $team_id)
+        AND ($lineup_id IS NULL OR l.id = $lineup_id)
+    RETURN
+        season.id AS season_id,
+        collect(g.id) AS game_id,
+        collect(p.id) AS player_id,
+        collect(t.id) AS team_id,
+        collect(l.id) AS lineup_id,
+        collect(coalesce(s.x, -1.0)) AS x,
+        collect(coalesce(s.y, -1.0)) AS y,
+        collect(coalesce(s.distance, -1.0)) AS distance,
+        collect(s:`3PT`) AS fg3,
+        collect(s:Made) AS made
+"""
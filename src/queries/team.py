@@ -10,4 +10,29 @@ MERGE_TEAMS = """
         t.state = team.state
         
     MERGE (t)-[:HOME_ARENA]->(a:Arena {name: team.arena})
-"""
\ No newline at end of file
+"""
+
+GET_TEAM_COUNT = """
+    MATCH (t:Team)
+    RETURN count(t) AS teams
+"""
+
+
+GET_TEAM_LINEUP_STATS = """
+    MATCH (f:LineUpGameStats {team_id: $team_id, season_id: $season_id})
+    RETURN
+        f.lineup_id AS lineup_id,
+        f.team_id AS team_id,
+        count(f) AS games,
+        sum(f.g_minutes) AS minutes,
+        sum(f.g_points_for) AS points_for,
+        sum(f.g_points_against) AS points_against,
+        sum(coalesce(f.g_possessions, 0)) AS possessions,
+        sum(coalesce(f.g_opp_possessions, 0)) AS opp_possessions
+"""
+
+
+GET_LINEUP_TEAM = """
+    MATCH (t:Team)-[:HAS_LINEUP]->(:LineUp {id: $lineup_id})
+    RETURN t.id AS team_id
+"""
@@ -0,0 +1,132 @@
+# Node types of the `to_pyg` graphs that get a global integer id, and their labels.
+UID_LABELS = {
+    "game": "Game",
+    "team": "Team",
+    "period": "Period",
+    "lineup": "LineUp",
+    "player": "Player",
+    "lineup_stint": "LineUpStint",
+    "player_stint": "PlayerStint",
+    "foul": "Foul",
+    "shot": "Shot",
+    "freethrow": "FreeThrow"
+}
+
+# Actions are matched through the `Action.id` constraint.
+_MATCH_LABELS = {
+    node_type: f"Action:{label}" if node_type in ("foul", "shot", "freethrow") else label
+    for node_type, label in UID_LABELS.items()
+}
+
+
+# The ids of a game's nodes that have no uid yet, per node type.
+GET_MISSING_UIDS = """
+    MATCH (g:Game {id: $game_id})
+
+    CALL (g) {
+        WITH g WHERE g.uid IS NULL
+        RETURN collect(g.id) AS game
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(q:Period)
+        WHERE q.uid IS NULL
+        RETURN collect(q.id) AS period
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(ls:LineUpStint)
+        WHERE ls.uid IS NULL
+        RETURN collect(ls.id) AS lineup_stint
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(:LineUpStint)<-[:ON_COURT_WITH]-(ps:PlayerStint)
+        WHERE ps.uid IS NULL
+        RETURN collect(DISTINCT ps.id) AS player_stint
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(:LineUpStint)<-[:ON_COURT]-(l:LineUp)
+        WHERE l.uid IS NULL
+        RETURN collect(DISTINCT l.id) AS lineup
+    }
+
+    CALL (g) {
+        MATCH (t:Team)-[:PLAYED_HOME|PLAYED_AWAY]->(g)
+        WHERE t.uid IS NULL
+        RETURN collect(t.id) AS team
+    }
+
+    CALL (g) {
+        MATCH (g)<-[:IN_GAME]-(:Period)<-[:IN_PERIOD]-(:LineUpStint)<-[:ON_COURT_WITH]-(:PlayerStint)<-[:ON_COURT]-(p:Player)
+        WHERE p.uid IS NULL
+        RETURN collect(DISTINCT p.id) AS player
+    }
+
+    CALL (g) {
+        MATCH (f:Foul)
+        WHERE f.id STARTS WITH toString(g.id) + "_" AND f.uid IS NULL
+        RETURN collect(f.id) AS foul
+    }
+
+    CALL (g) {
+        MATCH (s:Shot)
+        WHERE s.id STARTS WITH toString(g.id) + "_" AND NOT s:FreeThrow AND s.uid IS NULL
+        RETURN collect(s.id) AS shot
+    }
+
+    CALL (g) {
+        MATCH (ft:FreeThrow)
+        WHERE ft.id STARTS WITH toString(g.id) + "_" AND ft.uid IS NULL
+        RETURN collect(ft.id) AS freethrow
+    }
+
+    RETURN game, team, period, lineup, player, lineup_stint, player_stint, foul, shot, freethrow
+"""
+
+
+# Registers the ids of `$label` not seen before under the next free uids. Writing `_lock` first
+# takes the sequence's write lock, so concurrent ingests of the same label allocate one at a time
+# and uids stay dense.
+ALLOCATE_UIDS = """
+    MERGE (s:UidSequence {label: $label})
+    ON CREATE SET s.next = 0
+    SET s._lock = true
+
+    WITH s
+    CALL (s) {
+        UNWIND $ids AS id
+        OPTIONAL MATCH (u:Uid {label: $label, id: id})
+        WITH id WHERE u IS NULL
+        RETURN collect(id) AS missing
+    }
+
+    WITH s, missing, s.next AS start
+    SET s.next = start + size(missing)
+    REMOVE s._lock
+
+    WITH start, missing
+    UNWIND range(0, size(missing) - 1) AS i
+    CREATE (:Uid {label: $label, id: missing[i], uid: start + i})
+"""
+
+
+GET_UIDS = """
+    UNWIND $ids AS id
+    MATCH (u:Uid {label: $label, id: id})
+    RETURN collect(u.id) AS ids, collect(u.uid) AS uids
+"""
+
+
+GET_UID_COUNTS = """
+    MATCH (s:UidSequence)
+    RETURN s.label AS label, s.next AS count
+"""
+
+
+SET_UIDS = {node_type: f"""
+    UNWIND range(0, size($rows.id) - 1) AS i
+    MATCH (n:{label} {{id: $rows.id[i]}})
+    SET n.uid = $rows.uid[i]
+""" for node_type, label in _MATCH_LABELS.items()}
@@ -0,0 +1,123 @@
+# core/ratings.py
+import os
+import time
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+_cache = None
+_cache_lock = Lock()
+
+LINEUP_COLUMNS = ["lineup_id", "team_id", "games", "minutes", "points_for", "points_against", "possessions", "opp_possessions"]
+TOTALS = ["minutes", "points_for", "points_against", "possessions", "opp_possessions"]
+
+
+def ratings(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds offensive, defensive and net rating to a frame of `TOTALS`: points per 100 possessions,
+    falling back on points per 48 minutes for rows without possessions (games ingested before
+    Possessions existed).
+    """
+    minutes = df["minutes"].to_numpy(dtype=np.float64)
+    per_48 = np.divide(48.0, minutes, out=np.zeros_like(minutes), where=minutes > 0)
+    possessions = df["possessions"].to_numpy(dtype=np.float64)
+    opp_possessions = df["opp_possessions"].to_numpy(dtype=np.float64)
+    counted = (possessions > 0) & (opp_possessions > 0)
+
+    off_scale = np.where(counted, np.divide(100.0, possessions, out=np.zeros_like(possessions), where=counted), per_48)
+    def_scale = np.where(counted, np.divide(100.0, opp_possessions, out=np.zeros_like(opp_possessions), where=counted), per_48)
+    return df.assign(
+        plus_minus = df["points_for"] - df["points_against"],
+        off_rating = df["points_for"] * off_scale,
+        def_rating = df["points_against"] * def_scale,
+        net_rating = df["points_for"] * off_scale - df["points_against"] * def_scale
+    )
+
+
+def lineup_table(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Season totals of a team's lineups, one row per LineUp, with their ratings.
+    """
+    df = pd.DataFrame(rows, columns=LINEUP_COLUMNS)
+    return ratings(df.astype({name: np.float64 for name in TOTALS}))
+
+
+def on_off(table: pd.DataFrame, player_id: int) -> Dict[str, Dict[str, float]]:
+    """
+    Splits a team's lineup table into the minutes with and without `player_id` on the floor.
+    Lineup ids are the sorted member ids joined by "_", so membership needs no traversal.
+    """
+    member = str(player_id)
+    on = table["lineup_id"].map(lambda lineup_id: member in lineup_id.split("_")).to_numpy(dtype=bool)
+
+    totals = {}
+    for name, mask in [("on", on), ("off", ~on)]:
+        part = table.loc[mask, TOTALS].sum()
+        totals[name] = ratings(part.to_frame().T).iloc[0].to_dict()
+
+    totals["diff"] = {k: totals["on"][k] - totals["off"][k] for k in ["plus_minus", "off_rating", "def_rating", "net_rating"]}
+    return totals
+
+
+
+class ResultCache:
+    """
+    In-memory cache of read-API results. Entries are tagged with the teams (and players) they were
+    computed from, and ingesting a game drops every entry tagged with one of its teams or players.
+    Misses (None) are never cached. An optional TTL bounds staleness for readers that don't share
+    a process with the ingestion.
+    """
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._entries = {}
+        self._tags = {}
+        self._lock = Lock()
+
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], tags: Optional[Callable[[Any], Iterable]] = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                return entry[1]
+
+        value = compute()
+        if value is None:
+            return None
+
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            for tag in (tags(value) if tags else []):
+                self._tags.setdefault(tag, set()).add(key)
+
+        return value
+
+
+    def invalidate(self, tags: Iterable) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in self._tags.pop(tag, set()):
+                    self._entries.pop(key, None)
+
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+
+
+def get_result_cache() -> ResultCache:
+    global _cache
+
+    if _cache:
+        return _cache
+
+    with _cache_lock:
+        if _cache is None:
+            ttl = float(os.getenv("MBAI_RESULT_TTL", 0)) or None
+            _cache = ResultCache(ttl)
+
+        return _cache
@@ -0,0 +1,390 @@
+# core/sampling.py
+import queue
+import threading
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+from torch_geometric.data import FeatureStore, GraphStore, TensorAttr, EdgeAttr
+from torch_geometric.data.graph_store import EdgeLayout
+from torch_geometric.loader import NodeLoader
+from torch_geometric.sampler import BaseSampler, HeteroSamplerOutput, NodeSamplerInput
+from torch_geometric.typing import EdgeType
+
+from .manager import BaseManager
+from .driver import season_database
+from .transform import PLAYER_FEATURES, LINEUP_FEATURES
+from .queries.sampling import SAMPLING_LABELS, GET_NODE_IDS, GET_NEIGHBORS, GET_NODE_FEATURES
+
+
+# Width of `x` per node type, matching the `to_pyg` graphs.
+FEATURE_WIDTHS = {
+    "team": 1,
+    "lineup": LINEUP_FEATURES + 1,
+    "player": PLAYER_FEATURES + 1,
+    "lineup_stint": 3,
+    "player_stint": 3
+}
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used map with a bound on the number of entries.
+    """
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = Lock()
+
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self.items:
+                    self.items.move_to_end(key)
+                    found[key] = self.items[key]
+            self.hits += len(found)
+        return found
+
+
+    def put_many(self, entries: Dict[Hashable, Any]) -> None:
+        with self._lock:
+            self.misses += len(entries)
+            for key, value in entries.items():
+                self.items[key] = value
+                self.items.move_to_end(key)
+            while len(self.items) > self.max_items:
+                self.items.popitem(last=False)
+
+
+
+class Neo4jGraphStore(GraphStore):
+    """
+    Read-only PyG `GraphStore` over the stint layer of one database (a season partition, or the
+    default database), for the node and edge types of `queries.sampling`. Nodes are numbered by
+    the order of their ids. Adjacency is fetched on demand, per batch of destination nodes, and
+    kept in an LRU cache of `cache_size` adjacency lists.
+    """
+    def __init__(self, season_id: Optional[str] = None, cache_size: int = 1_000_000):
+        super().__init__()
+        self.manager = BaseManager(season_database(season_id))
+        self.adjacency = LRUCache(cache_size)
+        self._ids = {}
+        self._ids_lock = Lock()
+
+
+    def ids(self, node_type: str) -> np.ndarray:
+        """
+        The sorted ids of every node of a type, loaded once.
+        """
+        if node_type not in self._ids:
+            with self._ids_lock:
+                if node_type not in self._ids:
+                    rows = self.manager.execute_read(GET_NODE_IDS[node_type])
+                    self._ids[node_type] = np.asarray(rows[0]["ids"] if rows else [])
+        return self._ids[node_type]
+
+
+    def num_nodes(self, node_type: str) -> int:
+        return int(self.ids(node_type).size)
+
+
+    def index_of(self, node_type: str, node_ids: Sequence[Any]) -> np.ndarray:
+        """
+        The node indices of database ids; unknown ids raise a `KeyError`.
+        """
+        ids = self.ids(node_type)
+        values = np.asarray(node_ids)
+        index = np.searchsorted(ids, values).clip(max=max(ids.size - 1, 0))
+        found = ids.size > 0 and (ids[index] == values)
+        if not np.all(found):
+            raise KeyError(f"Unknown {node_type} ids: {values[~np.asarray(found, dtype=bool)][:5].tolist()}")
+        return index.astype(np.int64)
+
+
+    def neighbors(self, edge_type: EdgeType, dst: np.ndarray) -> List[np.ndarray]:
+        """
+        The source node indices of every destination node of `dst`, for one edge type.
+        Cache misses are fetched with a single query.
+        """
+        keys = [(edge_type, int(d)) for d in dst]
+        found = self.adjacency.get_many(keys)
+        missing = list(dict.fromkeys(int(d) for (_, d) in keys if (edge_type, d) not in found))
+
+        if missing:
+            src_type, _, dst_type = edge_type
+            dst_ids = self.ids(dst_type)[missing].tolist()
+            rows = self.manager.execute_read(GET_NEIGHBORS[edge_type], {"ids": dst_ids})
+            by_id = {row["id"]: row["src"] for row in rows}
+            fetched = {
+                (edge_type, d): self.index_of(src_type, by_id[i]) if by_id.get(i) else np.zeros(0, dtype=np.int64)
+                for d, i in zip(missing, dst_ids)
+            }
+            self.adjacency.put_many(fetched)
+            found.update(fetched)
+
+        return [found[key] for key in keys]
+
+
+    def get_all_edge_attrs(self) -> List[EdgeAttr]:
+        return [
+            EdgeAttr(edge_type, EdgeLayout.COO, size=(self.num_nodes(edge_type[0]), self.num_nodes(edge_type[2])))
+            for edge_type in GET_NEIGHBORS
+        ]
+
+
+    def _get_edge_index(self, edge_attr: EdgeAttr) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+        # The whole relationship, for code that asks for it; sampling never does.
+        dst = np.arange(self.num_nodes(edge_attr.edge_type[2]))
+        adjacency = self.neighbors(edge_attr.edge_type, dst)
+        row = np.concatenate([a for a in adjacency] + [np.zeros(0, dtype=np.int64)])
+        col = np.repeat(dst, [a.size for a in adjacency])
+        return torch.from_numpy(row.astype(np.int64)), torch.from_numpy(col.astype(np.int64))
+
+
+    def _put_edge_index(self, edge_index: Any, edge_attr: EdgeAttr) -> bool:
+        raise NotImplementedError("Neo4jGraphStore is read-only: the graph is written by the managers")
+
+
+    def _remove_edge_index(self, edge_attr: EdgeAttr) -> bool:
+        raise NotImplementedError("Neo4jGraphStore is read-only: the graph is written by the managers")
+
+
+
+class Neo4jFeatureStore(FeatureStore):
+    """
+    Read-only PyG `FeatureStore` serving the `x` of the nodes of a `Neo4jGraphStore`, fetched per
+    mini-batch and cached per node. Players and lineups carry their latest pre-game state up to
+    `as_of` (an ISO date; the whole season when None), stints their clocks and duration.
+    """
+    def __init__(self, graph_store: Neo4jGraphStore, as_of: Optional[str] = None, cache_size: int = 1_000_000):
+        super().__init__()
+        self.graph_store = graph_store
+        self.as_of = as_of
+        self.rows = LRUCache(cache_size)
+
+
+    def get_all_tensor_attrs(self) -> List[TensorAttr]:
+        return [TensorAttr(node_type, "x") for node_type in SAMPLING_LABELS]
+
+
+    def _index(self, attr: TensorAttr) -> np.ndarray:
+        index = attr.index
+        n = self.graph_store.num_nodes(attr.group_name)
+        if index is None:
+            return np.arange(n)
+        if isinstance(index, slice):
+            return np.arange(n)[index]
+        if isinstance(index, torch.Tensor):
+            return index.cpu().numpy().astype(np.int64)
+        return np.asarray(index, dtype=np.int64)
+
+
+    def _get_tensor(self, attr: TensorAttr) -> Optional[torch.Tensor]:
+        node_type = attr.group_name
+        if attr.attr_name != "x" or node_type not in SAMPLING_LABELS:
+            return None
+
+        index = self._index(attr)
+        keys = [(node_type, int(i)) for i in index]
+        found = self.rows.get_many(keys)
+        missing = list(dict.fromkeys(i for (_, i) in keys if (node_type, i) not in found))
+
+        if missing:
+            ids = self.graph_store.ids(node_type)[missing].tolist()
+            params = {"ids": ids, "as_of": self.as_of, "width": FEATURE_WIDTHS[node_type]}
+            rows = self.graph_store.manager.execute_read(GET_NODE_FEATURES[node_type], params)
+            by_id = {row["id"]: row["x"] for row in rows}
+            fetched = {(node_type, i): by_id.get(node_id) or [0.0] * FEATURE_WIDTHS[node_type] for i, node_id in zip(missing, ids)}
+            self.rows.put_many(fetched)
+            found.update(fetched)
+
+        x = np.zeros((len(keys), FEATURE_WIDTHS[node_type]), dtype=np.float32)
+        for row, key in enumerate(keys):
+            x[row] = found[key]
+        return torch.from_numpy(x)
+
+
+    def _get_tensor_size(self, attr: TensorAttr) -> Optional[Tuple[int, ...]]:
+        return (self.graph_store.num_nodes(attr.group_name), FEATURE_WIDTHS[attr.group_name])
+
+
+    def _put_tensor(self, tensor: Any, attr: TensorAttr) -> bool:
+        raise NotImplementedError("Neo4jFeatureStore is read-only: features are written by the FeatureStore manager")
+
+
+    def _remove_tensor(self, attr: TensorAttr) -> bool:
+        raise NotImplementedError("Neo4jFeatureStore is read-only: features are written by the FeatureStore manager")
+
+
+
+class Neo4jNeighborSampler(BaseSampler):
+    """
+    Hop-by-hop neighbour sampling on a `Neo4jGraphStore`: at every hop, each edge type into the
+    frontier's nodes contributes up to `num_neighbors[edge_type][hop]` sampled sources per node
+    (-1 for all of them). The adjacency of a whole frontier is fetched in one query per edge type.
+    """
+    def __init__(self, graph_store: Neo4jGraphStore, num_neighbors: Union[List[int], Dict[EdgeType, List[int]]], replace: bool = False, seed: Optional[int] = None):
+        self.graph_store = graph_store
+        self.edge_types = list(GET_NEIGHBORS)
+        if not isinstance(num_neighbors, dict):
+            num_neighbors = {edge_type: list(num_neighbors) for edge_type in self.edge_types}
+        self.num_neighbors = num_neighbors
+        self.num_hops = max((len(v) for v in num_neighbors.values()), default=0)
+        self.replace = replace
+        self.rng = np.random.default_rng(seed)
+
+
+    def sample_from_nodes(self, inputs: NodeSamplerInput) -> HeteroSamplerOutput:
+        input_type = inputs.input_type
+        seeds = inputs.node.numpy().astype(np.int64)
+
+        nodes = {node_type: [] for node_type in SAMPLING_LABELS}
+        local = {node_type: {} for node_type in SAMPLING_LABELS}
+        rows = {edge_type: [] for edge_type in self.edge_types}
+        cols = {edge_type: [] for edge_type in self.edge_types}
+        sampled_nodes = {node_type: [0] * (self.num_hops + 1) for node_type in SAMPLING_LABELS}
+        sampled_edges = {edge_type: [0] * self.num_hops for edge_type in self.edge_types}
+
+        def add(node_type: str, index: int) -> Tuple[int, bool]:
+            position = local[node_type].get(index)
+            if position is not None:
+                return position, False
+            position = local[node_type][index] = len(nodes[node_type])
+            nodes[node_type].append(index)
+            return position, True
+
+        for seed in seeds:
+            add(input_type, int(seed))
+        sampled_nodes[input_type][0] = len(nodes[input_type])
+        frontier = {input_type: np.asarray(nodes[input_type], dtype=np.int64)}
+
+        for hop in range(self.num_hops):
+            following = {}
+            for edge_type in self.edge_types:
+                src_type, _, dst_type = edge_type
+                fanout = self.num_neighbors.get(edge_type, [])
+                k = fanout[hop] if hop < len(fanout) else 0
+                if k == 0 or dst_type not in frontier or frontier[dst_type].size == 0:
+                    continue
+
+                for dst, srcs in zip(frontier[dst_type], self.graph_store.neighbors(edge_type, frontier[dst_type])):
+                    if k > 0 and srcs.size > k:
+                        srcs = self.rng.choice(srcs, k, replace=self.replace)
+                    col = local[dst_type][int(dst)]
+                    for src in srcs:
+                        row, new = add(src_type, int(src))
+                        if new:
+                            following.setdefault(src_type, []).append(int(src))
+                        rows[edge_type].append(row)
+                        cols[edge_type].append(col)
+                    sampled_edges[edge_type][hop] += int(srcs.size)
+
+            frontier = {node_type: np.asarray(indices, dtype=np.int64) for node_type, indices in following.items()}
+            for node_type, indices in following.items():
+                sampled_nodes[node_type][hop + 1] = len(indices)
+
+        as_tensor = lambda values: torch.tensor(values, dtype=torch.long)
+        return HeteroSamplerOutput(
+            node={node_type: as_tensor(v) for node_type, v in nodes.items() if v},
+            row={edge_type: as_tensor(v) for edge_type, v in rows.items() if v},
+            col={edge_type: as_tensor(v) for edge_type, v in cols.items() if v},
+            edge={edge_type: None for edge_type, v in rows.items() if v},
+            num_sampled_nodes=sampled_nodes,
+            num_sampled_edges=sampled_edges,
+            metadata=(inputs.input_id, inputs.time)
+        )
+
+
+    def sample_from_edges(self, inputs: Any, neg_sampling: Any = None) -> Any:
+        raise NotImplementedError("Neo4jNeighborSampler only samples from seed nodes")
+
+
+
+class Prefetcher:
+    """
+    Iterates a loader in a background thread, keeping up to `depth` mini-batches ready so the
+    database round trips of the next batches overlap with training on the current one.
+    """
+    _done = object()
+
+    def __init__(self, loader: Iterable, depth: int = 2):
+        self.loader = loader
+        self.depth = depth
+
+
+    def __len__(self) -> int:
+        return len(self.loader)
+
+
+    def __iter__(self) -> Iterator[Any]:
+        batches = queue.Queue(maxsize=self.depth)
+        stop = threading.Event()
+
+        def produce() -> None:
+            try:
+                for batch in self.loader:
+                    while not stop.is_set():
+                        try:
+                            batches.put(batch, timeout=0.1)
+                            break
+                        except queue.Full:
+                            continue
+                    if stop.is_set():
+                        return
+                batches.put(self._done)
+            except BaseException as e:
+                batches.put(e)
+
+        thread = threading.Thread(target=produce, name="mbai-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is self._done:
+                    return
+                if isinstance(batch, BaseException):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+
+
+
+def neighbor_loader(
+    input_type: str,
+    num_neighbors: Union[List[int], Dict[EdgeType, List[int]]],
+    season_id: Optional[str] = None,
+    input_nodes: Optional[Sequence[Any]] = None,
+    batch_size: int = 128,
+    shuffle: bool = False,
+    as_of: Optional[str] = None,
+    cache_size: int = 1_000_000,
+    prefetch: int = 2,
+    **kwargs
+) -> Iterable:
+    """
+    Mini-batches of `HeteroData` sampled around seed nodes of `input_type` straight from the
+    database, without materializing the graph. `input_nodes` are database ids (every node of
+    the type when None). Batches are prepared `prefetch` ahead in a background thread.
+    """
+    graph_store = Neo4jGraphStore(season_id, cache_size=cache_size)
+    feature_store = Neo4jFeatureStore(graph_store, as_of=as_of, cache_size=cache_size)
+    sampler = Neo4jNeighborSampler(graph_store, num_neighbors)
+
+    if input_nodes is None:
+        seeds = np.arange(graph_store.num_nodes(input_type))
+    else:
+        seeds = graph_store.index_of(input_type, input_nodes)
+
+    loader = NodeLoader(
+        (feature_store, graph_store), sampler,
+        input_nodes=(input_type, torch.from_numpy(seeds)),
+        batch_size=batch_size, shuffle=shuffle, **kwargs
+    )
+    return Prefetcher(loader, depth=prefetch) if prefetch else loader
@@ -0,0 +1,360 @@
+# core/shots.py
+import os
+import time
+from contextlib import contextmanager
+from threading import Lock, RLock
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+SHOTS_VERSION = 1
+
+# Half-court frame in feet: u runs across the court (basket at 0), v from the basket towards midcourt.
+HEX_WIDTH = 2.0
+HEX_HEIGHT = HEX_WIDTH * np.sqrt(3.0)
+HEX_EXTENT = (-25.0, 25.0, -5.25, 41.75)
+HEX_NX = int(np.ceil((HEX_EXTENT[1] - HEX_EXTENT[0]) / HEX_WIDTH))
+HEX_NY = int(np.ceil((HEX_EXTENT[3] - HEX_EXTENT[2]) / HEX_HEIGHT))
+HEX_BINS = (HEX_NX + 1) * (HEX_NY + 1) + HEX_NX * HEX_NY
+
+ZONES = ["restricted_area", "paint", "mid_range", "left_corner_3", "right_corner_3", "above_break_3"]
+KINDS = ["season", "team", "lineup", "player"]
+CHANNELS = ["attempts", "makes", "points"]
+
+_store = None
+_store_lock = Lock()
+
+
+def court_coords(x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Maps the play-by-play coordinates (percent of court length and width) onto the half-court
+    frame of the shooting basket, mirroring shots taken on the far end.
+    """
+    length = np.asarray(x, dtype=np.float64) * 0.94
+    width = np.asarray(y, dtype=np.float64) * 0.50
+    far = length > 47.0
+    length = np.where(far, 94.0 - length, length)
+    width = np.where(far, 50.0 - width, width)
+    return width - 25.0, length - 5.25
+
+
+def hex_bins(u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """
+    Index of the hexagon containing each point, on two interleaved rectangular lattices
+    (the same construction as matplotlib's hexbin). Points outside the half court get -1.
+    """
+    umin, umax, vmin, vmax = HEX_EXTENT
+    ix = (u - umin) / HEX_WIDTH
+    iy = (v - vmin) / HEX_HEIGHT
+
+    ix1, iy1 = np.round(ix), np.round(iy)
+    ix2 = np.clip(np.floor(ix), 0, HEX_NX - 1)
+    iy2 = np.clip(np.floor(iy), 0, HEX_NY - 1)
+    d1 = (ix - ix1) ** 2 + 3.0 * (iy - iy1) ** 2
+    d2 = (ix - ix2 - 0.5) ** 2 + 3.0 * (iy - iy2 - 0.5) ** 2
+
+    first = d1 < d2
+    bins = np.where(
+        first,
+        ix1 * (HEX_NY + 1) + iy1,
+        (HEX_NX + 1) * (HEX_NY + 1) + ix2 * HEX_NY + iy2
+    ).astype(np.int64)
+
+    inside = (u >= umin) & (u <= umax) & (v >= vmin) & (v <= vmax)
+    return np.where(inside, bins, -1)
+
+
+def hex_centers() -> np.ndarray:
+    """
+    (HEX_BINS, 2) array of hexagon centers in the half-court frame, for plotting.
+    """
+    umin, _, vmin, _ = HEX_EXTENT
+    i1, j1 = np.meshgrid(np.arange(HEX_NX + 1), np.arange(HEX_NY + 1), indexing="ij")
+    i2, j2 = np.meshgrid(np.arange(HEX_NX), np.arange(HEX_NY), indexing="ij")
+    first = np.stack([umin + i1.ravel() * HEX_WIDTH, vmin + j1.ravel() * HEX_HEIGHT], axis=1)
+    second = np.stack([umin + (i2.ravel() + 0.5) * HEX_WIDTH, vmin + (j2.ravel() + 0.5) * HEX_HEIGHT], axis=1)
+    return np.concatenate([first, second])
+
+
+def zone_bins(u: np.ndarray, v: np.ndarray, distance: np.ndarray, fg3: np.ndarray) -> np.ndarray:
+    """
+    Index into `ZONES` of each shot. Shots without coordinates fall back on their distance.
+    """
+    located = np.isfinite(u) & np.isfinite(v)
+    corner = fg3 & located & (v <= 14.0 - 5.25)
+    paint = ~fg3 & located & (np.abs(u) < 8.0) & (v < 19.0 - 5.25)
+
+    zones = np.full(distance.shape, ZONES.index("mid_range"), dtype=np.int64)
+    zones[paint] = ZONES.index("paint")
+    zones[~fg3 & (distance >= 0) & (distance <= 4.0)] = ZONES.index("restricted_area")
+    zones[fg3] = ZONES.index("above_break_3")
+    zones[corner & (u < 0)] = ZONES.index("left_corner_3")
+    zones[corner & (u >= 0)] = ZONES.index("right_corner_3")
+    return zones
+
+
+def bin_shots(shots: Dict[str, np.ndarray]) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Aggregates a batch of shots into per-entity (attempts, makes, points) counts over the hex and
+    zone bins, for every kind in `KINDS`. Counts are integers, so batches add and subtract exactly.
+    """
+    n = shots["made"].size
+    valid = (shots["x"] >= 0) & (shots["y"] >= 0)
+    u, v = court_coords(shots["x"], shots["y"])
+    u, v = np.where(valid, u, np.nan), np.where(valid, v, np.nan)
+
+    fg3 = shots["fg3"].astype(bool)
+    made = shots["made"].astype(np.int64)
+    points = made * np.where(fg3, 3, 2)
+    channels = np.stack([np.ones(n, dtype=np.int64), made, points])
+
+    hexes = hex_bins(np.nan_to_num(u, nan=-1e9), np.nan_to_num(v, nan=-1e9))
+    zones = zone_bins(u, v, shots["distance"].astype(np.float64), fg3)
+
+    out = {}
+    for kind in KINDS:
+        keys = np.zeros(n, dtype=np.int64).astype(str) if kind == "season" else shots[f"{kind}_id"].astype(str)
+        ids, codes = np.unique(keys, return_inverse=True)
+        out[kind] = {
+            "ids": ids,
+            "hex": _scatter(codes, hexes, ids.size, HEX_BINS, channels),
+            "zone": _scatter(codes, zones, ids.size, len(ZONES), channels),
+        }
+
+    return out
+
+
+def _scatter(codes: np.ndarray, bins: np.ndarray, n: int, width: int, channels: np.ndarray) -> np.ndarray:
+    keep = bins >= 0
+    flat = codes[keep] * width + bins[keep]
+    counts = [np.bincount(flat, weights=c[keep], minlength=n * width) for c in channels]
+    return np.stack(counts, axis=-1).round().astype(np.int32).reshape(n, width, len(CHANNELS))
+
+
+def merge_bins(a: Dict[str, np.ndarray], b: Dict[str, np.ndarray], sign: int = 1) -> Dict[str, np.ndarray]:
+    """
+    `a + sign * b` for the bins of one kind, aligning entities by id. Entities left without any
+    attempt are dropped.
+    """
+    ids = np.union1d(a["ids"], b["ids"])
+    out = {"ids": ids}
+    for key in ["hex", "zone"]:
+        total = np.zeros((ids.size,) + a[key].shape[1:], dtype=np.int32)
+        total[np.searchsorted(ids, a["ids"])] += a[key]
+        total[np.searchsorted(ids, b["ids"])] += sign * b[key]
+        out[key] = total
+
+    keep = out["zone"][:, :, 0].sum(axis=1) > 0
+    return {key: value[keep] for key, value in out.items()}
+
+
+def empty_bins() -> Dict[str, Dict[str, np.ndarray]]:
+    return {kind: {
+        "ids": np.array([], dtype=str),
+        "hex": np.zeros((0, HEX_BINS, len(CHANNELS)), dtype=np.int32),
+        "zone": np.zeros((0, len(ZONES), len(CHANNELS)), dtype=np.int32)
+    } for kind in KINDS}
+
+
+def chart(bins: Dict[str, np.ndarray], league: Dict[str, np.ndarray], row: int) -> Dict[str, Any]:
+    """
+    Shot chart of one entity: per-bin attempts, makes, points, FG% and points per shot, plus the
+    expected points of its attempts at league-average efficiency in each bin.
+    """
+    out = {}
+    for key in ["hex", "zone"]:
+        attempts, makes, points = np.moveaxis(bins[key][row].astype(np.float64), -1, 0)
+        league_attempts, _, league_points = np.moveaxis(league[key].sum(axis=0).astype(np.float64), -1, 0)
+        league_pps = np.divide(league_points, league_attempts, out=np.zeros_like(league_points), where=league_attempts > 0)
+
+        out[key] = {
+            "attempts": attempts,
+            "makes": makes,
+            "points": points,
+            "fg_pct": np.divide(makes, attempts, out=np.full_like(makes, np.nan), where=attempts > 0),
+            "pps": np.divide(points, attempts, out=np.full_like(points, np.nan), where=attempts > 0),
+            "expected_points": attempts * league_pps,
+        }
+
+    zone = out["zone"]
+    attempts = zone["attempts"].sum()
+    out["attempts"] = attempts
+    out["fg_pct"] = zone["makes"].sum() / attempts if attempts else float("nan")
+    out["points"] = zone["points"].sum()
+    out["expected_points"] = zone["expected_points"].sum()
+    return out
+
+
+
+class ShotStore:
+    """
+    On-disk cache of the shot bins of each (kind, season), kept alongside the raw shot arrays of
+    every game so that re-ingesting a game can subtract its previous contribution before adding
+    the new one. Each kind lives in its own file, so a league chart never loads the lineup bins.
+    Loaded bins are kept in memory and reloaded when another process replaces their file. Writers
+    of a season hold its lock file (`flock`) across the whole read-modify-write, so parallel ingest
+    workers apply their games one after the other instead of overwriting each other's.
+    """
+    def __init__(self, root: str):
+        self.root = root
+        self._bins = {}
+        self._lock = RLock()
+        os.makedirs(self.root, exist_ok=True)
+
+
+    def path(self, season_id: str, kind: Optional[str] = None, game_id: Optional[int] = None) -> str:
+        if game_id is not None:
+            return os.path.join(self.root, season_id, "games", f"{game_id}.npz")
+        return os.path.join(self.root, season_id, f"{kind}_v{SHOTS_VERSION}.npz")
+
+
+    @contextmanager
+    def locked(self, season_id: str) -> Iterator[None]:
+        """
+        Holds the season's write lock, against the other threads and processes sharing `root`.
+        """
+        with self._lock:
+            os.makedirs(os.path.join(self.root, season_id), exist_ok=True)
+            with open(os.path.join(self.root, season_id, ".lock"), "a+") as f:
+                _lock_file(f)
+                try:
+                    yield
+                finally:
+                    _unlock_file(f)
+
+
+    def get(self, season_id: str, kind: str) -> Dict[str, np.ndarray]:
+        path = self.path(season_id, kind)
+        try:
+            version = _version(path)
+        except FileNotFoundError:
+            return empty_bins()[kind]
+
+        with self._lock:
+            cached = self._bins.get((season_id, kind))
+            if cached and cached[0] == version:
+                return cached[1]
+
+        with np.load(path) as f:
+            bins = {key: f[key] for key in ["ids", "hex", "zone"]}
+
+        with self._lock:
+            self._bins[(season_id, kind)] = (version, bins)
+        return bins
+
+
+    def update_game(self, season_id: str, game_id: int, shots: Dict[str, np.ndarray]) -> None:
+        with self.locked(season_id):
+            game_path = self.path(season_id, game_id=game_id)
+            previous = None
+            if os.path.exists(game_path):
+                with np.load(game_path) as f:
+                    previous = bin_shots(dict(f))
+
+            current = bin_shots(shots)
+            for kind in KINDS:
+                bins = self.get(season_id, kind)
+                if previous is not None:
+                    bins = merge_bins(bins, previous[kind], sign=-1)
+                self._save_bins(season_id, kind, merge_bins(bins, current[kind]))
+
+            self._save(game_path, shots)
+
+
+    def remove_game(self, season_id: str, game_id: int) -> None:
+        """
+        Subtracts a game's previous contribution from the bins and drops its raw shots.
+        """
+        with self.locked(season_id):
+            game_path = self.path(season_id, game_id=game_id)
+            if not os.path.exists(game_path):
+                return
+
+            with np.load(game_path) as f:
+                previous = bin_shots(dict(f))
+            for kind in KINDS:
+                self._save_bins(season_id, kind, merge_bins(self.get(season_id, kind), previous[kind], sign=-1))
+            os.remove(game_path)
+
+
+    def rebuild(self, season_id: str, shots: Dict[str, np.ndarray]) -> None:
+        with self.locked(season_id):
+            games = os.path.dirname(self.path(season_id, game_id=0))
+            if os.path.isdir(games):
+                for name in os.listdir(games):
+                    os.remove(os.path.join(games, name))
+
+            for game_id in np.unique(shots["game_id"]):
+                mask = shots["game_id"] == game_id
+                self._save(self.path(season_id, game_id=int(game_id)), {key: value[mask] for key, value in shots.items()})
+
+            bins = bin_shots(shots)
+            for kind in KINDS:
+                self._save_bins(season_id, kind, bins[kind])
+
+
+    def _save(self, path: str, arrays: Dict[str, np.ndarray]) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+
+
+    def _save_bins(self, season_id: str, kind: str, bins: Dict[str, np.ndarray]) -> None:
+        path = self.path(season_id, kind)
+        self._save(path, bins)
+        with self._lock:
+            self._bins[(season_id, kind)] = (_version(path), bins)
+
+
+
+def _version(path: str) -> Tuple[int, int, int]:
+    # Every save replaces the file, so its inode changes even when the mtime tick doesn't.
+    st = os.stat(path)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+
+def _lock_file(f) -> None:
+    # fcntl is POSIX-only and msvcrt Windows-only: both are imported here, so the module imports anywhere.
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ten one-second attempts.
+                time.sleep(0.1)
+    fcntl.flock(f, fcntl.LOCK_EX)
+
+
+
+def _unlock_file(f) -> None:
+    try:
+        import fcntl
+    except ImportError:
+        import msvcrt
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        return
+    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+
+def get_shot_store() -> ShotStore:
+    global _store
+
+    if _store:
+        return _store
+
+    with _store_lock:
+        if _store is None:
+            root = os.getenv("MBAI_SHOTS_DIR", os.path.join(os.path.expanduser("~"), ".cache", "mbai-gdb", "shots"))
+            _store = ShotStore(root)
+
+        return _store
@@ -0,0 +1,267 @@
+# core/tracing.py
+import os
+import json
+import time
+import uuid
+import threading
+import tracemalloc
+import urllib.request
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional
+
+
+_tracer = None
+_tracer_lock = Lock()
+
+
+class Span:
+    """
+    One timed unit of work (a game, a stage, a fetch). Numeric attributes added with `add` are
+    summed, so the writes of a stage accumulate their row counts and payload bytes.
+    """
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.attrs = dict(attrs)
+        self.start = time.time()
+        self.clock = time.perf_counter()
+        self.duration = None
+        self.status = "ok"
+        self.error = None
+        self.memory_start = 0
+        self.memory_peak = 0
+
+
+    def add(self, **attrs: Any) -> None:
+        for key, value in attrs.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(self.attrs.get(key), (int, float)):
+                self.attrs[key] += value
+            else:
+                self.attrs[key] = value
+
+
+    def fail(self, error: Any) -> None:
+        self.status = "error"
+        self.error = repr(error) if isinstance(error, BaseException) else str(error)
+
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration": self.duration,
+            "status": self.status,
+            "error": self.error,
+            "peak_memory_bytes": max(0, self.memory_peak - self.memory_start) if self.memory_peak else None,
+            **self.attrs
+        }
+
+
+
+class _NullSpan:
+    def add(self, **attrs: Any) -> None:
+        pass
+
+    def fail(self, error: Any) -> None:
+        pass
+
+
+
+class Tracer:
+    """
+    Collects nested spans per thread and exports each finished trace (a root span and its children)
+    in one piece, as JSON lines appended to a file or POSTed to a local collector. With `memory`,
+    every span records the peak traced allocation above its starting point (tracemalloc).
+    """
+    def __init__(self, target: Optional[str], memory: bool = True):
+        self.target = target
+        self.enabled = bool(target)
+        self.memory = self.enabled and memory
+        self._local = threading.local()
+        self._write_lock = Lock()
+
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+            self._local.finished = []
+        return self._local.stack
+
+
+    def _fold_peak(self, stack: List[Span]) -> None:
+        # tracemalloc keeps a single peak: fold it into every open span before resetting it.
+        _, peak = tracemalloc.get_traced_memory()
+        for span in stack:
+            span.memory_peak = max(span.memory_peak, peak)
+        tracemalloc.reset_peak()
+
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        if not self.enabled:
+            yield _NullSpan()
+            return
+
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        span = Span(name, parent.trace_id if parent else uuid.uuid4().hex, parent.span_id if parent else None, attrs)
+        if self.memory:
+            self._fold_peak(stack)
+            span.memory_start = tracemalloc.get_traced_memory()[0]
+            span.memory_peak = span.memory_start
+        stack.append(span)
+
+        try:
+            yield span
+        except BaseException as e:
+            span.fail(e)
+            raise
+        finally:
+            if self.memory:
+                self._fold_peak(stack)
+            stack.pop()
+            span.duration = time.perf_counter() - span.clock
+            self._local.finished.append(span.to_dict())
+            if not stack:
+                spans, self._local.finished = self._local.finished, []
+                self.export(spans)
+
+
+    def current(self) -> Any:
+        stack = self._stack() if self.enabled else None
+        return stack[-1] if stack else _NullSpan()
+
+
+    def export(self, spans: List[Dict[str, Any]]) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        try:
+            if self.target.startswith(("http://", "https://")):
+                request = urllib.request.Request(self.target, data=lines.encode(), headers={"Content-Type": "application/x-ndjson"})
+                urllib.request.urlopen(request, timeout=5).close()
+            else:
+                os.makedirs(os.path.dirname(os.path.abspath(self.target)), exist_ok=True)
+                # One append per trace keeps the lines of concurrent worker processes whole.
+                with self._write_lock, open(self.target, "a") as f:
+                    f.write(lines)
+        except Exception as e:
+            print(f"⚠️ Couldn't export {len(spans)} spans to {self.target}: {e}")
+
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+
+    if _tracer:
+        return _tracer
+
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer(os.getenv("MBAI_TRACE"), memory=os.getenv("MBAI_TRACE_MEMORY", "1") != "0")
+
+        return _tracer
+
+
+def span(name: str, **attrs: Any):
+    """
+    Context manager timing `name` as a child of the current span (see `Tracer`). A no-op unless
+    `MBAI_TRACE` names a JSONL file or a collector URL.
+    """
+    return get_tracer().span(name, **attrs)
+
+
+def annotate(**attrs: Any) -> None:
+    """
+    Adds attributes to the innermost open span, if any.
+    """
+    get_tracer().current().add(**attrs)
+
+
+def tracing() -> bool:
+    return get_tracer().enabled
+
+
+def payload_rows(params: Dict[str, Any]) -> int:
+    """
+    Rows shipped by a write: the length of every list parameter, or of the first column of a
+    struct-of-arrays parameter.
+    """
+    rows = 0
+    for value in params.values():
+        if isinstance(value, list):
+            rows += len(value)
+        elif isinstance(value, dict):
+            column = next(iter(value.values()), None)
+            rows += len(column) if isinstance(column, list) else 0
+    return rows
+
+
+def payload_bytes(params: Dict[str, Any]) -> Optional[int]:
+    """
+    Size of the parameters once PackStream-encoded by the driver, or None if its encoder is unavailable.
+    """
+    try:
+        from neo4j._codec.packstream.v1 import Packer, PackableBuffer
+        from neo4j._codec.hydration.bolt.v2 import HydrationHandler
+        buffer = PackableBuffer()
+        Packer(buffer).pack(params, dehydration_hooks=HydrationHandler().new_hydration_scope().dehydration_hooks)
+        return len(buffer.data)
+    except Exception:
+        return None
+
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    spans = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                spans.append(json.loads(line))
+    return spans
+
+
+def trace_report(spans: List[Dict[str, Any]], top: int = 10) -> Dict[str, Any]:
+    """
+    Where the time went: the slowest games, and per span name the count, total, mean, p95 and max
+    duration, failures, rows, payload bytes and the largest peak memory.
+    """
+    games = sorted((s for s in spans if s["name"] == "game"), key=lambda s: -s["duration"])
+    stages = {}
+    for s in spans:
+        if s["name"] == "game":
+            continue
+        stages.setdefault(s["name"], []).append(s)
+
+    summary = {}
+    for name, group in stages.items():
+        durations = sorted(s["duration"] for s in group)
+        summary[name] = {
+            "count": len(group),
+            "total": sum(durations),
+            "mean": sum(durations) / len(durations),
+            "p95": durations[min(len(durations) - 1, int(0.95 * len(durations)))],
+            "max": durations[-1],
+            "failed": sum(s["status"] != "ok" for s in group),
+            "rows": sum(s.get("rows") or 0 for s in group),
+            "bytes": sum(s.get("bytes") or 0 for s in group),
+            "peak_memory_bytes": max((s.get("peak_memory_bytes") or 0 for s in group), default=0)
+        }
+
+    return {
+        "games": len(games),
+        "failed_games": sum(s["status"] != "ok" for s in games),
+        "game_seconds": sum(s["duration"] for s in games),
+        "slowest_games": [
+            {"game_id": s.get("game_id"), "duration": s["duration"], "status": s["status"], "peak_memory_bytes": s.get("peak_memory_bytes")}
+            for s in games[:top]
+        ],
+        "stages": dict(sorted(summary.items(), key=lambda kv: -kv[1]["total"]))
+    }
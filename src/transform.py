@@ -0,0 +1,483 @@
+# core/transform.py
+
+from typing import Any, Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+
+def game_clock(period: pd.Series, clock: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Vectorized conversion of (period, ISO clock remaining) into (local, global) elapsed seconds.
+    """
+    period = period.to_numpy(dtype=np.float64)
+    remaining = pd.to_timedelta(clock).dt.total_seconds().to_numpy()
+    overtime = period > 4
+    period_elapsed = np.where(overtime, 300.0, 720.0) - remaining
+    global_offset = np.where(overtime, 2880.0 + (period - 5) * 300.0, (period - 1) * 720.0)
+    return period_elapsed, global_offset + period_elapsed
+
+
+def compute_periods(periods: pd.DataFrame) -> List[Dict]:
+    """
+    Turns the `period` start/end actions into one entry per period.
+    """
+    data = []
+    for p, period_df in periods.groupby("period", sort=False):
+        times = pd.to_datetime(period_df["timeActual"])
+        period_entry = {"n": int(p), "start": times.iloc[0], "end": times.iloc[1]}
+        data.append(period_entry)
+
+    return data
+
+
+def compute_lineups(team_ids: Tuple[int, int], subs: pd.DataFrame, starters: pd.DataFrame) -> List[Dict]:
+    """
+    Replays the substitutions of each team on top of its starters, returning one entry per side
+    with the ordered list of 5-man lineups and the clock at which each took the floor.
+    """
+    data = []
+    for team_id in team_ids:
+        team_subs = subs[subs['teamId'] == team_id]
+        team_starters = starters.loc[starters['TEAM_ID'] == team_id, 'PLAYER_ID'].to_list()
+        assert len(team_starters) == 5, f"Starters list must contain 5 players, but got {len(starters)}"
+
+        team_lineups = []
+        current_lineup = set(team_starters)
+        for p, period_df in team_subs.groupby('period', sort=False):
+            period_len = 300.0 if p > 4 else 720.0
+            global_offset = 2880.0 + (p - 5) * 300.0 if p > 4 else (p - 1) * 720.0
+            start_clock = "PT05M00.00S" if p > 4 else "PT12M00.00S"
+            start_mask = (period_df['clock'] == start_clock)
+
+            for _, row in period_df[start_mask].iterrows():
+                player = row["personId"]
+                if row["subType"] == "in":
+                    current_lineup.add(player)
+                else:
+                    current_lineup.discard(player)
+
+            if len(current_lineup) == 5:
+                starters_entry = {
+                    "period": p,
+                    "time": "",
+                    "clock": start_clock,
+                    "local_clock": 0.0,
+                    "global_clock": global_offset,
+                    "ids": sorted(list(current_lineup))
+                }
+                team_lineups.append(starters_entry)
+
+            for clock, group in period_df[~start_mask].groupby("clock", sort=False):
+                period_elapsed = period_len - pd.Timedelta(clock).total_seconds()
+
+                for _, row in group.iterrows():
+                    player = row["personId"]
+                    if row["subType"] == "in":
+                        current_lineup.add(player)
+                    else:
+                        current_lineup.discard(player)
+
+                if len(current_lineup) == 5:
+                    if current_lineup != set(team_lineups[-1]["ids"]):
+                        lineup_entry = {
+                            "period": p,
+                            "time": group['timeActual'].iloc[0],
+                            "clock": clock,
+                            "local_clock": period_elapsed,
+                            "global_clock": global_offset + period_elapsed,
+                            "ids": sorted(list(current_lineup))
+                        }
+                        team_lineups.append(lineup_entry)
+
+        side_entry = {"team_id": team_id, "lineups": team_lineups}
+        data.append(side_entry)
+
+    return data
+
+
+
+def compute_possessions(team_ids: Tuple[int, int], actions: pd.DataFrame) -> List[Dict]:
+    """
+    Segments the action stream into possessions. A possession ends on a made field goal (unless
+    free throws of an and-one follow at the same clock), a made last free throw of a trip, a
+    defensive rebound, a turnover or the end of the period. Each possession belongs to the team
+    of its last offensive action (shot, free throw, turnover, offensive rebound), or to the
+    opponent of the defensive rebounder that ends it. Segments without an offensive team (e.g.
+    the dead time after a period's last possession) are dropped.
+    """
+    df = actions[actions["actionType"] != "substitution"].reset_index(drop=True)
+    kind = df["actionType"].astype(str).to_numpy()
+    subtype = df["subType"].astype(str)
+    made = (df["shotResult"].astype(str) == "Made").to_numpy()
+    team = pd.to_numeric(pd.Series(df["teamId"], dtype="object"), errors="coerce").to_numpy(dtype=np.float64, copy=True)
+    team[~np.isin(team, team_ids)] = np.nan
+
+    field_goal = np.isin(kind, ["2pt", "3pt"])
+    free_throw = kind == "freethrow"
+    trip = subtype.str.extract(r"(\d+) of (\d+)").astype(float)
+    attempt = trip[0].fillna(1.0).to_numpy()
+    last_ft = free_throw & (trip[0] == trip[1]).to_numpy()
+    defensive = (kind == "rebound") & (subtype == "defensive").to_numpy()
+    offensive = (kind == "rebound") & (subtype == "offensive").to_numpy()
+
+    keys = pd.MultiIndex.from_arrays([df["period"].astype(int), df["clock"].astype(str), team])
+    and_one = field_goal & made & keys.isin(keys[free_throw])
+
+    ends = (field_goal & made & ~and_one) | (last_ft & made) | defensive | (kind == "turnover") | \
+        ((kind == "period") & (subtype == "end").to_numpy())
+
+    other = np.where(team == team_ids[0], team_ids[1], team_ids[0]).astype(np.float64)
+    offense = np.where(field_goal | free_throw | offensive | (kind == "turnover"), team, np.nan)
+    offense = np.where(defensive & ~np.isnan(team), other, offense)
+    points = np.where(made, np.where(free_throw, 1, np.where(kind == "3pt", 3, 2)), 0)
+
+    local_clock, global_clock = game_clock(df["period"], df["clock"])
+    time = pd.to_datetime(df["timeActual"], utc=True) + pd.to_timedelta(np.where(free_throw, attempt * 100, 0), unit="ms")
+    segment = np.concatenate([[0], np.cumsum(ends)[:-1]])
+
+    df = pd.DataFrame({
+        "segment": segment, "period": df["period"].astype(int), "offense": offense, "team": team,
+        "points": points, "time": time, "local_clock": local_clock, "global_clock": global_clock
+    })
+    seg = df.groupby("segment").agg(
+        period = ("period", "first"),
+        team_id = ("offense", "last"),
+        start_time = ("time", "first"),
+        end_time = ("time", "last"),
+        start_local = ("local_clock", "first"),
+        start_global = ("global_clock", "first"),
+        end_global = ("global_clock", "last"),
+    )
+    same_period = seg["period"] == seg["period"].shift(1)
+    seg["first"] = ~same_period
+    seg["start_time"] = seg["end_time"].shift(1).where(same_period, seg["start_time"])
+    seg["start_local"] = seg["start_local"].where(~same_period, seg["start_local"] - (seg["start_global"] - seg["end_global"].shift(1)))
+    seg["start_global"] = seg["end_global"].shift(1).where(same_period, seg["start_global"])
+
+    scored = df[df["team"] == df["segment"].map(seg["team_id"])].groupby("segment")["points"].sum()
+    seg["points"] = scored.reindex(seg.index, fill_value=0)
+    seg = seg[seg["team_id"].notna()].reset_index(drop=True)
+
+    data = []
+    for n, row in enumerate(seg.itertuples(index=False)):
+        possession_entry = {
+            "n": n,
+            "period": int(row.period),
+            "team_id": int(row.team_id),
+            "start_time": row.start_time.isoformat(),
+            "end_time": row.end_time.isoformat(),
+            "first": bool(row.first),
+            "local_clock": round(float(row.start_local), 2),
+            "global_clock": round(float(row.start_global), 2),
+            "clock_duration": round(float(row.end_global - row.start_global), 2),
+            "points": int(row.points)
+        }
+        data.append(possession_entry)
+
+    return data
+
+
+
+# Payload field -> (play-by-play column, encoding) of the action writes.
+ACTION_FIELDS = {
+    "time": ("timeActual", "time"),
+    "period": ("period", "int"),
+    "clock": ("clock", "str"),
+    "type": ("actionType", "str"),
+    "subtype": ("subType", "str"),
+    "descriptor": ("descriptor", "str"),
+    "result": ("shotResult", "str"),
+    "x": ("x", "float"),
+    "y": ("y", "float"),
+    "distance": ("shotDistance", "float"),
+    "team_id": ("teamId", "id"),
+    "player_id": ("personId", "id"),
+    "official_id": ("officialId", "id"),
+    "drawn_id": ("foulDrawnPersonId", "id"),
+    "assist_id": ("assistPersonId", "id"),
+    "block_id": ("blockPersonId", "id"),
+    "steal_id": ("stealPersonId", "id"),
+    "recovered_id": ("jumpBallRecoverdPersonId", "id"),
+    "won_id": ("jumpBallWonPersonId", "id"),
+    "lost_id": ("jumpBallLostPersonId", "id"),
+}
+
+ACTION_BASE = ["time", "period", "clock", "local_clock", "global_clock", "type", "subtype", "team_id", "player_id"]
+ACTION_COLUMNS = {
+    "jumpball": ACTION_BASE + ["descriptor", "recovered_id", "won_id", "lost_id"],
+    "violation": ACTION_BASE + ["official_id"],
+    "foul": ACTION_BASE + ["descriptor", "drawn_id", "official_id"],
+    "shot": ACTION_BASE + ["result", "x", "y", "distance", "descriptor", "assist_id", "block_id"],
+    "freethrow": ACTION_BASE + ["result"],
+    "rebound": ACTION_BASE,
+    "turnover": ACTION_BASE + ["descriptor", "steal_id", "official_id"],
+    "timeout": ACTION_BASE,
+}
+ACTION_TYPES = {
+    "jumpball": ["jumpball"], "violation": ["violation"], "foul": ["foul"], "shot": ["2pt", "3pt"],
+    "freethrow": ["freethrow"], "rebound": ["rebound"], "turnover": ["turnover"], "timeout": ["timeout"]
+}
+
+# Descriptor labels of each kind of action: (payload field, "equals" / "contains", value, label).
+ACTION_LABELS = {
+    "jumpball": [
+        ("subtype", "equals", "recovered", "Recovered"),
+        ("descriptor", "equals", "startperiod", "StartPeriod"),
+        ("descriptor", "equals", "heldball", "HeldBall"),
+        ("descriptor", "equals", "unclearpass", "UnclearPass"),
+    ],
+    "violation": [
+        ("subtype", "equals", "kicked ball", "KickedBall"),
+        ("subtype", "equals", "delay-of-game", "DelayOfGame"),
+        ("subtype", "equals", "lane", "LaneViolation"),
+        ("subtype", "equals", "goaltending", "Goaltending"),
+        ("subtype", "equals", "defensive goaltending", "DefensiveGoaltending"),
+        ("subtype", "equals", "double dribble", "DoubleDribble"),
+        ("subtype", "equals", "jump ball", "JumpBallViolation"),
+    ],
+    "foul": [
+        ("subtype", "equals", "offensive", "Offensive"),
+        ("subtype", "equals", "technical", "Technical"),
+        ("subtype", "equals", "personal", "Personal"),
+        ("subtype", "equals", "flagrant", "Flagrant"),
+        ("descriptor", "equals", "shooting", "Shooting"),
+        ("descriptor", "equals", "loose ball", "LooseBall"),
+        ("descriptor", "equals", "take", "Take"),
+        ("descriptor", "equals", "defensive-3-second", "Def3Sec"),
+        ("descriptor", "equals", "charge", "Charge"),
+    ],
+    "shot": [
+        ("type", "equals", "2pt", "2PT"),
+        ("type", "equals", "3pt", "3PT"),
+        ("result", "equals", "Made", "Made"),
+        ("result", "equals", "Missed", "Missed"),
+        ("descriptor", "contains", "driving", "Driving"),
+        ("descriptor", "contains", "running", "Running"),
+        ("descriptor", "contains", "cutting", "Cutting"),
+        ("descriptor", "contains", "step back", "StepBack"),
+        ("descriptor", "contains", "pullup", "PullUp"),
+        ("descriptor", "contains", "turnaround", "TurnAround"),
+        ("descriptor", "contains", "reverse", "Reverse"),
+        ("descriptor", "contains", "fadeaway", "Fadeaway"),
+        ("descriptor", "contains", "bank", "Bank"),
+        ("descriptor", "contains", "floating", "Floater"),
+        ("descriptor", "contains", "finger roll", "FingerRoll"),
+        ("descriptor", "contains", "alley-oop", "AlleyOop"),
+        ("descriptor", "contains", "tip", "Tip"),
+        ("descriptor", "contains", "putback", "PutBack"),
+    ],
+    "freethrow": [
+        ("result", "equals", "Made", "Made"),
+        ("result", "equals", "Missed", "Missed"),
+    ],
+    "rebound": [
+        ("subtype", "equals", "offensive", "Offensive"),
+        ("subtype", "equals", "defensive", "Defensive"),
+    ],
+    "turnover": [
+        ("subtype", "equals", "bad pass", "BadPass"),
+        ("subtype", "equals", "lost ball", "LostBall"),
+        ("subtype", "equals", "traveling", "Traveling"),
+        ("subtype", "equals", "out-of-bounds", "OutOfBounds"),
+        ("subtype", "equals", "offensive foul", "OffensiveFoul"),
+        ("subtype", "equals", "shot clock", "ShotClock"),
+        ("descriptor", "equals", "lost ball", "LostBall"),
+        ("descriptor", "equals", "bad pass", "BadPass"),
+        ("descriptor", "equals", "step", "Step"),
+    ],
+    "timeout": [
+        ("subtype", "equals", "full", "FullTimeOut"),
+        ("subtype", "equals", "short", "ShortTimeOut"),
+    ],
+}
+
+
+def action_columns(actions: pd.DataFrame) -> Dict[str, Dict[str, List]]:
+    """
+    Struct-of-arrays write payloads of a game's actions, one per kind of `ACTION_COLUMNS`: a list
+    of native Python values per field, all of the same length. Each column is encoded once for the
+    whole game (timestamps as epoch milliseconds, the -1 / NA sentinels as None), so the driver
+    packs flat typed lists instead of one map of pandas scalars per action. The `labels` column
+    holds the descriptor labels of each action, matched per rule of `ACTION_LABELS`.
+    """
+    types = pd.Series(actions["actionType"], dtype="object").astype(str).to_numpy()
+    written = np.isin(types, [t for kind_types in ACTION_TYPES.values() for t in kind_types])
+    actions, types = actions[written], types[written]
+
+    local_clock, global_clock = game_clock(actions["period"], actions["clock"])
+    encoded = {"local_clock": np.round(local_clock, 2), "global_clock": np.round(global_clock, 2)}
+    for name, (column, encoding) in ACTION_FIELDS.items():
+        encoded[name] = _encode(pd.Series(actions[column], dtype="object"), encoding)
+
+    data = {}
+    for kind, kind_types in ACTION_TYPES.items():
+        mask = np.isin(types, kind_types)
+        data[kind] = {name: encoded[name][mask].tolist() for name in ACTION_COLUMNS[kind]}
+        data[kind]["labels"] = action_labels(data[kind], ACTION_LABELS[kind])
+
+    return data
+
+
+def action_labels(columns: Dict[str, List], rules: List[Tuple[str, str, str, str]]) -> List[List[str]]:
+    """
+    The labels of each action of a payload. Rules are matched once per distinct value of their
+    field and broadcast back to the actions.
+    """
+    hits = np.zeros((len(columns["time"]), len(rules)), dtype=bool)
+    for field in dict.fromkeys(field for field, *_ in rules):
+        values, inverse = np.unique(np.array([v or "" for v in columns[field]], dtype=str), return_inverse=True)
+        for j, (rule_field, match, value, _) in enumerate(rules):
+            if rule_field == field:
+                matched = np.array([value in v if match == "contains" else v == value for v in values.tolist()], dtype=bool)
+                hits[:, j] = matched[inverse] if values.size else False
+
+    names = [label for *_, label in rules]
+    return [list(dict.fromkeys(name for name, hit in zip(names, row) if hit)) for row in hits.tolist()]
+
+
+def _encode(values: pd.Series, encoding: str) -> np.ndarray:
+    if encoding == "time":
+        epoch = pd.to_datetime(values, utc=True) - pd.Timestamp(0, tz="UTC")
+        return (epoch // pd.Timedelta(milliseconds=1)).to_numpy(dtype=np.int64)
+
+    if encoding == "str":
+        valid = values.notna().to_numpy() & (values.astype(str) != "-1").to_numpy()
+        return np.where(valid, values.astype(str).to_numpy(dtype=object), None)
+
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64)
+    if encoding == "float":
+        return np.where(np.isnan(numbers), -1.0, numbers)
+
+    valid = ~np.isnan(numbers) & (numbers != -1)
+    ints = np.where(valid, numbers, 0).astype(np.int64)
+    if encoding == "int":
+        return ints
+    return np.where(valid, ints.astype(object), None)
+
+
+
+PLAYER_STATS = ["minutes", "points", "plus_minus", "fga", "fgm", "fg3a", "fg3m", "fta", "ftm"]
+LINEUP_STATS = ["minutes", "points_for", "points_against", "plus_minus", "possessions", "opp_possessions"]
+ROLLING_GAMES = 10
+PLAYER_FEATURES = 1 + 2 * len(PLAYER_STATS)
+LINEUP_FEATURES = 1 + 2 * len(LINEUP_STATS)
+
+
+def compute_game_stats(cols: Dict[str, List]) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Aggregates the stint, shot and score columns of one game (see `GET_GAME_STATS_INPUT`) into
+    (lineup stint, player stint, player, lineup) frames. Plus/minus comes from the score deltas
+    that fall inside each LineUpStint's [start_time, end_time), possessions from the Possessions
+    that end inside it.
+    """
+    score_order = np.lexsort((np.asarray(cols["score_time"], dtype=np.int64), np.asarray(cols["score_home"]) + np.asarray(cols["score_away"])))
+    home_pts = np.diff(np.asarray(cols["score_home"], dtype=np.float64)[score_order], prepend=0.0)
+    away_pts = np.diff(np.asarray(cols["score_away"], dtype=np.float64)[score_order], prepend=0.0)
+    score_time = np.asarray(cols["score_time"], dtype=np.int64)[score_order]
+    by_time = np.argsort(score_time, kind="stable")
+    score_time = score_time[by_time]
+    cum_home = np.concatenate([[0.0], np.cumsum(home_pts[by_time])])
+    cum_away = np.concatenate([[0.0], np.cumsum(away_pts[by_time])])
+
+    ls = pd.DataFrame({
+        "id": cols["ls_id"], "lineup_id": cols["ls_lineup"], "team_id": cols["ls_team"],
+        "start": np.asarray(cols["ls_start"], dtype=np.int64), "end": np.asarray(cols["ls_end"], dtype=np.int64),
+        "duration": np.asarray(cols["ls_duration"], dtype=np.float64),
+    })
+    lo = np.searchsorted(score_time, ls["start"].to_numpy(), side="left")
+    hi = np.searchsorted(score_time, ls["end"].to_numpy(), side="left")
+    scored_home = cum_home[hi] - cum_home[lo]
+    scored_away = cum_away[hi] - cum_away[lo]
+    is_home = ls["team_id"].to_numpy() == cols["home_team_id"]
+    ls["points_scored"] = np.where(is_home, scored_home, scored_away)
+    ls["points_conceded"] = np.where(is_home, scored_away, scored_home)
+    ls["plus_minus"] = ls["points_scored"] - ls["points_conceded"]
+
+    poss_team = np.asarray(cols.get("poss_team", []), dtype=np.float64)
+    poss_end = np.asarray(cols.get("poss_end", []), dtype=np.int64)
+    ls["possessions"] = 0
+    ls["opp_possessions"] = 0
+    for team_id in np.unique(poss_team):
+        ends = np.sort(poss_end[poss_team == team_id])
+        count = np.searchsorted(ends, ls["end"].to_numpy(), side="left") - np.searchsorted(ends, ls["start"].to_numpy(), side="left")
+        own = ls["team_id"].to_numpy() == team_id
+        ls["possessions"] += np.where(own, count, 0)
+        ls["opp_possessions"] += np.where(own, 0, count)
+
+    on = pd.DataFrame({
+        "id": cols["ps_id"], "player_id": cols["ps_player"], "ls_id": cols["ps_ls"],
+        "duration": np.asarray(cols["ps_duration"], dtype=np.float64),
+    }).drop_duplicates(["id", "ls_id"])
+    on = on.merge(ls[["id", "team_id", "points_scored", "points_conceded", "plus_minus"]].rename(columns={"id": "ls_id"}), on="ls_id", how="left")
+    ps = on.groupby(["id", "player_id", "team_id"], sort=False).agg(
+        duration = ("duration", "first"),
+        points_scored = ("points_scored", "sum"),
+        points_conceded = ("points_conceded", "sum"),
+        plus_minus = ("plus_minus", "sum"),
+    ).reset_index()
+
+    shots = pd.DataFrame({
+        "player_id": cols["shot_player"],
+        "ft": np.asarray(cols["shot_ft"], dtype=bool),
+        "fg3": np.asarray(cols["shot_3pt"], dtype=bool),
+        "made": np.asarray(cols["shot_made"], dtype=bool),
+    })
+    fg = ~shots["ft"]
+    shots = shots.assign(
+        fga = fg, fgm = fg & shots["made"],
+        fg3a = shots["fg3"], fg3m = shots["fg3"] & shots["made"],
+        fta = shots["ft"], ftm = shots["ft"] & shots["made"],
+        points = shots["made"] * np.where(shots["ft"], 1, np.where(shots["fg3"], 3, 2))
+    ).groupby("player_id")[["fga", "fgm", "fg3a", "fg3m", "fta", "ftm", "points"]].sum()
+
+    players = ps.groupby(["player_id", "team_id"]).agg(minutes = ("duration", "sum"), plus_minus = ("plus_minus", "sum"))
+    players["minutes"] /= 60.0
+    players = players.join(shots, on="player_id", how="left").fillna(0.0)[PLAYER_STATS].astype(np.float64).reset_index()
+
+    lineups = ls.groupby(["lineup_id", "team_id"]).agg(
+        minutes = ("duration", "sum"),
+        points_for = ("points_scored", "sum"),
+        points_against = ("points_conceded", "sum"),
+        plus_minus = ("plus_minus", "sum"),
+        possessions = ("possessions", "sum"),
+        opp_possessions = ("opp_possessions", "sum"),
+    )
+    lineups["minutes"] /= 60.0
+    lineups = lineups[LINEUP_STATS].astype(np.float64).reset_index()
+
+    return ls, ps, players, lineups
+
+
+def point_in_time(past: List[Dict], names: List[str]) -> Dict[str, Any]:
+    """
+    Folds an entity's previous rows (newest first, strictly before the cut) into its point-in-time
+    state: season-to-date sums (`std_*`), rolling means over the last `ROLLING_GAMES` games (`roll_*`)
+    and the feature vector `x` built from them.
+    """
+    last = past[0] if past else None
+    state = {"std_games": (last["std_games"] + 1) if last else 0}
+    for name in names:
+        state[f"std_{name}"] = (last.get(f"std_{name}", 0.0) + last.get(f"g_{name}", 0.0)) if last else 0.0
+        recent = [r.get(f"g_{name}", 0.0) for r in past[:ROLLING_GAMES]]
+        state[f"roll_{name}"] = float(np.mean(recent)) if recent else 0.0
+
+    games = max(state["std_games"], 1)
+    state["x"] = [float(state["std_games"])] + \
+        [state[f"std_{name}"] / games for name in names] + \
+        [state[f"roll_{name}"] for name in names]
+    return state
+
+
+def pre_game_rows(stats: pd.DataFrame, key: str, names: List[str], history: Dict[Any, List[Dict]]) -> List[Dict]:
+    """
+    One row per entity of a game: its own stats (`g_*`) plus its pre-game `point_in_time` state,
+    so features never see the game they describe.
+    """
+    rows = []
+    for entity in stats.to_dict("records"):
+        row = {key: entity[key], "team_id": entity["team_id"]}
+        row.update({f"g_{name}": float(entity[name]) for name in names})
+        row.update(point_in_time(history.get(entity[key], []), names))
+        rows.append(row)
+
+    return rows